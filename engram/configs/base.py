@@ -48,6 +48,8 @@ class EchoMemConfig(BaseModel):
     deep_multiplier: float = 1.6
     # Use question_form embedding for primary vector (better query matching)
     use_question_embedding: bool = True
+    llm_cache_size: int = 2048  # LRU of echo LLM results by content hash (0 disables)
+    persist_llm_cache: bool = True  # Keep echo LLM results in the history DB across restarts
 
 
 class CategoryMemConfig(BaseModel):
@@ -83,6 +85,16 @@ class CategoryMemConfig(BaseModel):
     max_category_depth: int = 3  # Maximum nesting depth
     auto_create_subcategories: bool = True  # Allow dynamic subcategory creation
 
+    # Matching performance
+    persist_embedding_cache: bool = True  # Cache category embeddings in the history DB across restarts
+    hnsw_threshold: int = 128  # Build an HNSW category index (if hnswlib is installed) above this many categories
+    embedding_dtype: str = "float32"  # In-memory dtype for category embeddings ("float32" or "float16")
+    prompt_top_k: int = 10  # List only the K most similar categories (+ parents/roots) in LLM detection prompts (0 = all)
+    max_prompt_categories: int = 0  # Only list the N strongest categories in LLM detection prompts (0 = all)
+    llm_concurrency: int = 4  # Max parallel LLM requests for batch categorization/summaries
+    llm_cache_size: int = 1024  # Semantic cache of LLM categorization answers (0 disables)
+    llm_cache_threshold: float = 0.92  # Min cosine similarity for a cache hit
+
 
 class FadeMemConfig(BaseModel):
     enable_forgetting: bool = True
@@ -96,6 +108,8 @@ class FadeMemConfig(BaseModel):
     fusion_similarity_threshold: float = 0.90
     enable_fusion: bool = True
     use_tombstone_deletion: bool = True
+    conflict_cache_size: int = 0  # LRU of LLM conflict classifications for exact repeat pairs (0 disables)
+    conflict_concurrency: int = 8  # Parallel neighbour lookups/conflict LLM calls per add() batch
 
 
 class MemoryConfig(BaseModel):
@@ -108,6 +122,10 @@ class MemoryConfig(BaseModel):
     )
     collection_name: str = "fadem_memories"
     embedding_model_dims: int = 3072  # gemini-embedding-001 default dimensions
+    query_embedding_cache_size: int = 1024  # LRU of search query embeddings (0 disables)
+    query_embedding_semantic_threshold: Optional[float] = None  # Reuse a cached query embedding for rewordings whose token signature has cosine >= this, e.g. 0.97 (None disables)
+    extraction_context_limit: int = 0  # Only list the N strongest existing memories in extraction prompts (0 = all)
+    embedding_storage_dtype: str = "float32"  # Memory embeddings in the history DB: "float32" or "int8" (4x smaller, lossy)
     version: str = "v1.3"  # Updated for CategoryMem
     custom_fact_extraction_prompt: Optional[str] = None
     custom_conflict_prompt: Optional[str] = None
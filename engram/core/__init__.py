@@ -1,9 +1,14 @@
-from engram.core.decay import calculate_decayed_strength, should_forget, should_promote
+from engram.core.decay import (
+    calculate_decayed_strength,
+    should_forget,
+    should_promote,
+)
 from engram.core.conflict import resolve_conflict
 from engram.core.echo import EchoProcessor, EchoDepth, EchoResult
-from engram.core.fusion import fuse_memories
-from engram.core.retrieval import composite_score
+from engram.core.fusion import fuse_memories, fuse_memories_batch
+from engram.core.retrieval import composite_score, composite_score_batch
 from engram.core.category import CategoryProcessor, Category, CategoryMatch, CategoryType
+from engram.core.semcache import SemCache
 
 __all__ = [
     "calculate_decayed_strength",
@@ -14,9 +19,12 @@ __all__ = [
     "EchoDepth",
     "EchoResult",
     "fuse_memories",
+    "fuse_memories_batch",
     "composite_score",
+    "composite_score_batch",
     "CategoryProcessor",
     "Category",
     "CategoryMatch",
     "CategoryType",
+    "SemCache",
 ]
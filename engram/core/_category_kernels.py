@@ -0,0 +1,62 @@
+"""
+Similarity kernels for the category layer.
+
+Numba is optional: when it is installed the cosine loop is JIT-compiled
+into a single fused (dot + norm + divide) kernel parallelised over rows;
+otherwise the same results are computed with plain NumPy.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional: pip install "engram[speedups]"
+    njit = None
+
+# Below this many rows the thread fan-out costs more than it saves
+_NUMBA_MIN_ROWS = 64
+
+if njit is not None:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _cosine_scores_jit(q, matrix, norms):
+        n, d = matrix.shape
+        q_norm = 0.0
+        for j in range(d):
+            q_norm += q[j] * q[j]
+        q_norm = np.sqrt(q_norm)
+
+        out = np.zeros(n, dtype=np.float32)
+        for i in prange(n):
+            denom = norms[i] * q_norm
+            if denom > 0.0:
+                acc = 0.0
+                for j in range(d):
+                    acc += matrix[i, j] * q[j]
+                out[i] = acc / denom
+        return out
+
+
+def cosine_scores(q: np.ndarray, matrix: np.ndarray, norms: np.ndarray) -> np.ndarray:
+    """Cosine similarity of `q` against every row of `matrix` (zero-norm rows score 0)."""
+    if njit is not None and matrix.shape[0] >= _NUMBA_MIN_ROWS:
+        return _cosine_scores_jit(q, matrix, norms)
+
+    denom = norms * np.float32(np.linalg.norm(q))
+    return np.divide(matrix @ q, denom, out=np.zeros_like(denom), where=denom > 0)
+
+
+def topk_cosine(q: np.ndarray, matrix: np.ndarray, norms: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and scores of the `k` most similar rows, best first."""
+    scores = cosine_scores(q, matrix, norms)
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if k < scores.shape[0]:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(scores.shape[0])
+    idx = idx[np.argsort(-scores[idx], kind="stable")]
+    return idx, scores[idx]
@@ -0,0 +1,94 @@
+"""
+Cache of parsed echo LLM responses.
+
+Entries are keyed by blake2b("llm|depth|content"), so repeated or re-echoed
+memories don't go back to the LLM. Hot entries live in an in-process LRU
+(as JSON, so every hit hands out a fresh dict); with a db_path they are
+also kept in an echo_cache table in SQLite and survive restarts.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from engram.utils import fastjson
+
+
+class EchoCache:
+    def __init__(self, max_size: int = 2048, db_path: Optional[str] = None, namespace: str = ""):
+        self.max_size = max(1, int(max_size))
+        self._prefix = f"{namespace}|"
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS echo_cache (
+                        key TEXT PRIMARY KEY,
+                        response TEXT NOT NULL,
+                        created_at TEXT
+                    )
+                    """
+                )
+
+    @classmethod
+    def for_llm(cls, llm, max_size: int, db_path: Optional[str] = None) -> "EchoCache":
+        """Build a cache namespaced by the LLM's class and model."""
+        config = getattr(llm, "config", None) or {}
+        model = getattr(llm, "model", None) or config.get("model", "")
+        return cls(max_size, db_path, f"{type(llm).__name__}|{model}")
+
+    def _key(self, content: str, depth: str) -> str:
+        text = f"{self._prefix}{depth}|{content}"
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, content: str, depth: str) -> Optional[Dict[str, Any]]:
+        key = self._key(content, depth)
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            elif self._conn is not None:
+                row = self._conn.execute("SELECT response FROM echo_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                response = row[0]
+                self._remember(key, response)
+            else:
+                return None
+        return fastjson.loads(response)
+
+    def put(self, content: str, depth: str, parsed: Dict[str, Any]) -> None:
+        key = self._key(content, depth)
+        response = fastjson.dumps(parsed)
+        with self._lock:
+            self._remember(key, response)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO echo_cache (key, response, created_at) VALUES (?, ?, ?)",
+                        (key, response, datetime.utcnow().isoformat()),
+                    )
+
+    def _remember(self, key: str, response: str) -> None:
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,75 @@
+"""
+Persistent embedding cache for category text.
+
+Vectors are stored as float32 blobs in SQLite, keyed by
+sha256("provider|model|text"), so restarts and re-created categories don't
+re-embed text the configured model has already seen. Switching provider or
+model changes every key, so old and new vectors never mix.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+
+class EmbeddingCache:
+    def __init__(self, db_path: str, provider: str, model: str):
+        self.db_path = db_path
+        self.provider = provider
+        self.model = model
+        self._prefix = f"{provider}|{model}|"
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    created_at TEXT
+                )
+                """
+            )
+
+    @classmethod
+    def for_embedder(cls, db_path: str, embedder) -> "EmbeddingCache":
+        """Build a cache namespaced by the embedder's class and model settings."""
+        config = getattr(embedder, "config", None) or {}
+        model = getattr(embedder, "model", None) or config.get("model", "")
+        dims = config.get("embedding_dims") or config.get("dimensions")
+        if dims:
+            model = f"{model}@{dims}"
+        return cls(db_path, type(embedder).__name__, model)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256((self._prefix + text).encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embedding_cache WHERE key = ?", (self._key(text),)
+            ).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put(self, text: str, vector) -> None:
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embedding_cache (key, vector, created_at) VALUES (?, ?, ?)",
+                (self._key(text), blob, datetime.utcnow().isoformat()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -18,16 +18,49 @@ Frequently accessed categories strengthen, unused ones fade and merge.
 
 from __future__ import annotations
 
-import json
+import asyncio
+import heapq
 import logging
-import uuid
+import math
+import re
+import itertools
+import secrets
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from engram.core._category_kernels import cosine_scores, topk_cosine
+from engram.core._embed_cache import EmbeddingCache
+from engram.core.semcache import SemCache
+from engram.utils import fastjson
+from engram.utils.compat import DATACLASS_SLOTS
+from engram.utils.prompts import render_prompt
+
+try:
+    import hnswlib
+except ImportError:  # Optional: pip install "engram[speedups]"
+    hnswlib = None
 
 logger = logging.getLogger(__name__)
 
+_TOKEN_RE = re.compile(r"\w+")
+
+# Re-rank categories by access count after this many accesses
+_POPULARITY_RESORT_EVERY = 64
+
+
+def _normalize_keywords(keywords: List[str]) -> List[str]:
+    """Canonical (lowercase, trimmed) keywords, so matching never re-lowercases."""
+    return [kw.strip().lower() for kw in keywords]
+
 
 class CategoryType(str, Enum):
     """Types of memory categories."""
@@ -42,7 +75,7 @@ class CategoryType(str, Enum):
     DYNAMIC = "dynamic"            # Auto-generated from content
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Category:
     """A memory category with hierarchical structure."""
     id: str
@@ -62,7 +95,7 @@ class Category:
     created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
 
     # Semantic representation
-    embedding: Optional[List[float]] = None  # Category's semantic vector
+    embedding: Optional[np.ndarray] = field(default=None, compare=False)  # Semantic vector (float32 unless configured otherwise)
     keywords: List[str] = field(default_factory=list)
 
     # Summary
@@ -75,6 +108,15 @@ class Category:
     # Decay tracking
     strength: float = 1.0  # Category strength (decays like memories)
 
+    # Cached L2 norm of `embedding` and parsed `last_accessed` (not persisted)
+    _norm: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _last_accessed_ts: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _last_accessed_src: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.embedding is not None and not isinstance(self.embedding, np.ndarray):
+            self.embedding = np.asarray(self.embedding, dtype=np.float32) if len(self.embedding) else None
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
@@ -88,7 +130,7 @@ class Category:
             "access_count": self.access_count,
             "last_accessed": self.last_accessed,
             "created_at": self.created_at,
-            "embedding": self.embedding,
+            "embedding": self.embedding.tolist() if self.embedding is not None else None,
             "keywords": self.keywords,
             "summary": self.summary,
             "summary_updated_at": self.summary_updated_at,
@@ -111,7 +153,7 @@ class Category:
             last_accessed=data.get("last_accessed"),
             created_at=data.get("created_at", datetime.utcnow().isoformat()),
             embedding=data.get("embedding"),
-            keywords=data.get("keywords", []),
+            keywords=_normalize_keywords(data.get("keywords", [])),
             summary=data.get("summary"),
             summary_updated_at=data.get("summary_updated_at"),
             related_ids=data.get("related_ids", []),
@@ -126,7 +168,7 @@ class Category:
         return self.total_strength / self.memory_count
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class CategoryMatch:
     """Result of matching content to a category."""
     category_id: str
@@ -136,7 +178,7 @@ class CategoryMatch:
     suggested_parent_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class CategoryTreeNode:
     """Node in the category hierarchy tree."""
     category: Category
@@ -171,6 +213,37 @@ Return JSON:
 }}
 """
 
+CATEGORY_BATCH_DETECTION_PROMPT = """Analyze each numbered memory below and determine its category.
+
+Memories:
+{contents}
+
+Existing Categories:
+{existing_categories}
+
+Instructions:
+1. If a memory fits an existing category, return that category's ID
+2. If it fits a sub-category of an existing one, suggest creating a child category
+3. If it's entirely new, suggest a new category name and description
+4. Memories about the same new topic should share one new category name
+
+Return a JSON array with one object per memory:
+[
+    {{
+        "id": memory_number,
+        "action": "use_existing" | "create_child" | "create_new",
+        "category_id": "existing_category_id or null",
+        "new_category": {{
+            "name": "Category Name (2-4 words)",
+            "description": "Brief description",
+            "keywords": ["keyword1", "keyword2", "keyword3"],
+            "parent_id": "parent_category_id or null"
+        }},
+        "confidence": 0.0-1.0
+    }}
+]
+"""
+
 CATEGORY_SUMMARY_PROMPT = """Generate a concise summary for this memory category.
 
 Category: {category_name}
@@ -255,9 +328,88 @@ class CategoryProcessor:
         self.embedder = embedder
         self.config = config or {}
 
+        # Optional on-disk cache of category name/description embeddings
+        cache_path = self.config.get("embedding_cache_path")
+        self._embed_cache: Optional[EmbeddingCache] = (
+            EmbeddingCache.for_embedder(cache_path, embedder) if cache_path and embedder else None
+        )
+
+        # Category embeddings are kept as float32 arrays; "float16" halves
+        # that again at a small precision cost (similarity math stays float32)
+        self._embedding_dtype = np.dtype(self.config.get("embedding_dtype", "float32"))
+
+        # Category ids: random per-processor prefix + monotonic counter, unique
+        # within the process by construction and across restarts by the prefix
+        self._cat_id_prefix = secrets.token_hex(3)
+        self._cat_id_counter = itertools.count()
+
+        # Guards category state mutations (ingestion, decay and merges may run
+        # from different threads)
+        self._lock = threading.RLock()
+
         # In-memory category cache (persisted to DB by Memory class)
         self.categories: Dict[str, Category] = {}
 
+        # Stacked (N, d) matrix of category embeddings for batched cosine,
+        # rebuilt lazily whenever categories are added or removed
+        self._cat_matrix: Optional[np.ndarray] = None
+        self._cat_norms: Optional[np.ndarray] = None
+        self._cat_matrix_ids: List[str] = []
+        self._matrix_dirty = True
+
+        # Optional HNSW index for sublinear category matching, built lazily
+        # once the number of embedded categories crosses the threshold
+        self._hnsw_threshold = int(self.config.get("hnsw_threshold", 128))
+        self._hnsw_index = None
+        self._hnsw_labels: Dict[str, int] = {}
+        self._hnsw_id_map: Dict[int, str] = {}
+        self._hnsw_next_label = 0
+
+        # Rendered "existing categories" prompt fragment, re-rendered only
+        # when categories are added, removed or merged. A positive
+        # max_prompt_categories keeps just the strongest ones in the prompt.
+        self._existing_cats_cache: Optional[str] = None
+        self._existing_cats_dirty = True
+        self._max_prompt_categories = int(self.config.get("max_prompt_categories", 0))
+
+        # When the content embedding is known, list only the k most similar
+        # categories (plus ancestors and roots) in detection prompts (0 = all)
+        self._prompt_top_k = int(self.config.get("prompt_top_k", 10))
+
+        # Semantic cache of LLM detection answers keyed by content embedding
+        cache_size = int(self.config.get("llm_cache_size", 1024))
+        self._llm_cache: Optional[SemCache] = (
+            SemCache(cache_size, float(self.config.get("llm_cache_threshold", 0.92)))
+            if cache_size > 0 else None
+        )
+
+        # Max parallel LLM requests for batch detection/summaries
+        self._llm_concurrency = max(1, int(self.config.get("llm_concurrency", 4)))
+
+        # Inverted keyword index: single-token keyword -> category ids.
+        # Multi-word keywords can't be matched per token, so they are kept
+        # in a separate (small) phrase index checked by substring.
+        self._kw_index: Dict[str, Set[str]] = {}
+        self._phrase_index: Dict[str, Set[str]] = {}
+        # Exact keyword string -> category ids, for the keyword-overlap bonus
+        # in find_related_categories (which compares whole keywords, "&" included)
+        self._exact_kw_index: Dict[str, Set[str]] = {}
+
+        # Popularity order for the keyword scan, re-sorted every
+        # _POPULARITY_RESORT_EVERY accesses or when categories change
+        self._popularity: Dict[str, int] = {}
+        self._popularity_dirty = True
+        self._accesses_since_sort = 0
+
+        # Ids of categories holding memories (an ordered set), kept in step
+        # with memory_count so callers needn't scan every category
+        self._active_ids: Dict[str, None] = {}
+
+        # Ids changed or removed since the last pop_changes(), so saves
+        # write only those (ordered sets)
+        self._changed_ids: Dict[str, None] = {}
+        self._removed_ids: Dict[str, None] = {}
+
         # Initialize root categories
         self._init_root_categories()
 
@@ -265,22 +417,45 @@ class CategoryProcessor:
         """Initialize built-in root categories."""
         for cat_id, name, desc, cat_type in self.ROOT_CATEGORIES:
             if cat_id not in self.categories:
-                self.categories[cat_id] = Category(
+                cat = Category(
                     id=cat_id,
                     name=name,
                     description=desc,
                     category_type=cat_type,
                     keywords=name.lower().split() + desc.lower().split()[:5],
                 )
+                self.categories[cat_id] = cat
+                self._index_keywords(cat)
+                self._mark_changed(cat_id)
 
     def load_categories(self, categories_data: List[Dict[str, Any]]):
         """Load categories from database."""
-        for data in categories_data:
-            cat = Category.from_dict(data)
-            self.categories[cat.id] = cat
-
-        # Ensure root categories exist
-        self._init_root_categories()
+        with self._lock:
+            for data in categories_data:
+                cat = Category.from_dict(data)
+                if cat.embedding is not None:
+                    cat.embedding = cat.embedding.astype(self._embedding_dtype, copy=False)
+                self.categories[cat.id] = cat
+                self._track_active(cat)
+                self._changed_ids.pop(cat.id, None)  # Matches the stored row
+
+            # Ensure root categories exist
+            self._init_root_categories()
+            self._matrix_dirty = True
+            self._existing_cats_dirty = True
+            self._popularity_dirty = True
+            # Rebuilt lazily from the loaded categories; the label maps
+            # belong to the old index and go with it
+            self._hnsw_index = None
+            self._hnsw_labels = {}
+            self._hnsw_id_map = {}
+            self._hnsw_next_label = 0
+
+            self._kw_index = {}
+            self._phrase_index = {}
+            self._exact_kw_index = {}
+            for cat in self.categories.values():
+                self._index_keywords(cat)
 
     def detect_category(
         self,
@@ -303,50 +478,189 @@ class CategoryProcessor:
         Returns:
             CategoryMatch with category info
         """
+        return self.detect_categories_batch([content], [metadata], use_llm=use_llm)[0]
+
+    def detect_categories_batch(
+        self,
+        contents: List[str],
+        metadatas: Optional[List[Optional[Dict[str, Any]]]] = None,
+        use_llm: bool = True,
+    ) -> List[CategoryMatch]:
+        """
+        Detect categories for many contents at once.
+
+        Keyword/embedding matching runs per item; the items that still need
+        the LLM are sent concurrently (up to `llm_concurrency` requests in
+        flight) and their responses applied in order.
+
+        Returns:
+            One CategoryMatch per content, in input order
+        """
+        results, pending, embeddings = self._triage(contents, use_llm)
+
+        if pending:
+            prompt_cats = {i: self._prompt_categories([embeddings.get(i)]) for i in pending}
+            responses = self._map_llm(
+                lambda i: self._llm_detection_response(contents[i], prompt_cats[i]),
+                pending,
+            )
+            created: Dict[str, str] = {}
+            for i, response in zip(pending, responses):
+                match = self._parse_llm_detection(response, created)
+                self._remember_detection(embeddings.get(i), match)
+                results[i] = match or self._fallback_match(None, 0.0)
+
+        return results
+
+    async def adetect_categories(self, contents: List[str], use_llm: bool = True) -> List[CategoryMatch]:
+        """
+        Async batch detection using a single multi-item LLM prompt.
+
+        Items resolved by keyword/embedding matching skip the LLM; the rest
+        are listed with numeric ids in one prompt and the JSON array response
+        is mapped back. Falls back to per-item requests if the array can't
+        be parsed.
+        """
+        results, pending, embeddings = self._triage(contents, use_llm)
+        if not pending:
+            return results
+
+        existing_cats = self._prompt_categories([embeddings.get(i) for i in pending])
+        prompt = render_prompt(
+            CATEGORY_BATCH_DETECTION_PROMPT,
+            contents="\n".join(f"{n}. {contents[i][:500]}" for n, i in enumerate(pending)),
+            existing_categories=existing_cats,
+        )
+
+        items: Optional[List[Any]] = None
+        try:
+            response = await asyncio.to_thread(self.llm.generate, prompt)
+            span = fastjson.extract_json(response, "[", "]")
+            if span:
+                parsed = fastjson.loads(span)
+                if isinstance(parsed, list):
+                    items = parsed
+        except Exception as e:
+            logger.warning(f"Batch LLM category detection failed: {e}")
+
+        if items is None:
+            responses = await asyncio.to_thread(
+                self._map_llm,
+                lambda i: self._llm_detection_response(contents[i], existing_cats),
+                pending,
+            )
+        else:
+            by_number: Dict[int, Dict[str, Any]] = {}
+            for item in items:
+                if isinstance(item, dict):
+                    try:
+                        by_number[int(item.get("id"))] = item
+                    except (TypeError, ValueError):
+                        continue
+            responses = [by_number.get(n) for n in range(len(pending))]
+
+        created: Dict[str, str] = {}
+        for i, response in zip(pending, responses):
+            match = None
+            if isinstance(response, dict):
+                try:
+                    match = self._apply_llm_detection(response, created)
+                except Exception as e:
+                    logger.warning(f"LLM category detection failed: {e}")
+            elif response:
+                match = self._parse_llm_detection(response, created)
+            self._remember_detection(embeddings.get(i), match)
+            results[i] = match or self._fallback_match(None, 0.0)
+        return results
+
+    def _triage(
+        self,
+        contents: List[str],
+        use_llm: bool,
+    ) -> Tuple[List[Optional[CategoryMatch]], List[int], Dict[int, Optional[List[float]]]]:
+        """
+        Resolve what can be resolved without calling the LLM.
+
+        Returns the partially filled results, the indices still needing the
+        LLM, and their content embeddings (for the response cache).
+        """
+        results: List[Optional[CategoryMatch]] = [None] * len(contents)
+        pending: List[int] = []
+        embeddings: Dict[int, Optional[List[float]]] = {}
+
+        for i, content in enumerate(contents):
+            best_match, best_score, embedding = self._quick_match(content)
+
+            # If good keyword/embedding match, use it
+            if best_match and best_score >= 0.6:
+                results[i] = CategoryMatch(
+                    category_id=best_match.id,
+                    category_name=best_match.name,
+                    confidence=best_score,
+                )
+                continue
+
+            # Phase 3: Use LLM for detection/creation
+            if use_llm and self.llm:
+                cached = self._cached_detection(embedding)
+                if cached:
+                    results[i] = cached
+                else:
+                    pending.append(i)
+                    embeddings[i] = embedding
+                continue
+
+            results[i] = self._fallback_match(best_match, best_score)
+
+        return results, pending, embeddings
+
+    def _quick_match(self, content: str) -> Tuple[Optional[Category], float, Optional[List[float]]]:
+        """Best category from keyword matching, then embedding similarity.
+
+        Also returns the content embedding when one was computed.
+        """
         content_lower = content.lower()
 
         # Phase 1: Quick keyword matching
         best_match = None
         best_score = 0.0
 
-        for cat in self.categories.values():
-            score = self._keyword_match_score(content_lower, cat)
-            if score > best_score:
-                best_score = score
-                best_match = cat
+        # Candidates are scored most-popular first and the scan stops at the
+        # first one clearing the strong-match bar
+        with self._lock:
+            keyword_hits = self._keyword_hits(content_lower)
+            rank = self._popularity_rank()
+            for cat_id in sorted(keyword_hits, key=lambda cid: rank.get(cid, len(rank))):
+                cat = self.categories[cat_id]
+                score = self._keyword_match_score(keyword_hits[cat_id], cat)
+                if score > best_score:
+                    best_score = score
+                    best_match = cat
+                    if score >= 0.7:
+                        break
 
         # If strong keyword match, use it
         if best_match and best_score >= 0.7:
-            return CategoryMatch(
-                category_id=best_match.id,
-                category_name=best_match.name,
-                confidence=best_score,
-            )
+            return best_match, best_score, None
 
         # Phase 2: Embedding similarity (if available)
+        content_embedding = None
         if self.embedder:
-            content_embedding = self.embedder.embed(content, memory_action="categorize")
-
-            for cat in self.categories.values():
-                if cat.embedding:
-                    sim = self._cosine_similarity(content_embedding, cat.embedding)
-                    if sim > best_score:
-                        best_score = sim
-                        best_match = cat
-
-        # If good embedding match, use it
-        if best_match and best_score >= 0.6:
-            return CategoryMatch(
-                category_id=best_match.id,
-                category_name=best_match.name,
-                confidence=best_score,
-            )
-
-        # Phase 3: Use LLM for detection/creation
-        if use_llm and self.llm:
-            return self._llm_detect_category(content, metadata)
-
-        # Fallback: use best match or default to 'context'
+            content_embedding = self._cached_embed(content, "categorize")
+            with self._lock:
+                ann = self._ann_similarities(content_embedding, k=8)
+                ids, sims = ann if ann is not None else self._embedding_similarities(content_embedding)
+                if ids:
+                    idx = int(np.argmax(sims))
+                    if sims[idx] > best_score:
+                        best_score = float(sims[idx])
+                        best_match = self.categories[ids[idx]]
+
+        return best_match, best_score, content_embedding
+
+    @staticmethod
+    def _fallback_match(best_match: Optional[Category], best_score: float) -> CategoryMatch:
+        """Use the best weak match, or default to 'context'."""
         if best_match:
             return CategoryMatch(
                 category_id=best_match.id,
@@ -360,91 +674,462 @@ class CategoryProcessor:
             confidence=0.3,
         )
 
-    def _keyword_match_score(self, content_lower: str, category: Category) -> float:
-        """Calculate keyword match score between content and category."""
+    def _map_llm(self, fn, items: List[Any]) -> List[Any]:
+        """Run `fn` over items with bounded LLM concurrency, preserving order."""
+        if len(items) <= 1 or self._llm_concurrency == 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self._llm_concurrency, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    def _cached_embed(self, text: str, memory_action: str, persist: bool = False):
+        """Embed text through the embedder's in-process LRU (repeated search
+        queries hit it). With `persist`, for category text only, the
+        persistent embedding cache is consulted first, if configured."""
+        embed = getattr(self.embedder, "embed_cached", None) or self.embedder.embed
+        if not persist or self._embed_cache is None:
+            return embed(text, memory_action=memory_action)
+        try:
+            vector = self._embed_cache.get(text)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+            vector = None
+        if vector is None:
+            vector = embed(text, memory_action=memory_action)
+            try:
+                self._embed_cache.put(text, vector)
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+        return vector
+
+    def _popularity_rank(self) -> Dict[str, int]:
+        """Category id -> position by access count (0 = most accessed), re-sorted lazily."""
+        if self._popularity_dirty or self._accesses_since_sort >= _POPULARITY_RESORT_EVERY:
+            ordered = sorted(self.categories.values(), key=lambda c: c.access_count, reverse=True)
+            self._popularity = {cat.id: i for i, cat in enumerate(ordered)}
+            self._popularity_dirty = False
+            self._accesses_since_sort = 0
+        return self._popularity
+
+    def _keyword_match_score(self, hits: int, category: Category) -> float:
+        """Calculate keyword match score from the number of matched keywords."""
         if not category.keywords:
             return 0.0
 
-        matches = sum(1 for kw in category.keywords if kw.lower() in content_lower)
-        return min(1.0, matches / max(3, len(category.keywords) * 0.5))
+        return min(1.0, hits / max(3, len(category.keywords) * 0.5))
+
+    def _keyword_hits(self, content_lower: str) -> Counter:
+        """Count matched keywords per category using the inverted index."""
+        hits: Counter = Counter()
+        for token in set(_TOKEN_RE.findall(content_lower)):
+            hits.update(self._kw_index.get(token, ()))
+        for phrase, cat_ids in self._phrase_index.items():
+            if phrase in content_lower:
+                hits.update(cat_ids)
+        return hits
+
+    @staticmethod
+    def _keyword_terms(keywords: List[str]) -> Tuple[Set[str], Set[str]]:
+        """Split keywords into indexable single tokens and multi-word phrases."""
+        tokens: Set[str] = set()
+        phrases: Set[str] = set()
+        for kw in keywords:
+            parts = _TOKEN_RE.findall(kw)  # Keywords are lowercased on ingest
+            if len(parts) == 1:
+                tokens.add(parts[0])
+            elif parts:
+                phrases.add(" ".join(parts))
+        return tokens, phrases
+
+    def _index_keywords(self, cat: Category) -> None:
+        tokens, phrases = self._keyword_terms(cat.keywords)
+        for token in tokens:
+            self._kw_index.setdefault(token, set()).add(cat.id)
+        for phrase in phrases:
+            self._phrase_index.setdefault(phrase, set()).add(cat.id)
+        for keyword in cat.keywords:
+            self._exact_kw_index.setdefault(keyword, set()).add(cat.id)
+
+    def _unindex_keywords(self, cat: Category) -> None:
+        tokens, phrases = self._keyword_terms(cat.keywords)
+        terms_by_index = (
+            (self._kw_index, tokens),
+            (self._phrase_index, phrases),
+            (self._exact_kw_index, cat.keywords),
+        )
+        for index, terms in terms_by_index:
+            for term in terms:
+                cat_ids = index.get(term)
+                if cat_ids is not None:
+                    cat_ids.discard(cat.id)
+                    if not cat_ids:
+                        del index[term]
+
+    def _get_vec(self, cat: Category) -> Tuple[Optional[np.ndarray], float]:
+        """Return a category's embedding as float32 and its (cached) L2 norm."""
+        if cat.embedding is None:
+            return None, 0.0
+        vec = cat.embedding.astype(np.float32, copy=False)
+        if cat._norm is None:
+            cat._norm = float(np.linalg.norm(vec))
+        return vec, cat._norm
+
+    def _ensure_matrix(self, dim: int) -> Tuple[List[str], Optional[np.ndarray], Optional[np.ndarray]]:
+        """Stack embeddings of the given dimensionality into an (N, d) matrix."""
+        if self._matrix_dirty or (self._cat_matrix is not None and self._cat_matrix.shape[1] != dim):
+            ids: List[str] = []
+            vecs: List[np.ndarray] = []
+            norms: List[float] = []
+            for cat in self.categories.values():
+                vec, norm = self._get_vec(cat)
+                if vec is not None and vec.shape[0] == dim:
+                    ids.append(cat.id)
+                    vecs.append(vec)
+                    norms.append(norm)
+            self._cat_matrix_ids = ids
+            self._cat_matrix = np.vstack(vecs) if vecs else np.empty((0, dim), dtype=np.float32)
+            self._cat_norms = np.asarray(norms, dtype=np.float32)
+            self._matrix_dirty = False
+        return self._cat_matrix_ids, self._cat_matrix, self._cat_norms
+
+    def _embedding_similarities(self, query: List[float]) -> Tuple[List[str], np.ndarray]:
+        """Cosine similarity of a query vector against every category embedding."""
+        q = np.asarray(query, dtype=np.float32)
+        if q.ndim != 1 or q.shape[0] == 0:
+            return [], np.empty(0, dtype=np.float32)
+        ids, matrix, norms = self._ensure_matrix(q.shape[0])
+        if not ids:
+            return [], np.empty(0, dtype=np.float32)
+        return ids, cosine_scores(q, matrix, norms)
+
+    def _embedding_topk(self, query: List[float], k: int) -> List[Tuple[str, float]]:
+        """The `k` categories most similar to a query vector, best first."""
+        q = np.asarray(query, dtype=np.float32)
+        if q.ndim != 1 or q.shape[0] == 0:
+            return []
+        ids, matrix, norms = self._ensure_matrix(q.shape[0])
+        if not ids:
+            return []
+        idx, scores = topk_cosine(q, matrix, norms, k)
+        return [(ids[i], s) for i, s in zip(idx.tolist(), scores.tolist())]
+
+    def _keyword_neighbours(self, cat: Category) -> Set[str]:
+        """Ids of categories sharing at least one keyword with `cat`."""
+        neighbours: Set[str] = set()
+        for keyword in cat.keywords:
+            neighbours.update(self._exact_kw_index.get(keyword, ()))
+        neighbours.discard(cat.id)
+        return neighbours
+
+    def _pair_similarity(self, a: Category, b: Category) -> float:
+        """Cosine similarity of two categories' cached vectors."""
+        va, na = self._get_vec(a)
+        vb, nb = self._get_vec(b)
+        if va is None or vb is None or va.shape != vb.shape or na == 0 or nb == 0:
+            return 0.0
+        return float(np.dot(va, vb) / (na * nb))
 
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        if not vec1 or not vec2 or len(vec1) != len(vec2):
+    def _get_hnsw_index(self, dim: int):
+        """Return the HNSW index for `dim`-sized embeddings, building it if worthwhile."""
+        if hnswlib is None:
+            return None
+        if self._hnsw_index is not None:
+            return self._hnsw_index if self._hnsw_index.dim == dim else None
+
+        entries = []
+        for cat in self.categories.values():
+            vec, norm = self._get_vec(cat)
+            if vec is not None and norm > 0 and vec.shape[0] == dim:
+                entries.append((cat.id, vec))
+        if len(entries) < self._hnsw_threshold:
+            return None
+
+        index = hnswlib.Index(space="cosine", dim=dim)
+        index.init_index(max_elements=max(2 * len(entries), 256), ef_construction=200, M=16)
+        index.set_ef(64)
+        self._hnsw_index = index
+        self._hnsw_labels = {}
+        self._hnsw_id_map = {}
+        self._hnsw_next_label = 0
+        for cat_id, vec in entries:
+            self._hnsw_add(cat_id, vec)
+        return index
+
+    def _hnsw_add(self, cat_id: str, vec: np.ndarray) -> None:
+        index = self._hnsw_index
+        if index.get_current_count() >= index.get_max_elements():
+            index.resize_index(2 * index.get_max_elements())
+        label = self._hnsw_next_label
+        self._hnsw_next_label += 1
+        index.add_items(vec.reshape(1, -1), np.asarray([label]))
+        self._hnsw_labels[cat_id] = label
+        self._hnsw_id_map[label] = cat_id
+
+    def _ann_similarities(self, query: List[float], k: int = 8) -> Optional[Tuple[List[str], np.ndarray]]:
+        """Approximate top-k cosine matches via HNSW, or None to use brute force."""
+        q = np.asarray(query, dtype=np.float32)
+        if q.ndim != 1 or q.shape[0] == 0 or not np.any(q):
+            return None
+        index = self._get_hnsw_index(q.shape[0])
+        if index is None:
+            return None
+        k = min(k, len(self._hnsw_labels))
+        if k == 0:
+            return None
+        labels, distances = index.knn_query(q.reshape(1, -1), k=k)
+        ids = [self._hnsw_id_map[int(label)] for label in labels[0]]
+        return ids, (1.0 - distances[0]).astype(np.float32)
+
+    def _index_category(self, cat: Category) -> None:
+        """Register a new category with the keyword and similarity indexes."""
+        self._index_keywords(cat)
+        self._mark_changed(cat.id)
+        self._matrix_dirty = True
+        self._existing_cats_dirty = True
+        self._popularity_dirty = True
+        if self._hnsw_index is not None:
+            vec, norm = self._get_vec(cat)
+            if vec is not None and norm > 0 and vec.shape[0] == self._hnsw_index.dim:
+                self._hnsw_add(cat.id, vec)
+
+    def _mark_changed(self, *category_ids: str) -> None:
+        for category_id in category_ids:
+            self._changed_ids[category_id] = None
+            self._removed_ids.pop(category_id, None)
+
+    def has_changes(self) -> bool:
+        """Whether pop_changes() would return anything."""
+        return bool(self._changed_ids or self._removed_ids)
+
+    def pop_changes(self) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Categories changed since the last call (as dicts) and ids removed since then."""
+        with self._lock:
+            changed = [self.categories[cid].to_dict() for cid in self._changed_ids if cid in self.categories]
+            removed = list(self._removed_ids)
+            self._changed_ids = {}
+            self._removed_ids = {}
+            return changed, removed
+
+    def restore_changes(self, changed_ids: Iterable[str], removed_ids: Iterable[str]) -> None:
+        """Mark what pop_changes() returned as unsaved again, after a failed save.
+        Changes made since the pop take precedence."""
+        with self._lock:
+            for category_id in changed_ids:
+                if category_id in self.categories:
+                    self._changed_ids.setdefault(category_id, None)
+            for category_id in removed_ids:
+                if category_id not in self.categories:
+                    self._removed_ids.setdefault(category_id, None)
+
+    def _track_active(self, cat: Category) -> None:
+        if cat.memory_count > 0:
+            self._active_ids[cat.id] = None
+        else:
+            self._active_ids.pop(cat.id, None)
+
+    def _unindex_category(self, cat: Category) -> None:
+        """Drop a removed category from the keyword and similarity indexes."""
+        self._unindex_keywords(cat)
+        self._active_ids.pop(cat.id, None)
+        self._changed_ids.pop(cat.id, None)
+        self._removed_ids[cat.id] = None
+        self._matrix_dirty = True
+        self._existing_cats_dirty = True
+        self._popularity_dirty = True
+        label = self._hnsw_labels.pop(cat.id, None)
+        if label is not None:
+            self._hnsw_id_map.pop(label, None)
+            if self._hnsw_index is not None:
+                self._hnsw_index.mark_deleted(label)
+
+    def _cosine_similarity(
+        self,
+        vec1: List[float],
+        vec2: List[float],
+        norm1: Optional[float] = None,
+        norm2: Optional[float] = None,
+    ) -> float:
+        """Calculate cosine similarity between two vectors (norms may be passed in if cached)."""
+        if vec1 is None or vec2 is None or len(vec1) == 0 or len(vec2) == 0 or len(vec1) != len(vec2):
             return 0.0
 
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        norm1 = sum(a * a for a in vec1) ** 0.5
-        norm2 = sum(b * b for b in vec2) ** 0.5
+        a = np.asarray(vec1, dtype=np.float32)
+        b = np.asarray(vec2, dtype=np.float32)
+        norm1 = float(np.linalg.norm(a)) if norm1 is None else norm1
+        norm2 = float(np.linalg.norm(b)) if norm2 is None else norm2
 
         if norm1 == 0 or norm2 == 0:
             return 0.0
 
-        return dot_product / (norm1 * norm2)
+        return float(np.dot(a, b)) / (norm1 * norm2)
+
+    def _render_existing_cats(self) -> str:
+        """Existing categories formatted for detection prompts (cached)."""
+        if self._existing_cats_dirty or self._existing_cats_cache is None:
+            cats = list(self.categories.values())
+            if 0 < self._max_prompt_categories < len(cats):
+                cats = sorted(cats, key=lambda c: c.strength, reverse=True)[: self._max_prompt_categories]
+            self._existing_cats_cache = "\n".join([
+                f"- {cat.id}: {cat.name} - {cat.description}"
+                for cat in cats
+            ])
+            self._existing_cats_dirty = False
+        return self._existing_cats_cache
+
+    def _prompt_categories(self, content_embeddings: List[Optional[List[float]]]) -> str:
+        """
+        Categories to list in a detection prompt.
+
+        With `prompt_top_k` set and embeddings available, only the top-k most
+        similar categories per item (plus their ancestors and the root
+        categories, as a fallback) are listed; otherwise the full cached list.
+        """
+        if self._prompt_top_k <= 0 or not content_embeddings or any(e is None for e in content_embeddings):
+            return self._render_existing_cats()
+
+        with self._lock:
+            selected: Dict[str, None] = {
+                cat.id: None for cat in self.categories.values() if cat.category_type != CategoryType.DYNAMIC
+            }
+            for embedding in content_embeddings:
+                for cat_id, _ in self._embedding_topk(embedding, self._prompt_top_k):
+                    # Walk up to the root so child suggestions have a parent to name
+                    while cat_id and cat_id in self.categories and cat_id not in selected:
+                        selected[cat_id] = None
+                        cat_id = self.categories[cat_id].parent_id
+
+            return "\n".join([
+                f"- {cat.id}: {cat.name} - {cat.description}"
+                for cat in (self.categories[cat_id] for cat_id in selected)
+            ])
 
     def _llm_detect_category(
         self,
         content: str,
         metadata: Optional[Dict[str, Any]] = None,
+        existing_cats: Optional[str] = None,
+        content_embedding: Optional[List[float]] = None,
     ) -> CategoryMatch:
         """Use LLM to detect or create category."""
-        # Format existing categories for prompt
-        existing_cats = "\n".join([
-            f"- {cat.id}: {cat.name} - {cat.description}"
-            for cat in self.categories.values()
-        ])
-
-        prompt = CATEGORY_DETECTION_PROMPT.format(
+        cached = self._cached_detection(content_embedding)
+        if cached:
+            return cached
+
+        if existing_cats is None:
+            existing_cats = self._prompt_categories([content_embedding])
+        response = self._llm_detection_response(content, existing_cats)
+        match = self._parse_llm_detection(response)
+        self._remember_detection(content_embedding, match)
+        return match or self._fallback_match(None, 0.0)
+
+    def _cached_detection(self, content_embedding: Optional[List[float]]) -> Optional[CategoryMatch]:
+        """Reuse the LLM's answer for semantically near-identical content."""
+        if self._llm_cache is None or content_embedding is None:
+            return None
+        cached = self._llm_cache.get(content_embedding)
+        if cached is None:
+            return None
+        cat_id, confidence = cached
+        cat = self.categories.get(cat_id)
+        if cat is None:
+            return None  # Category merged/decayed away since it was cached
+        return CategoryMatch(category_id=cat.id, category_name=cat.name, confidence=confidence)
+
+    def _remember_detection(self, content_embedding: Optional[List[float]], match: Optional[CategoryMatch]) -> None:
+        if self._llm_cache is not None and content_embedding is not None and match:
+            self._llm_cache.put(content_embedding, (match.category_id, match.confidence))
+
+    def _llm_detection_response(self, content: str, existing_cats: Optional[str] = None) -> str:
+        """Ask the LLM to categorize one piece of content. Safe to call from worker threads."""
+        if existing_cats is None:
+            existing_cats = self._render_existing_cats()
+
+        prompt = render_prompt(
+            CATEGORY_DETECTION_PROMPT,
             content=content[:500],  # Truncate for efficiency
             existing_categories=existing_cats,
         )
 
         try:
-            response = self.llm.generate(prompt)
+            return self.llm.generate(prompt)
+        except Exception as e:
+            logger.warning(f"LLM category detection failed: {e}")
+            return ""
 
+    def _parse_llm_detection(
+        self,
+        response: str,
+        created: Optional[Dict[str, str]] = None,
+    ) -> Optional[CategoryMatch]:
+        """Turn an LLM detection response into a CategoryMatch (None if unusable)."""
+        try:
             # Parse JSON response
-            json_start = response.find("{")
-            json_end = response.rfind("}") + 1
-            if json_start >= 0 and json_end > json_start:
-                data = json.loads(response[json_start:json_end])
-
-                action = data.get("action", "use_existing")
-                confidence = float(data.get("confidence", 0.5))
-
-                if action == "use_existing" and data.get("category_id"):
-                    cat_id = data["category_id"]
-                    if cat_id in self.categories:
-                        return CategoryMatch(
-                            category_id=cat_id,
-                            category_name=self.categories[cat_id].name,
-                            confidence=confidence,
-                        )
-
-                if action in ("create_child", "create_new") and data.get("new_category"):
-                    new_cat = data["new_category"]
-                    cat_id = self._create_category(
-                        name=new_cat.get("name", "Unnamed"),
-                        description=new_cat.get("description", ""),
-                        keywords=new_cat.get("keywords", []),
-                        parent_id=new_cat.get("parent_id"),
-                    )
-                    return CategoryMatch(
-                        category_id=cat_id,
-                        category_name=new_cat.get("name", "Unnamed"),
-                        confidence=confidence,
-                        is_new=True,
-                        suggested_parent_id=new_cat.get("parent_id"),
-                    )
+            span = fastjson.extract_json(response)
+            if span:
+                data = fastjson.loads(span)
+                return self._apply_llm_detection(data, created)
 
         except Exception as e:
             logger.warning(f"LLM category detection failed: {e}")
 
-        # Fallback
-        return CategoryMatch(
-            category_id="context",
-            category_name="Context & Situations",
-            confidence=0.3,
-        )
+        return None
+
+    def _apply_llm_detection(
+        self,
+        data: Dict[str, Any],
+        created: Optional[Dict[str, str]] = None,
+    ) -> Optional[CategoryMatch]:
+        """
+        Apply one parsed detection result, creating a category if asked.
+
+        `created` maps lowercased names to ids of categories created earlier
+        in the same batch, so parallel answers don't create duplicates.
+        """
+        action = data.get("action", "use_existing")
+        confidence = float(data.get("confidence", 0.5))
+
+        if action == "use_existing" and data.get("category_id"):
+            cat_id = data["category_id"]
+            if cat_id in self.categories:
+                return CategoryMatch(
+                    category_id=cat_id,
+                    category_name=self.categories[cat_id].name,
+                    confidence=confidence,
+                )
+
+        if action in ("create_child", "create_new") and data.get("new_category"):
+            new_cat = data["new_category"]
+            name = new_cat.get("name", "Unnamed")
+            key = name.strip().lower()
+            if created is not None and created.get(key) in self.categories:
+                return CategoryMatch(
+                    category_id=created[key],
+                    category_name=self.categories[created[key]].name,
+                    confidence=confidence,
+                )
+
+            cat_id = self._create_category(
+                name=name,
+                description=new_cat.get("description", ""),
+                keywords=new_cat.get("keywords", []),
+                parent_id=new_cat.get("parent_id"),
+            )
+            if created is not None:
+                created[key] = cat_id
+            return CategoryMatch(
+                category_id=cat_id,
+                category_name=name,
+                confidence=confidence,
+                is_new=True,
+                suggested_parent_id=new_cat.get("parent_id"),
+            )
+
+        return None
+
+    def _next_category_id(self) -> str:
+        cat_id = f"cat_{self._cat_id_prefix}{next(self._cat_id_counter):02x}"
+        while cat_id in self.categories:  # Only possible on a prefix collision with loaded ids
+            cat_id = f"cat_{self._cat_id_prefix}{next(self._cat_id_counter):02x}"
+        return cat_id
 
     def _create_category(
         self,
@@ -454,32 +1139,39 @@ class CategoryProcessor:
         parent_id: str = None,
     ) -> str:
         """Create a new category."""
-        cat_id = f"cat_{uuid.uuid4().hex[:8]}"
+        cat_id = self._next_category_id()
 
         # Generate embedding for category
         embedding = None
         if self.embedder:
             embedding_text = f"{name}. {description}"
-            embedding = self.embedder.embed(embedding_text, memory_action="categorize")
-
-        category = Category(
-            id=cat_id,
-            name=name,
-            description=description,
-            category_type=CategoryType.DYNAMIC,
-            parent_id=parent_id,
-            keywords=keywords or [],
-            embedding=embedding,
-        )
+            embedding = np.asarray(
+                self._cached_embed(embedding_text, "categorize", persist=True),
+                dtype=self._embedding_dtype,
+            )
 
-        self.categories[cat_id] = category
+        with self._lock:
+            category = Category(
+                id=cat_id,
+                name=name,
+                description=description,
+                category_type=CategoryType.DYNAMIC,
+                parent_id=parent_id,
+                keywords=_normalize_keywords(keywords or []),
+                embedding=embedding,
+            )
 
-        # Update parent's children list
-        if parent_id and parent_id in self.categories:
-            self.categories[parent_id].children_ids.append(cat_id)
+            self.categories[cat_id] = category
+            self._get_vec(category)  # Cache the embedding norm up front
+            self._index_category(category)
 
-        logger.info(f"Created new category: {cat_id} - {name}")
-        return cat_id
+            # Update parent's children list
+            if parent_id and parent_id in self.categories:
+                self.categories[parent_id].children_ids.append(cat_id)
+                self._mark_changed(parent_id)
+
+            logger.info(f"Created new category: {cat_id} - {name}")
+            return cat_id
 
     def update_category_stats(
         self,
@@ -488,43 +1180,75 @@ class CategoryProcessor:
         is_addition: bool = True,
     ):
         """Update category statistics when memory is added/removed."""
-        if category_id not in self.categories:
-            return
+        with self._lock:
+            if category_id not in self.categories:
+                return
 
-        cat = self.categories[category_id]
+            cat = self.categories[category_id]
 
-        if is_addition:
-            cat.memory_count += 1
-            cat.total_strength += memory_strength
-        else:
-            cat.memory_count = max(0, cat.memory_count - 1)
-            cat.total_strength = max(0, cat.total_strength - memory_strength)
+            if is_addition:
+                cat.memory_count += 1
+                cat.total_strength += memory_strength
+            else:
+                cat.memory_count = max(0, cat.memory_count - 1)
+                cat.total_strength = max(0, cat.total_strength - memory_strength)
+            self._track_active(cat)
+            self._mark_changed(category_id)
 
-        # Invalidate summary
-        cat.summary = None
-        cat.summary_updated_at = None
+            # Invalidate summary
+            cat.summary = None
+            cat.summary_updated_at = None
 
     def access_category(self, category_id: str):
         """Record access to a category."""
-        if category_id not in self.categories:
-            return
-
-        cat = self.categories[category_id]
-        cat.access_count += 1
-        cat.last_accessed = datetime.utcnow().isoformat()
-
-        # Strengthen category on access (bio-inspired)
-        cat.strength = min(1.0, cat.strength + 0.02)
+        with self._lock:
+            if category_id not in self.categories:
+                return
+
+            cat = self.categories[category_id]
+            cat.access_count += 1
+            self._accesses_since_sort += 1
+            now = datetime.utcnow()
+            cat.last_accessed = now.isoformat()
+            cat._last_accessed_src = cat.last_accessed
+            cat._last_accessed_ts = now.replace(tzinfo=timezone.utc).timestamp()
+
+            # Strengthen category on access (bio-inspired)
+            cat.strength = min(1.0, cat.strength + 0.02)
+            self._mark_changed(category_id)
 
     def generate_summary(self, category_id: str, memories: List[Dict[str, Any]]) -> str:
         """Generate or update summary for a category."""
         if category_id not in self.categories:
             return ""
 
-        cat = self.categories[category_id]
-
         if not memories:
-            return f"Empty category: {cat.description}"
+            return f"Empty category: {self.categories[category_id].description}"
+
+        summary = self._llm_summary(category_id, memories)
+        return self._store_summary(category_id, memories, summary)
+
+    def generate_summaries(self, memories_by_category: Dict[str, List[Dict[str, Any]]]) -> Dict[str, str]:
+        """
+        Generate summaries for several categories with concurrent LLM calls.
+
+        Returns:
+            Dict mapping category id to summary
+        """
+        targets = [cid for cid, mems in memories_by_category.items() if cid in self.categories and mems]
+        responses = self._map_llm(lambda cid: self._llm_summary(cid, memories_by_category[cid]), targets)
+
+        summaries: Dict[str, str] = {}
+        for cid, summary in zip(targets, responses):
+            summaries[cid] = self._store_summary(cid, memories_by_category[cid], summary)
+        for cid, mems in memories_by_category.items():
+            if cid in self.categories and not mems:
+                summaries[cid] = f"Empty category: {self.categories[cid].description}"
+        return summaries
+
+    def _llm_summary(self, category_id: str, memories: List[Dict[str, Any]]) -> Optional[str]:
+        """Ask the LLM for a category summary; None on failure."""
+        cat = self.categories[category_id]
 
         # Format memories for prompt
         memories_text = "\n".join([
@@ -532,20 +1256,28 @@ class CategoryProcessor:
             for m in memories[:20]  # Limit to 20 for efficiency
         ])
 
-        prompt = CATEGORY_SUMMARY_PROMPT.format(
+        prompt = render_prompt(
+            CATEGORY_SUMMARY_PROMPT,
             category_name=cat.name,
             category_description=cat.description,
             memories=memories_text,
         )
 
         try:
-            summary = self.llm.generate(prompt)
-            cat.summary = summary.strip()
-            cat.summary_updated_at = datetime.utcnow().isoformat()
-            return cat.summary
+            return self.llm.generate(prompt)
         except Exception as e:
             logger.warning(f"Summary generation failed for {category_id}: {e}")
+            return None
+
+    def _store_summary(self, category_id: str, memories: List[Dict[str, Any]], summary: Optional[str]) -> str:
+        cat = self.categories[category_id]
+        if summary is None:
             return f"Category with {len(memories)} memories about {cat.description}"
+        with self._lock:
+            cat.summary = summary.strip()
+            cat.summary_updated_at = datetime.utcnow().isoformat()
+            self._mark_changed(category_id)
+        return cat.summary
 
     def apply_category_decay(self, decay_rate: float = 0.05) -> Dict[str, Any]:
         """
@@ -560,53 +1292,82 @@ class CategoryProcessor:
         Returns:
             Stats about decayed/merged categories
         """
-        decayed = 0
-        merged = 0
-        deleted = 0
-
-        # Calculate decay for each dynamic category
-        weak_categories = []
+        with self._lock:
+            decayed = 0
+            merged = 0
+            deleted = 0
 
-        for cat in list(self.categories.values()):
-            if cat.category_type != CategoryType.DYNAMIC:
-                continue  # Don't decay root categories
+            # Calculate decay for each dynamic category (root categories don't decay)
+            weak_categories = []
+            now = time.time()
 
-            # Decay based on time since last access
+            for cat in self.categories.values():
+                if cat.category_type != CategoryType.DYNAMIC:
+                    continue
+
+                # Decay based on whole days since last access; categories never
+                # accessed (NaN timestamp) keep their strength
+                last_ts = self._last_access_ts(cat)
+                if not math.isnan(last_ts):
+                    days_since = (now - last_ts) // 86400.0
+                    strength = max(0.1, cat.strength - decay_rate * (days_since / 7))  # Weekly decay
+                    decayed += 1
+                    if strength != cat.strength:
+                        cat.strength = strength
+                        self._mark_changed(cat.id)
+
+                # Track weak categories for potential merging
+                if cat.strength < 0.3 and cat.memory_count < 3:
+                    weak_categories.append(cat)
+
+            # Try to merge weak categories
+            for cat in weak_categories:
+                if cat.id not in self.categories:
+                    continue  # Already merged
+
+                merge_target = self._find_merge_target(cat)
+                if merge_target:
+                    self._merge_categories(cat.id, merge_target.id)
+                    merged += 1
+                elif cat.memory_count == 0 and cat.strength < 0.15:
+                    # Delete empty, very weak categories
+                    del self.categories[cat.id]
+                    self._unindex_category(cat)
+                    deleted += 1
+
+            return {
+                "decayed": decayed,
+                "merged": merged,
+                "deleted": deleted,
+            }
+
+    @staticmethod
+    def _last_access_ts(cat: Category) -> float:
+        """POSIX timestamp of `cat.last_accessed`, parsed once and cached (NaN if unset/invalid)."""
+        if cat._last_accessed_src != cat.last_accessed or cat._last_accessed_ts is None:
+            ts = float("nan")
             if cat.last_accessed:
                 try:
-                    last_access = datetime.fromisoformat(cat.last_accessed)
-                    days_since = (datetime.utcnow() - last_access).days
-                    decay_amount = decay_rate * (days_since / 7)  # Weekly decay
-                    cat.strength = max(0.1, cat.strength - decay_amount)
-                    decayed += 1
-                except Exception:
+                    dt = datetime.fromisoformat(cat.last_accessed)
+                    if dt.tzinfo is None:
+                        dt = dt.replace(tzinfo=timezone.utc)  # Stored as naive UTC
+                    ts = dt.timestamp()
+                except (TypeError, ValueError):
                     pass
-
-            # Track weak categories for potential merging
-            if cat.strength < 0.3 and cat.memory_count < 3:
-                weak_categories.append(cat)
-
-        # Try to merge weak categories
-        for cat in weak_categories:
-            if cat.id not in self.categories:
-                continue  # Already merged
-
-            merge_target = self._find_merge_target(cat)
-            if merge_target:
-                self._merge_categories(cat.id, merge_target.id)
-                merged += 1
-            elif cat.memory_count == 0 and cat.strength < 0.15:
-                # Delete empty, very weak categories
-                del self.categories[cat.id]
-                deleted += 1
-
-        return {"decayed": decayed, "merged": merged, "deleted": deleted}
+            cat._last_accessed_src = cat.last_accessed
+            cat._last_accessed_ts = ts
+        return cat._last_accessed_ts
 
     def _find_merge_target(self, weak_cat: Category) -> Optional[Category]:
         """Find a suitable category to merge a weak one into."""
         best_target = None
         best_similarity = 0.0
 
+        sims_by_id: Dict[str, float] = {}
+        if weak_cat.embedding is not None:
+            ids, sims = self._embedding_similarities(weak_cat.embedding)
+            sims_by_id = dict(zip(ids, sims.tolist()))
+
         for cat in self.categories.values():
             if cat.id == weak_cat.id:
                 continue
@@ -614,11 +1375,10 @@ class CategoryProcessor:
                 continue  # Don't merge into another weak category
 
             # Check embedding similarity
-            if weak_cat.embedding and cat.embedding:
-                sim = self._cosine_similarity(weak_cat.embedding, cat.embedding)
-                if sim > best_similarity and sim > 0.7:
-                    best_similarity = sim
-                    best_target = cat
+            sim = sims_by_id.get(cat.id)
+            if sim is not None and sim > best_similarity and sim > 0.7:
+                best_similarity = sim
+                best_target = cat
 
             # Check keyword overlap
             if weak_cat.keywords and cat.keywords:
@@ -631,33 +1391,39 @@ class CategoryProcessor:
 
     def _merge_categories(self, source_id: str, target_id: str):
         """Merge source category into target."""
-        if source_id not in self.categories or target_id not in self.categories:
-            return
+        with self._lock:
+            if source_id not in self.categories or target_id not in self.categories:
+                return
 
-        source = self.categories[source_id]
-        target = self.categories[target_id]
+            source = self.categories[source_id]
+            target = self.categories[target_id]
 
-        # Transfer stats
-        target.memory_count += source.memory_count
-        target.total_strength += source.total_strength
-        target.access_count += source.access_count
+            # Transfer stats
+            target.memory_count += source.memory_count
+            target.total_strength += source.total_strength
+            target.access_count += source.access_count
+            self._track_active(target)
 
-        # Merge keywords (deduplicate)
-        target.keywords = list(set(target.keywords + source.keywords))
+            # Merge keywords (deduplicate)
+            self._unindex_keywords(target)
+            target.keywords = list({*target.keywords, *source.keywords})
+            self._index_keywords(target)
 
-        # Merge children
-        for child_id in source.children_ids:
-            if child_id in self.categories:
-                self.categories[child_id].parent_id = target_id
-                target.children_ids.append(child_id)
+            # Merge children
+            for child_id in source.children_ids:
+                if child_id in self.categories:
+                    self.categories[child_id].parent_id = target_id
+                    target.children_ids.append(child_id)
 
-        # Invalidate summary
-        target.summary = None
+            # Invalidate summary
+            target.summary = None
+            self._mark_changed(target_id, *(cid for cid in source.children_ids if cid in self.categories))
 
-        # Remove source
-        del self.categories[source_id]
+            # Remove source
+            del self.categories[source_id]
+            self._unindex_category(source)
 
-        logger.info(f"Merged category {source_id} into {target_id}")
+            logger.info(f"Merged category {source_id} into {target_id}")
 
     def find_related_categories(self, category_id: str, limit: int = 3) -> List[str]:
         """Find categories related to the given one."""
@@ -665,48 +1431,90 @@ class CategoryProcessor:
             return []
 
         cat = self.categories[category_id]
-        related = []
 
-        for other in self.categories.values():
-            if other.id == category_id:
-                continue
+        # Only the embedding top-k and categories sharing a keyword can rank:
+        # anything else scores below the top-k on similarity alone.
+        sims_by_id: Dict[str, float] = {}
+        if cat.embedding is not None:
+            sims_by_id = dict(self._embedding_topk(cat.embedding, limit + 1))
+        candidates = (set(sims_by_id) | self._keyword_neighbours(cat)) - {category_id}
+
+        cat_keywords = set(cat.keywords)
 
-            score = 0.0
+        def scored():
+            for other_id in candidates:
+                other = self.categories.get(other_id)
+                if other is None:
+                    continue
 
-            # Embedding similarity
-            if cat.embedding and other.embedding:
-                score = self._cosine_similarity(cat.embedding, other.embedding)
+                # Embedding similarity
+                score = sims_by_id.get(other_id)
+                if score is None:
+                    score = self._pair_similarity(cat, other)
 
-            # Keyword overlap bonus
-            if cat.keywords and other.keywords:
-                overlap = len(set(cat.keywords) & set(other.keywords))
-                score += overlap * 0.1
+                # Keyword overlap bonus
+                if cat_keywords and other.keywords:
+                    overlap = len(cat_keywords & set(other.keywords))
+                    score += overlap * 0.1
 
-            if score > 0.4:
-                related.append((other.id, score))
+                if score > 0.4:
+                    yield other_id, score
 
-        # Sort by score and return top N
-        related.sort(key=lambda x: x[1], reverse=True)
-        return [r[0] for r in related[:limit]]
+        # Top N by score (ties broken by id) without sorting every candidate
+        top = heapq.nsmallest(limit, scored(), key=lambda x: (-x[1], x[0]))
+        return [r[0] for r in top]
 
     def get_category_tree(self) -> List[CategoryTreeNode]:
         """Get hierarchical tree of categories."""
         # Find root categories (no parent)
         roots = [cat for cat in self.categories.values() if not cat.parent_id]
 
-        def build_tree(cat: Category, depth: int = 0) -> CategoryTreeNode:
-            children = [
-                build_tree(self.categories[child_id], depth + 1)
-                for child_id in cat.children_ids
-                if child_id in self.categories
-            ]
-            return CategoryTreeNode(category=cat, children=children, depth=depth)
-
-        return [build_tree(root) for root in roots]
+        # Iterative depth-first walk: no recursion limit on deep hierarchies,
+        # shared children are built once, and back-edges (cycles) are dropped.
+        built: Dict[str, CategoryTreeNode] = {}
+        result = []
+        for root in roots:
+            if root.id in built:
+                result.append(built[root.id])
+                continue
+            root_node = CategoryTreeNode(category=root, depth=0)
+            built[root.id] = root_node
+            on_path = {root.id}
+            stack = [(root_node, iter(root.children_ids))]
+            while stack:
+                node, children = stack[-1]
+                child_id = next(children, None)
+                if child_id is None:
+                    stack.pop()
+                    on_path.discard(node.category.id)
+                    continue
+                if child_id not in self.categories:
+                    continue
+                if child_id in on_path:
+                    logger.warning(f"Category cycle detected: {node.category.id} -> {child_id}")
+                    continue
+                if child_id in built:
+                    node.children.append(built[child_id])
+                    continue
+                child = self.categories[child_id]
+                child_node = CategoryTreeNode(category=child, depth=node.depth + 1)
+                built[child_id] = child_node
+                node.children.append(child_node)
+                on_path.add(child_id)
+                stack.append((child_node, iter(child.children_ids)))
+            result.append(root_node)
+
+        return result
 
     def get_all_categories(self) -> List[Dict[str, Any]]:
         """Get all categories as dicts for persistence."""
-        return [cat.to_dict() for cat in self.categories.values()]
+        with self._lock:
+            return [cat.to_dict() for cat in self.categories.values()]
+
+    def get_active_categories(self) -> List[Category]:
+        """Categories that currently hold at least one memory."""
+        with self._lock:
+            return [self.categories[cid] for cid in self._active_ids]
 
     def get_category(self, category_id: str) -> Optional[Category]:
         """Get a category by ID."""
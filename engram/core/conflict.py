@@ -1,11 +1,15 @@
-import json
-from dataclasses import dataclass
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
 from typing import Any, Dict, Optional
 
-from engram.utils.prompts import CONFLICT_RESOLUTION_PROMPT
+from engram.utils import fastjson
+from engram.utils.compat import DATACLASS_SLOTS
+from engram.utils.prompts import CONFLICT_RESOLUTION_PROMPT, render_prompt
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ConflictResolution:
     classification: str
     confidence: float
@@ -13,8 +17,68 @@ class ConflictResolution:
     explanation: str = ""
 
 
-def resolve_conflict(existing_memory: Dict[str, Any], new_content: str, llm, custom_prompt: Optional[str] = None) -> ConflictResolution:
-    prompt = (custom_prompt or CONFLICT_RESOLUTION_PROMPT).format(
+class ConflictCache:
+    """LRU of conflict classifications by exact question: the same model and
+    prompt template asked about the same existing memory and new content."""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max(1, int(max_size))
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+def _cache_key(llm, prompt: str, existing_memory: Dict[str, Any], new_content: str) -> str:
+    """blake2b of model, prompt template, existing memory (id and text) and the
+    whitespace-normalised new content."""
+    config = getattr(llm, "config", None) or {}
+    model = getattr(llm, "model", None) or config.get("model", "")
+    text = "|".join((
+        type(llm).__name__,
+        str(model),
+        hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).hexdigest(),
+        str(existing_memory.get("id", "")),
+        existing_memory.get("memory", ""),
+        " ".join(new_content.split()),
+    ))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def resolve_conflict(
+    existing_memory: Dict[str, Any],
+    new_content: str,
+    llm,
+    custom_prompt: Optional[str] = None,
+    cache: Optional[ConflictCache] = None,
+) -> ConflictResolution:
+    """
+    Classify how new content relates to an existing similar memory.
+
+    With a ConflictCache, asking the same model the same question again (same
+    existing memory, same new content up to whitespace) reuses the answer.
+    """
+    template = custom_prompt or CONFLICT_RESOLUTION_PROMPT
+    key = _cache_key(llm, template, existing_memory, new_content) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return ConflictResolution(**cached)
+
+    prompt = render_prompt(
+        template,
         existing_memory=existing_memory.get("memory", ""),
         existing_created_at=existing_memory.get("created_at", "unknown"),
         existing_last_accessed=existing_memory.get("last_accessed", "unknown"),
@@ -25,8 +89,8 @@ def resolve_conflict(existing_memory: Dict[str, Any], new_content: str, llm, cus
 
     try:
         response = llm.generate(prompt)
-        data = json.loads(response.strip())
-        return ConflictResolution(
+        data = fastjson.loads(response.strip())
+        resolution = ConflictResolution(
             classification=data.get("classification", "COMPATIBLE"),
             confidence=float(data.get("confidence", 0.5)),
             merged_content=data.get("merged_content"),
@@ -39,3 +103,7 @@ def resolve_conflict(existing_memory: Dict[str, Any], new_content: str, llm, cus
             merged_content=None,
             explanation="Failed to parse LLM response",
         )
+
+    if key is not None:
+        cache.put(key, asdict(resolution))
+    return resolution
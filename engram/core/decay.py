@@ -1,28 +1,81 @@
 import math
-from datetime import datetime
-from typing import TYPE_CHECKING
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Union
 
 if TYPE_CHECKING:
     from engram.configs.base import FadeMemConfig
 
 
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> datetime:
+    # Memories written in the same session share timestamps, so a decay
+    # sweep only parses each distinct string once.
+    return datetime.fromisoformat(value)
+
+
 def calculate_decayed_strength(
     current_strength: float,
-    last_accessed: datetime,
+    last_accessed: Union[datetime, str, float],
     access_count: int,
     layer: str,
     config: "FadeMemConfig",
 ) -> float:
-    if isinstance(last_accessed, str):
-        last_accessed = datetime.fromisoformat(last_accessed)
-
-    time_elapsed_days = (datetime.utcnow() - last_accessed).total_seconds() / 86400.0
+    """Decayed strength; `last_accessed` may be a datetime, ISO string or unix seconds."""
+    if isinstance(last_accessed, (int, float)):
+        time_elapsed_days = (time.time() - last_accessed) / 86400.0
+    else:
+        if isinstance(last_accessed, str):
+            last_accessed = _parse_iso(last_accessed)
+        time_elapsed_days = (datetime.utcnow() - last_accessed).total_seconds() / 86400.0
     decay_rate = config.sml_decay_rate if layer == "sml" else config.lml_decay_rate
     access_dampening = 1 + config.access_dampening_factor * math.log1p(access_count)
     new_strength = current_strength * math.exp(-decay_rate * time_elapsed_days / access_dampening)
     return max(0.0, min(1.0, new_strength))
 
 
+def to_unix_seconds(value) -> float:
+    """Seconds since the epoch for a datetime or ISO string; naive values are UTC."""
+    if isinstance(value, str):
+        value = _parse_iso(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def sql_decay_function(config: "FadeMemConfig", now: Optional[float] = None):
+    """Scalar decay for sqlite3 create_function.
+
+    The returned callable takes (strength, last_accessed unix seconds,
+    access_count, layer) and gives the clamped new strength, matching
+    calculate_decayed_strength with `now` fixed for the whole statement.
+    """
+    now = time.time() if now is None else now
+    # Everything the per-row call needs is bound as a default so lookups are
+    # fast locals rather than config attributes or math module globals.
+    def decay(
+        strength,
+        last_accessed_ts,
+        access_count,
+        layer,
+        _now=now,
+        _sml=config.sml_decay_rate,
+        _lml=config.lml_decay_rate,
+        _adf=config.access_dampening_factor,
+        _exp=math.exp,
+        _log1p=math.log1p,
+    ):
+        if strength is None:
+            strength = 1.0
+        time_days = 0.0 if last_accessed_ts is None else (_now - last_accessed_ts) / 86400.0
+        rate = _sml if layer == "sml" else _lml
+        new_strength = strength * _exp(-rate * time_days / (1 + _adf * _log1p(access_count or 0)))
+        return 0.0 if new_strength < 0.0 else (1.0 if new_strength > 1.0 else new_strength)
+
+    return decay
+
+
 def should_forget(strength: float, config: "FadeMemConfig") -> bool:
     return strength < config.forgetting_threshold
 
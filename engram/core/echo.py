@@ -12,12 +12,66 @@ import logging
 import re
 from dataclasses import dataclass
 from enum import Enum
+from itertools import islice
 from typing import Any, Dict, List, Optional
 
-from engram.utils.prompts import ECHO_PROCESSING_PROMPT
+from engram.core._echo_cache import EchoCache
+from engram.utils import fastjson
+from engram.utils.prompts import ECHO_PROCESSING_PROMPT, render_prompt
 
 logger = logging.getLogger(__name__)
 
+# Depth signals, compiled once; each group is a single alternation
+_IMPORTANCE_RE = re.compile(r"\b(important|remember|don't forget|always|never|must|critical)\b")
+_NUMBER_RE = re.compile(r"\d{3,}")  # Significant numbers (3+ digits)
+_DATE_RE = re.compile(
+    r"\d{1,2}/\d{1,2}(/\d{2,4})?"
+    r"|\d{1,2}-\d{1,2}(-\d{2,4})?"
+    r"|\b(january|february|march|april|may|june|july|august|september|october|november|december)\b"
+)
+_PREFERENCE_RE = re.compile(r"\b(prefer|like|love|hate|favorite|always use|never use)\b")
+_SECRET_RE = re.compile(r"\b(password|api[_\s]?key|token|secret|credential|auth)\b")
+
+_WORD_RE = re.compile(r"\b[a-zA-Z]+\b")
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'shall', 'can', 'need', 'dare',
+    'ought', 'used', 'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by',
+    'from', 'as', 'into', 'through', 'during', 'before', 'after',
+    'above', 'below', 'between', 'under', 'again', 'further', 'then',
+    'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all',
+    'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
+    'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 'just',
+    'and', 'but', 'if', 'or', 'because', 'until', 'while', 'this',
+    'that', 'these', 'those', 'i', 'me', 'my', 'myself', 'we', 'our',
+    'you', 'your', 'he', 'him', 'his', 'she', 'her', 'it', 'its',
+    'they', 'them', 'their', 'what', 'which', 'who', 'whom',
+})
+
+# Echo response parsing
+_JSON_DECODER = json.JSONDecoder()
+_ECHO_KEYS = frozenset({"paraphrase", "keywords", "implications", "question_form", "category", "importance"})
+# JSON strings (skipped whole, braces inside them don't count) and braces
+_BRACE_SCAN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]')
+_PARAPHRASE_RE = re.compile(r'"paraphrase":\s*"([^"]+)"')
+_KEYWORDS_RE = re.compile(r'"keywords":\s*\[([^\]]+)\]')
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+
+
+def _skip_object(text: str, start: int) -> int:
+    """Offset just past the brace-balanced object opened at text[start], or -1."""
+    depth = 0
+    for match in _BRACE_SCAN_RE.finditer(text, start):
+        token = match.group()
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return -1
+
 
 class EchoDepth(str, Enum):
     """Echo processing depth levels."""
@@ -49,6 +103,10 @@ class EchoResult:
             "echo_category": self.category,
             "echo_importance": self.importance,
             "echo_depth": self.echo_depth.value,
+            # Pre-tokenized for search-time re-ranking (see Memory._calculate_echo_boost)
+            "echo_keyword_terms": [kw.lower() for kw in self.keywords],
+            "echo_question_form_terms": sorted(set((self.question_form or "").lower().split())),
+            "echo_implication_terms": [sorted(set(impl.lower().split())) for impl in self.implications],
         }
 
 
@@ -68,6 +126,12 @@ class EchoProcessor:
         self.auto_depth = self.config.get("auto_depth", True)
         self.default_depth = EchoDepth(self.config.get("default_depth", "medium"))
 
+        # Parsed LLM echoes by content hash; repeated content skips the LLM
+        cache_size = int(self.config.get("llm_cache_size", 2048))
+        self._cache: Optional[EchoCache] = (
+            EchoCache.for_llm(llm, cache_size, self.config.get("llm_cache_path")) if cache_size > 0 else None
+        )
+
     def process(
         self,
         content: str,
@@ -118,28 +182,16 @@ class EchoProcessor:
         content_lower = content.lower()
 
         # Explicit importance markers
-        importance_patterns = [
-            r'\b(important|remember|don\'t forget|always|never|must|critical)\b',
-        ]
-        for pattern in importance_patterns:
-            if re.search(pattern, content_lower):
-                signals += 2
-                break
+        if _IMPORTANCE_RE.search(content_lower):
+            signals += 2
 
         # Contains significant numbers (3+ digits)
-        if re.search(r'\d{3,}', content):
+        if _NUMBER_RE.search(content):
             signals += 1
 
         # Contains dates
-        date_patterns = [
-            r'\d{1,2}/\d{1,2}(/\d{2,4})?',
-            r'\d{1,2}-\d{1,2}(-\d{2,4})?',
-            r'\b(january|february|march|april|may|june|july|august|september|october|november|december)\b',
-        ]
-        for pattern in date_patterns:
-            if re.search(pattern, content_lower):
-                signals += 1
-                break
+        if _DATE_RE.search(content_lower):
+            signals += 1
 
         # Contains proper nouns (simple heuristic: capitalized words not at start)
         words = content.split()
@@ -149,22 +201,12 @@ class EchoProcessor:
                 signals += 1
 
         # Is a preference statement
-        preference_patterns = [
-            r'\b(prefer|like|love|hate|favorite|always use|never use)\b',
-        ]
-        for pattern in preference_patterns:
-            if re.search(pattern, content_lower):
-                signals += 1
-                break
+        if _PREFERENCE_RE.search(content_lower):
+            signals += 1
 
         # Contains credential/secret markers
-        secret_patterns = [
-            r'\b(password|api[_\s]?key|token|secret|credential|auth)\b',
-        ]
-        for pattern in secret_patterns:
-            if re.search(pattern, content_lower):
-                signals += 2
-                break
+        if _SECRET_RE.search(content_lower):
+            signals += 2
 
         # Context signals
         if context:
@@ -201,13 +243,11 @@ class EchoProcessor:
     def _medium_echo(self, content: str) -> EchoResult:
         """Medium echo: keywords + paraphrase."""
         try:
-            prompt = ECHO_PROCESSING_PROMPT.format(
-                content=content,
-                depth="medium",
-                depth_instructions="Generate: paraphrase, keywords, category. Skip: implications, question_form.",
+            parsed = self._llm_echo(
+                content,
+                "medium",
+                "Generate: paraphrase, keywords, category. Skip: implications, question_form.",
             )
-            response = self.llm.generate(prompt)
-            parsed = self._parse_echo_response(response)
 
             return EchoResult(
                 raw=content,
@@ -227,13 +267,11 @@ class EchoProcessor:
     def _deep_echo(self, content: str) -> EchoResult:
         """Deep echo: full multi-modal processing."""
         try:
-            prompt = ECHO_PROCESSING_PROMPT.format(
-                content=content,
-                depth="deep",
-                depth_instructions="Generate ALL fields: paraphrase, keywords, implications, question_form, category.",
+            parsed = self._llm_echo(
+                content,
+                "deep",
+                "Generate ALL fields: paraphrase, keywords, implications, question_form, category.",
             )
-            response = self.llm.generate(prompt)
-            parsed = self._parse_echo_response(response)
 
             return EchoResult(
                 raw=content,
@@ -250,67 +288,70 @@ class EchoProcessor:
             logger.warning(f"Deep echo failed, falling back to medium: {e}")
             return self._medium_echo(content)
 
+    def _llm_echo(self, content: str, depth: str, depth_instructions: str) -> Dict[str, Any]:
+        """Parsed LLM echo of `content` at `depth`, from the cache when seen before."""
+        if self._cache is not None:
+            cached = self._cache.get(content, depth)
+            if cached is not None:
+                return cached
+        prompt = render_prompt(
+            ECHO_PROCESSING_PROMPT,
+            content=content,
+            depth=depth,
+            depth_instructions=depth_instructions,
+        )
+        parsed = self._parse_echo_response(self.llm.generate(prompt))
+        if self._cache is not None and parsed:
+            self._cache.put(content, depth, parsed)
+        return parsed
+
     def _extract_keywords_simple(self, content: str) -> List[str]:
         """Simple keyword extraction without LLM."""
-        # Remove common stop words and extract significant terms
-        stop_words = {
-            'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-            'should', 'may', 'might', 'must', 'shall', 'can', 'need', 'dare',
-            'ought', 'used', 'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by',
-            'from', 'as', 'into', 'through', 'during', 'before', 'after',
-            'above', 'below', 'between', 'under', 'again', 'further', 'then',
-            'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all',
-            'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
-            'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 'just',
-            'and', 'but', 'if', 'or', 'because', 'until', 'while', 'this',
-            'that', 'these', 'those', 'i', 'me', 'my', 'myself', 'we', 'our',
-            'you', 'your', 'he', 'him', 'his', 'she', 'her', 'it', 'its',
-            'they', 'them', 'their', 'what', 'which', 'who', 'whom',
-        }
-
-        # Tokenize and filter
-        words = re.findall(r'\b[a-zA-Z]+\b', content.lower())
-        keywords = [w for w in words if w not in stop_words and len(w) > 2]
-
-        # Get unique keywords, preserving order
-        seen = set()
-        unique = []
-        for kw in keywords:
-            if kw not in seen:
-                seen.add(kw)
-                unique.append(kw)
-
-        return unique[:10]  # Limit to 10 keywords
+        # Tokenize, filter and dedupe (dict.fromkeys keeps first-seen order)
+        words = _WORD_RE.findall(content.lower())
+        unique = dict.fromkeys(w for w in words if len(w) > 2 and w not in _STOP_WORDS)
+        return list(islice(unique, 10))  # Limit to 10 keywords
 
     def _parse_echo_response(self, response: str) -> Dict[str, Any]:
         """Parse LLM response for echo data."""
-        # Try to extract JSON from response
-        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response)
-        if json_match:
+        # Usually the response (possibly fenced) holds exactly one JSON object
+        span = fastjson.extract_json(response)
+        if span is not None:
             try:
-                return json.loads(json_match.group(1))
-            except json.JSONDecodeError:
+                data = fastjson.loads(span)
+                if isinstance(data, dict) and _ECHO_KEYS.intersection(data):
+                    return data
+            except ValueError:
                 pass
 
-        # Try parsing entire response as JSON
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            pass
-
-        # Fallback: extract what we can
+            # Otherwise take the first top-level object carrying echo fields.
+            # Only braces at depth 0 start a candidate and each one that fails
+            # is skipped whole, so the scan stays linear; nested objects (say
+            # inside a truncated "implications" list) are never mistaken for it.
+            start = response.find("{")
+            while start != -1:
+                try:
+                    data, end = _JSON_DECODER.raw_decode(response, start)
+                    if _ECHO_KEYS.intersection(data):
+                        return data
+                except ValueError:
+                    end = _skip_object(response, start)
+                    if end == -1:
+                        break  # never closes: truncated, salvage fields below
+                start = response.find("{", end)
+
+        # Fallback (e.g. a truncated response): extract what we can
         result: Dict[str, Any] = {}
 
         # Try to find paraphrase
-        para_match = re.search(r'"paraphrase":\s*"([^"]+)"', response)
+        para_match = _PARAPHRASE_RE.search(response)
         if para_match:
             result["paraphrase"] = para_match.group(1)
 
         # Try to find keywords
-        kw_match = re.search(r'"keywords":\s*\[([^\]]+)\]', response)
+        kw_match = _KEYWORDS_RE.search(response)
         if kw_match:
-            keywords = re.findall(r'"([^"]+)"', kw_match.group(1))
+            keywords = _QUOTED_RE.findall(kw_match.group(1))
             result["keywords"] = keywords
 
         return result
@@ -1,8 +1,9 @@
-import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
-from engram.utils.prompts import FUSION_PROMPT
+from engram.utils import fastjson
+from engram.utils.prompts import FUSION_PROMPT, render_prompt
 
 
 @dataclass
@@ -14,30 +15,50 @@ class FusedMemory:
     layer: str = "lml"
 
 
-def fuse_memories(memories: List[Dict[str, Any]], llm, custom_prompt: Optional[str] = None) -> FusedMemory:
+def _fusion_prompt(memories: List[Dict[str, Any]], custom_prompt: Optional[str] = None) -> str:
     memories_text = "\n\n".join(
         [
             f"Memory {i + 1} (strength={m.get('strength', 1.0):.2f}, accessed={m.get('access_count', 0)}x, created_at={m.get('created_at', '')}):\n{m.get('memory', '')}"
             for i, m in enumerate(memories)
         ]
     )
+    return render_prompt(custom_prompt or FUSION_PROMPT, memories_list=memories_text)
 
-    prompt = (custom_prompt or FUSION_PROMPT).format(memories_list=memories_text)
 
+def fuse_memories(memories: List[Dict[str, Any]], llm, custom_prompt: Optional[str] = None) -> FusedMemory:
     try:
-        response = llm.generate(prompt)
-        data = json.loads(response.strip())
+        response = llm.generate(_fusion_prompt(memories, custom_prompt))
+        data = fastjson.loads(response.strip())
         fused_content = data.get("consolidated_memory", "")
     except Exception:
         fused_content = " | ".join([m.get("memory", "") for m in memories])
 
-    avg_strength = sum(m.get("strength", 1.0) for m in memories) / len(memories)
-    total_access = sum(m.get("access_count", 0) for m in memories)
+    # One pass over the cluster for every aggregate
+    total_strength = 0.0
+    total_access = 0
+    source_ids = []
+    for m in memories:
+        total_strength += m.get("strength", 1.0)
+        total_access += m.get("access_count", 0)
+        source_ids.append(m.get("id", ""))
 
     return FusedMemory(
         content=fused_content,
-        strength=min(1.0, avg_strength * 1.2),
+        strength=min(1.0, total_strength / len(memories) * 1.2),
         access_count=total_access,
-        source_ids=[m.get("id", "") for m in memories],
+        source_ids=source_ids,
         layer="lml",
     )
+
+
+def fuse_memories_batch(
+    clusters: List[List[Dict[str, Any]]],
+    llm,
+    custom_prompt: Optional[str] = None,
+    max_workers: int = 4,
+) -> List[FusedMemory]:
+    """fuse_memories for several clusters, with up to `max_workers` LLM calls in flight."""
+    if len(clusters) <= 1 or max_workers <= 1:
+        return [fuse_memories(memories, llm, custom_prompt) for memories in clusters]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(clusters))) as pool:
+        return list(pool.map(lambda memories: fuse_memories(memories, llm, custom_prompt), clusters))
@@ -1,2 +1,10 @@
+import numpy as np
+
+
 def composite_score(similarity: float, strength: float) -> float:
     return similarity * strength
+
+
+def composite_score_batch(similarities: np.ndarray, strengths: np.ndarray) -> np.ndarray:
+    """composite_score over arrays of similarities and strengths."""
+    return np.multiply(similarities, strengths)
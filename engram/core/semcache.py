@@ -0,0 +1,126 @@
+"""
+SemCache - in-process semantic cache for LLM responses.
+
+Values are keyed by an embedding rather than the exact prompt text: a lookup
+hits when the nearest cached key has cosine similarity >= the threshold.
+Entries are evicted least-recently-used once the cache is full.
+
+Nearest-neighbour search uses hnswlib when it is installed and a brute-force
+NumPy scan over the (bounded) key matrix otherwise.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # Optional: pip install "engram[speedups]"
+    hnswlib = None
+
+
+class SemCache:
+    def __init__(self, max_size: int = 1024, threshold: float = 0.92):
+        self.max_size = max(1, int(max_size))
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+
+        self._dim: Optional[int] = None
+        self._index = None  # hnswlib.Index when available
+        self._keys: Optional[np.ndarray] = None  # (max_size, dim) unit vectors otherwise
+        self._values: "OrderedDict[int, Any]" = OrderedDict()  # slot -> value, LRU order
+        self._free: list = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, embedding: Sequence[float], threshold: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value for the nearest key above the threshold, or None."""
+        vec = self._normalize(embedding)
+        with self._lock:
+            return self._get(vec, threshold)
+
+    def _get(self, vec: Optional[np.ndarray], threshold: Optional[float]) -> Optional[Any]:
+        if vec is None or not self._values or vec.shape[0] != self._dim:
+            self.misses += 1
+            return None
+
+        threshold = self.threshold if threshold is None else threshold
+        if self._index is not None:
+            labels, distances = self._index.knn_query(vec, k=1)
+            slot, sim = int(labels[0][0]), 1.0 - float(distances[0][0])
+        else:
+            slots = np.fromiter(self._values.keys(), dtype=np.int64, count=len(self._values))
+            sims = self._keys[slots] @ vec
+            best = int(np.argmax(sims))
+            slot, sim = int(slots[best]), float(sims[best])
+
+        if sim < threshold or slot not in self._values:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._values.move_to_end(slot)
+        return self._values[slot]
+
+    def put(self, embedding: Sequence[float], value: Any) -> None:
+        """Cache a value under an embedding key, evicting the LRU entry if full."""
+        vec = self._normalize(embedding)
+        if vec is None:
+            return
+        with self._lock:
+            self._put(vec, value)
+
+    def _put(self, vec: np.ndarray, value: Any) -> None:
+        if self._dim is None:
+            self._init_storage(vec.shape[0])
+        elif vec.shape[0] != self._dim:
+            return
+
+        if len(self._values) >= self.max_size:
+            evicted, _ = self._values.popitem(last=False)
+            if self._index is not None:
+                self._index.mark_deleted(evicted)
+            self._free.append(evicted)
+
+        slot = self._free.pop()
+        if self._index is not None:
+            # Re-adding an evicted (marked deleted) label updates it in place
+            self._index.add_items(vec[np.newaxis, :], [slot])
+        else:
+            self._keys[slot] = vec
+        self._values[slot] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dim = None
+            self._index = None
+            self._keys = None
+            self._values.clear()
+            self._free = []
+
+    def _init_storage(self, dim: int) -> None:
+        self._dim = dim
+        self._free = list(range(self.max_size - 1, -1, -1))
+        if hnswlib is not None:
+            self._index = hnswlib.Index(space="cosine", dim=dim)
+            self._index.init_index(max_elements=self.max_size, ef_construction=100, M=16)
+            self._index.set_ef(32)
+        else:
+            self._keys = np.zeros((self.max_size, dim), dtype=np.float32)
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        if embedding is None:
+            return None
+        vec = np.asarray(embedding, dtype=np.float32)
+        if vec.ndim != 1 or vec.shape[0] == 0:
+            return None
+        norm = float(np.linalg.norm(vec))
+        if norm == 0:
+            return None
+        return vec / norm
@@ -0,0 +1,67 @@
+"""
+Cosine similarity for in-process search paths (in-memory vector store,
+intra-batch conflict checks).
+
+SimSIMD is optional: when it is installed, scores come from its SIMD
+kernels (AVX2/AVX-512/NEON, with native int8 support for quantized
+vectors); otherwise the same scores are computed with NumPy.
+"""
+
+import numpy as np
+
+try:
+    import simsimd
+except ImportError:  # Optional: pip install "engram[speedups]"
+    simsimd = None
+
+
+def cosine_batch(q, matrix) -> np.ndarray:
+    """Cosine similarity of `q` against every row of `matrix` (zero vectors score 0)."""
+    q = np.asarray(q)
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2 or matrix.shape[0] == 0:
+        return np.zeros(0, dtype=np.float32)
+    if not (q.dtype == matrix.dtype == np.int8):
+        q = q.astype(np.float32, copy=False)
+        matrix = matrix.astype(np.float32, copy=False)
+    if not q.any():
+        return np.zeros(matrix.shape[0], dtype=np.float32)
+
+    if simsimd is not None:
+        distances = simsimd.cdist(
+            np.ascontiguousarray(q[np.newaxis, :]), np.ascontiguousarray(matrix), metric="cosine"
+        )
+        return (1.0 - np.asarray(distances)[0]).astype(np.float32)
+
+    q = q.astype(np.float32, copy=False)
+    matrix = matrix.astype(np.float32, copy=False)
+    denom = np.linalg.norm(matrix, axis=1) * np.float32(np.linalg.norm(q))
+    return np.divide(matrix @ q, denom, out=np.zeros_like(denom), where=denom > 0)
+
+
+def cosine_matrix(queries, matrix) -> np.ndarray:
+    """Cosine similarity of every row of `queries` against every row of `matrix`,
+    as a (len(queries), len(matrix)) array (zero vectors score 0). SimSIMD
+    scores matching int8 or float16 inputs without widening them first."""
+    queries = np.asarray(queries)
+    matrix = np.asarray(matrix)
+    if queries.ndim != 2 or matrix.ndim != 2 or not queries.size or not matrix.size:
+        return np.zeros((len(queries), len(matrix)), dtype=np.float32)
+    if not (queries.dtype == matrix.dtype and queries.dtype in (np.int8, np.float16)):
+        queries = queries.astype(np.float32, copy=False)
+        matrix = matrix.astype(np.float32, copy=False)
+
+    if simsimd is not None:
+        distances = np.asarray(
+            simsimd.cdist(np.ascontiguousarray(queries), np.ascontiguousarray(matrix), metric="cosine")
+        )
+        scores = (1.0 - distances).astype(np.float32)
+        # SimSIMD scores two zero vectors as identical; zero vectors score 0 here
+        scores[~queries.any(axis=1)] = 0.0
+        scores[:, ~matrix.any(axis=1)] = 0.0
+        return scores
+
+    queries = queries.astype(np.float32, copy=False)
+    matrix = matrix.astype(np.float32, copy=False)
+    denom = np.outer(np.linalg.norm(queries, axis=1), np.linalg.norm(matrix, axis=1))
+    return np.divide(queries @ matrix.T, denom, out=np.zeros_like(denom), where=denom > 0)
@@ -1,153 +1,496 @@
-import json
 import os
+import queue
 import sqlite3
+import threading
+import time
 import uuid
+import weakref
 from contextlib import contextmanager
-from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from engram.core.decay import to_unix_seconds
+from engram.utils import fastjson
+
+
+# Per-connection tuning: NORMAL sync is safe under WAL (only the last
+# transactions may roll back on power loss), plus a 256 MB mmap window,
+# 64 MB page cache and a busy timeout so concurrent writers wait instead of failing.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+# Memory columns stored as JSON text
+_JSON_COLUMNS = frozenset({"metadata", "categories", "related_memories", "source_memories"})
+
+# Stay under SQLITE_MAX_VARIABLE_NUMBER (999 before SQLite 3.32)
+_MAX_IN_PARAMS = 900
+
+# UPDATE ... RETURNING needs SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_SCOPE_COLUMNS = ("user_id", "agent_id", "run_id", "app_id")
+
+
+# Filtered queries are built once per combination of present filters, so
+# each combination maps to one SQL string and reuses its prepared statement.
+# (A single "(? IS NULL OR col = ?)" string would stop SQLite using the indexes.)
+@lru_cache(maxsize=None)
+def _scope_clause(present: Tuple[bool, ...], columns: Tuple[str, ...] = _SCOPE_COLUMNS) -> str:
+    return "".join(f" AND {column} = ?" for column, on in zip(columns, present) if on)
+
+
+# Membership in any of the categories of one JSON array parameter, via the
+# memory_categories index; a single bound value however many categories
+_IN_CATEGORIES = "id IN (SELECT memory_id FROM memory_categories WHERE category_id IN (SELECT value FROM json_each(?)))"
+
+# Mirrors Memory._is_expired: only well-formed YYYY-MM-DD dates before today expire
+_EXPIRED = "(IFNULL(expiration_date, '') GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]' AND expiration_date < ?)"
+_NOT_EXPIRED_CLAUSE = " AND NOT " + _EXPIRED
+
+
+@lru_cache(maxsize=None)
+def _all_memories_query(
+    present: Tuple[bool, ...],
+    include_tombstoned: bool,
+    by_category: bool = False,
+    exclude_expired: bool = False,
+    limited: bool = False,
+) -> str:
+    query = "SELECT * FROM memories WHERE strength >= ?"
+    if not include_tombstoned:
+        query += " AND tombstone = 0"
+    query += _scope_clause(present, _SCOPE_COLUMNS + ("layer",))
+    if by_category:
+        query += " AND " + _IN_CATEGORIES
+    if exclude_expired:
+        query += _NOT_EXPIRED_CLAUSE
+    query += " ORDER BY strength DESC"
+    return query + " LIMIT ?" if limited else query
+
+
+def _utc_now() -> Tuple[str, int]:
+    """Current UTC time as (ISO string, unix seconds) from a single clock read."""
+    ts = time.time()
+    return datetime.utcfromtimestamp(ts).isoformat(), int(ts)
+
+
+_EMBEDDING_DTYPES = ("float32", "int8")
+
+
+def _pack_embedding(embedding: Any, dtype: str = "float32") -> Tuple[bytes, Optional[float]]:
+    """Serialize an embedding as a raw blob plus its int8 scale (None for float32).
+
+    int8 storage is symmetric per-vector quantization: v ~= q * scale with
+    scale = max|v| / 127, a quarter of the float32 size.
+    """
+    if embedding is None:
+        return b"", None
+    vector = np.asarray(embedding, dtype=np.float32)
+    if dtype != "int8":
+        return vector.tobytes(), None
+    peak = float(np.max(np.abs(vector))) if vector.size else 0.0
+    scale = peak / 127.0 if peak > 0.0 else 1.0
+    return np.round(vector / scale).astype(np.int8).tobytes(), scale
+
+
+def _unpack_embedding(value: Any, scale: Optional[float] = None) -> Any:
+    """Read a float32 blob as a (read-only, zero-copy) array, or dequantize an
+    int8 blob when it has a scale; rows written before embeddings were stored
+    as blobs still hold JSON text."""
+    if isinstance(value, (bytes, memoryview)):
+        if scale is not None:
+            return np.frombuffer(value, dtype=np.int8).astype(np.float32) * np.float32(scale)
+        return np.frombuffer(value, dtype=np.float32)
+    if value:
+        return fastjson.loads(value)
+    return []
+
+
+class _Lease:
+    """Lives in a thread's local storage; collected when the thread exits."""
+
+    __slots__ = ("__weakref__",)
 
 
 class SQLiteManager:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, embedding_dtype: str = "float32"):
+        if embedding_dtype not in _EMBEDDING_DTYPES:
+            raise ValueError(f"embedding_dtype must be one of {_EMBEDDING_DTYPES}, got {embedding_dtype!r}")
         self.db_path = db_path
+        # Storage format for new/updated memory embeddings; rows are read back
+        # correctly whichever format they were written in.
+        self.embedding_dtype = embedding_dtype
         db_dir = os.path.dirname(db_path)
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
+        # One long-lived connection per thread (sqlite3 connections must not
+        # be shared across threads); transactions are managed explicitly.
+        # Connections of threads that have exited wait in _idle for the next
+        # new thread instead of being opened afresh.
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._idle: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False, cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._checkout()
+            lease = _Lease()
+            weakref.finalize(lease, self._idle.put, conn)
+            self._local.conn = conn
+            self._local.lease = lease
+            self._local.depth = 0
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+            with self._connections_lock:
+                self._connections.append(conn)
+            return conn
+        if conn.in_transaction:
+            conn.rollback()
+        return conn
+
+    def close(self) -> None:
+        """Close every thread's connection."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        # Leases released from here on return connections to the old queue
+        self._idle = queue.SimpleQueue()
+        for conn in connections:
+            try:
+                # Refresh planner statistics where they have drifted (cheap when not needed)
+                conn.execute("PRAGMA optimize")
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def _init_db(self) -> None:
+        conn = self._thread_connection()
+        if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+            # Page layout is fixed once the first page is written: larger pages
+            # keep embedding/JSON rows off overflow chains, and incremental
+            # auto-vacuum lets purges hand pages back (see incremental_vacuum).
+            conn.execute("PRAGMA page_size=8192")
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # WAL is persistent in the database file, so it only needs setting once
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA wal_autocheckpoint=1000")
+        backfill_memory_categories = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_categories'"
+        ).fetchone() is None
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS memories (
+                id TEXT PRIMARY KEY,
+                memory TEXT NOT NULL,
+                user_id TEXT,
+                agent_id TEXT,
+                run_id TEXT,
+                app_id TEXT,
+                metadata TEXT DEFAULT '{}',
+                categories TEXT DEFAULT '[]',
+                immutable INTEGER DEFAULT 0,
+                expiration_date TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                layer TEXT DEFAULT 'sml' CHECK (layer IN ('sml', 'lml')),
+                strength REAL DEFAULT 1.0,
+                access_count INTEGER DEFAULT 0,
+                last_accessed TEXT DEFAULT CURRENT_TIMESTAMP,
+                last_accessed_ts INTEGER,
+                embedding BLOB,
+                embedding_scale REAL,
+                related_memories TEXT DEFAULT '[]',
+                source_memories TEXT DEFAULT '[]',
+                tombstone INTEGER DEFAULT 0
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_user_layer ON memories(user_id, layer);
+            CREATE INDEX IF NOT EXISTS idx_strength ON memories(strength DESC);
+            CREATE INDEX IF NOT EXISTS idx_tombstone ON memories(tombstone);
+            -- Listing queries: equality filters first, then strength in ORDER BY order
+            CREATE INDEX IF NOT EXISTS idx_mem_list ON memories(tombstone, user_id, layer, strength DESC);
+            CREATE INDEX IF NOT EXISTS idx_mem_strength_live ON memories(strength DESC) WHERE tombstone = 0;
+
+            -- Memory <-> category membership, mirrors memories.categories.
+            -- strength is a copy of memories.strength (kept in sync by a
+            -- trigger) so category listings read in index order.
+            CREATE TABLE IF NOT EXISTS memory_categories (
+                category_id TEXT NOT NULL,
+                memory_id TEXT NOT NULL,
+                strength REAL,
+                PRIMARY KEY (category_id, memory_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_memory_categories_memory ON memory_categories(memory_id);
+
+            CREATE TABLE IF NOT EXISTS memory_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                memory_id TEXT NOT NULL,
+                event TEXT NOT NULL,
+                old_value TEXT,
+                new_value TEXT,
+                old_strength REAL,
+                new_strength REAL,
+                old_layer TEXT,
+                new_layer TEXT,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE TABLE IF NOT EXISTS decay_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                memories_decayed INTEGER,
+                memories_forgotten INTEGER,
+                memories_promoted INTEGER,
+                storage_before_mb REAL,
+                storage_after_mb REAL
+            );
+
+            -- CategoryMem tables
+            CREATE TABLE IF NOT EXISTS categories (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                description TEXT,
+                category_type TEXT DEFAULT 'dynamic',
+                parent_id TEXT,
+                children_ids TEXT DEFAULT '[]',
+                memory_count INTEGER DEFAULT 0,
+                total_strength REAL DEFAULT 0.0,
+                access_count INTEGER DEFAULT 0,
+                last_accessed TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                embedding TEXT,
+                keywords TEXT DEFAULT '[]',
+                summary TEXT,
+                summary_updated_at TEXT,
+                related_ids TEXT DEFAULT '[]',
+                strength REAL DEFAULT 1.0,
+                FOREIGN KEY (parent_id) REFERENCES categories(id)
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_category_type ON categories(category_type);
+            CREATE INDEX IF NOT EXISTS idx_category_parent ON categories(parent_id);
+            CREATE INDEX IF NOT EXISTS idx_category_strength ON categories(strength DESC);
+            """
+        )
+        self._migrate_memories()
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None:
+            # Give the planner statistics to choose between the memories indexes
+            conn.execute("ANALYZE")
+        if backfill_memory_categories:
+            with self._get_connection() as conn:
+                conn.execute(
+                    """
+                    INSERT OR IGNORE INTO memory_categories (category_id, memory_id, strength)
+                    SELECT j.value, m.id, m.strength FROM memories m, json_each(m.categories) j
+                    WHERE json_valid(m.categories) AND j.type = 'text'
+                    """
+                )
+
+    def _migrate_memories(self) -> None:
+        """Bring memories tables created by older versions up to the current schema."""
         with self._get_connection() as conn:
-            conn.executescript(
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(memories)")}
+            if "last_accessed_ts" not in columns:
+                conn.execute("ALTER TABLE memories ADD COLUMN last_accessed_ts INTEGER")
+                conn.execute(
+                    """
+                    UPDATE memories SET last_accessed_ts = CAST(strftime('%s', last_accessed) AS INTEGER)
+                    WHERE last_accessed IS NOT NULL
+                    """
+                )
+            if "embedding_scale" not in columns:
+                conn.execute("ALTER TABLE memories ADD COLUMN embedding_scale REAL")
+
+            membership_columns = {row["name"] for row in conn.execute("PRAGMA table_info(memory_categories)")}
+            if "strength" not in membership_columns:
+                conn.execute("ALTER TABLE memory_categories ADD COLUMN strength REAL")
+                conn.execute(
+                    """
+                    UPDATE memory_categories
+                    SET strength = (SELECT strength FROM memories WHERE id = memory_categories.memory_id)
+                    """
+                )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_memory_categories_strength ON memory_categories(category_id, strength DESC)"
+            )
+            conn.execute(
                 """
-                CREATE TABLE IF NOT EXISTS memories (
-                    id TEXT PRIMARY KEY,
-                    memory TEXT NOT NULL,
-                    user_id TEXT,
-                    agent_id TEXT,
-                    run_id TEXT,
-                    app_id TEXT,
-                    metadata TEXT DEFAULT '{}',
-                    categories TEXT DEFAULT '[]',
-                    immutable INTEGER DEFAULT 0,
-                    expiration_date TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    layer TEXT DEFAULT 'sml' CHECK (layer IN ('sml', 'lml')),
-                    strength REAL DEFAULT 1.0,
-                    access_count INTEGER DEFAULT 0,
-                    last_accessed TEXT DEFAULT CURRENT_TIMESTAMP,
-                    embedding TEXT,
-                    related_memories TEXT DEFAULT '[]',
-                    source_memories TEXT DEFAULT '[]',
-                    tombstone INTEGER DEFAULT 0
-                );
-
-                CREATE INDEX IF NOT EXISTS idx_user_layer ON memories(user_id, layer);
-                CREATE INDEX IF NOT EXISTS idx_strength ON memories(strength DESC);
-                CREATE INDEX IF NOT EXISTS idx_tombstone ON memories(tombstone);
-
-                CREATE TABLE IF NOT EXISTS memory_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    memory_id TEXT NOT NULL,
-                    event TEXT NOT NULL,
-                    old_value TEXT,
-                    new_value TEXT,
-                    old_strength REAL,
-                    new_strength REAL,
-                    old_layer TEXT,
-                    new_layer TEXT,
-                    timestamp TEXT DEFAULT CURRENT_TIMESTAMP
-                );
-
-                CREATE TABLE IF NOT EXISTS decay_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    run_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    memories_decayed INTEGER,
-                    memories_forgotten INTEGER,
-                    memories_promoted INTEGER,
-                    storage_before_mb REAL,
-                    storage_after_mb REAL
-                );
-
-                -- CategoryMem tables
-                CREATE TABLE IF NOT EXISTS categories (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    category_type TEXT DEFAULT 'dynamic',
-                    parent_id TEXT,
-                    children_ids TEXT DEFAULT '[]',
-                    memory_count INTEGER DEFAULT 0,
-                    total_strength REAL DEFAULT 0.0,
-                    access_count INTEGER DEFAULT 0,
-                    last_accessed TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    embedding TEXT,
-                    keywords TEXT DEFAULT '[]',
-                    summary TEXT,
-                    summary_updated_at TEXT,
-                    related_ids TEXT DEFAULT '[]',
-                    strength REAL DEFAULT 1.0,
-                    FOREIGN KEY (parent_id) REFERENCES categories(id)
-                );
-
-                CREATE INDEX IF NOT EXISTS idx_category_type ON categories(category_type);
-                CREATE INDEX IF NOT EXISTS idx_category_parent ON categories(parent_id);
-                CREATE INDEX IF NOT EXISTS idx_category_strength ON categories(strength DESC);
+                CREATE TRIGGER IF NOT EXISTS trg_memory_categories_strength
+                AFTER UPDATE OF strength ON memories
+                BEGIN
+                    UPDATE memory_categories SET strength = NEW.strength WHERE memory_id = NEW.id;
+                END
                 """
             )
 
     @contextmanager
-    def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+    def _transaction(self, begin: str):
+        """Run the block in a transaction on this thread's connection.
+
+        Nested uses join the outermost transaction, which commits on success
+        and rolls back if the block raises.
+        """
+        conn = self._thread_connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn.execute(begin)
+        self._local.depth = 1
         try:
             yield conn
-            conn.commit()
-        finally:
-            conn.close()
+        except BaseException:
+            self._local.depth = 0
+            conn.execute("ROLLBACK")
+            raise
+        self._local.depth = 0
+        conn.execute("COMMIT")
+
+    def _get_connection(self):
+        return self._transaction("BEGIN")
+
+    def _bulk_connection(self):
+        """One write transaction (taking the write lock up front) for a batch of statements."""
+        return self._transaction("BEGIN IMMEDIATE")
+
+    def transaction(self):
+        """Group several manager calls on this thread into one write transaction.
+
+        Calls made inside the block join it, so their writes commit together
+        when it exits and roll back together if it raises.
+        """
+        return self._bulk_connection()
+
+    _INSERT_MEMORY_SQL = """
+        INSERT INTO memories (
+            id, memory, user_id, agent_id, run_id, app_id,
+            metadata, categories, immutable, expiration_date,
+            created_at, updated_at, layer, strength, access_count,
+            last_accessed, last_accessed_ts, embedding, embedding_scale,
+            related_memories, source_memories, tombstone
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    _INSERT_HISTORY_SQL = """
+        INSERT INTO memory_history (
+            memory_id, event, old_value, new_value,
+            old_strength, new_strength, old_layer, new_layer
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    # Takes (category_id, memory_id); the memory row must already exist
+    _INSERT_MEMBERSHIP_SQL = """
+        INSERT OR IGNORE INTO memory_categories (category_id, memory_id, strength)
+        SELECT ?, id, strength FROM memories WHERE id = ?
+    """
+
+    @classmethod
+    def _set_memory_categories(cls, conn: sqlite3.Connection, memory_id: str, categories: Iterable[str]) -> None:
+        conn.execute("DELETE FROM memory_categories WHERE memory_id = ?", (memory_id,))
+        conn.executemany(
+            cls._INSERT_MEMBERSHIP_SQL,
+            [(category_id, memory_id) for category_id in categories or []],
+        )
+
+    def _memory_row(self, memory_id: str, memory_data: Dict[str, Any], now: Tuple[str, int]) -> tuple:
+        now_iso, now_ts = now
+        if memory_data.get("last_accessed"):
+            last_accessed = memory_data["last_accessed"]
+            last_accessed_ts = int(to_unix_seconds(last_accessed))
+        else:
+            last_accessed, last_accessed_ts = now_iso, now_ts
+        embedding, embedding_scale = _pack_embedding(memory_data.get("embedding"), self.embedding_dtype)
+        return (
+            memory_id,
+            memory_data.get("memory", ""),
+            memory_data.get("user_id"),
+            memory_data.get("agent_id"),
+            memory_data.get("run_id"),
+            memory_data.get("app_id"),
+            fastjson.dumps(memory_data.get("metadata", {})),
+            fastjson.dumps(memory_data.get("categories", [])),
+            1 if memory_data.get("immutable", False) else 0,
+            memory_data.get("expiration_date"),
+            memory_data.get("created_at", now_iso),
+            memory_data.get("updated_at", now_iso),
+            memory_data.get("layer", "sml"),
+            memory_data.get("strength", 1.0),
+            memory_data.get("access_count", 0),
+            last_accessed,
+            last_accessed_ts,
+            embedding,
+            embedding_scale,
+            fastjson.dumps(memory_data.get("related_memories", [])),
+            fastjson.dumps(memory_data.get("source_memories", [])),
+            1 if memory_data.get("tombstone", False) else 0,
+        )
 
     def add_memory(self, memory_data: Dict[str, Any]) -> str:
         memory_id = memory_data.get("id", str(uuid.uuid4()))
-        now = datetime.utcnow().isoformat()
 
         with self._get_connection() as conn:
-            conn.execute(
-                """
-                INSERT INTO memories (
-                    id, memory, user_id, agent_id, run_id, app_id,
-                    metadata, categories, immutable, expiration_date,
-                    created_at, updated_at, layer, strength, access_count,
-                    last_accessed, embedding, related_memories, source_memories, tombstone
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    memory_id,
-                    memory_data.get("memory", ""),
-                    memory_data.get("user_id"),
-                    memory_data.get("agent_id"),
-                    memory_data.get("run_id"),
-                    memory_data.get("app_id"),
-                    json.dumps(memory_data.get("metadata", {})),
-                    json.dumps(memory_data.get("categories", [])),
-                    1 if memory_data.get("immutable", False) else 0,
-                    memory_data.get("expiration_date"),
-                    memory_data.get("created_at", now),
-                    memory_data.get("updated_at", now),
-                    memory_data.get("layer", "sml"),
-                    memory_data.get("strength", 1.0),
-                    memory_data.get("access_count", 0),
-                    memory_data.get("last_accessed", now),
-                    json.dumps(memory_data.get("embedding", [])),
-                    json.dumps(memory_data.get("related_memories", [])),
-                    json.dumps(memory_data.get("source_memories", [])),
-                    1 if memory_data.get("tombstone", False) else 0,
-                ),
-            )
-
-        self._log_event(memory_id, "ADD", new_value=memory_data.get("memory"))
+            conn.execute(self._INSERT_MEMORY_SQL, self._memory_row(memory_id, memory_data, _utc_now()))
+            self._set_memory_categories(conn, memory_id, memory_data.get("categories", []))
+            self._log_event(memory_id, "ADD", new_value=memory_data.get("memory"))
         return memory_id
 
+    def add_memories_bulk(self, memories: Iterable[Dict[str, Any]]) -> List[str]:
+        """Insert many memories (and their ADD history events) in one transaction."""
+        now = _utc_now()
+        ids: List[str] = []
+        rows = []
+        history = []
+        memberships = []
+        for memory_data in memories:
+            memory_id = memory_data.get("id", str(uuid.uuid4()))
+            ids.append(memory_id)
+            rows.append(self._memory_row(memory_id, memory_data, now))
+            memberships.extend((category_id, memory_id) for category_id in memory_data.get("categories") or [])
+            history.append((memory_id, "ADD", None, memory_data.get("memory"), None, None, None, None))
+
+        if rows:
+            with self._bulk_connection() as conn:
+                conn.executemany(self._INSERT_MEMORY_SQL, rows)
+                conn.executemany(self._INSERT_MEMBERSHIP_SQL, memberships)
+                conn.executemany(self._INSERT_HISTORY_SQL, history)
+        return ids
+
     def get_memory(self, memory_id: str, include_tombstoned: bool = False) -> Optional[Dict[str, Any]]:
         query = "SELECT * FROM memories WHERE id = ?"
         params = [memory_id]
@@ -160,6 +503,50 @@ class SQLiteManager:
                 return self._row_to_dict(row)
         return None
 
+    def get_memories_batch(
+        self,
+        memory_ids: Iterable[str],
+        include_tombstoned: bool = False,
+        *,
+        min_strength: Optional[float] = None,
+        categories: Optional[List[str]] = None,
+        include_expired: bool = False,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch many memories with IN queries; returns {id: memory} for those found.
+
+        Rows below `min_strength` or outside all of `categories` are skipped in SQL;
+        with `include_expired`, expired rows are returned regardless of those
+        filters so callers can still delete them.
+        """
+        memory_ids = list(dict.fromkeys(memory_ids))
+        found: Dict[str, Dict[str, Any]] = {}
+        conditions: List[str] = []
+        filter_params: List[Any] = []
+        if min_strength is not None:
+            conditions.append("strength >= ?")
+            filter_params.append(min_strength)
+        if categories:
+            conditions.append(_IN_CATEGORIES)
+            filter_params.append(fastjson.dumps(list(categories)))
+        filter_sql = ""
+        if conditions:
+            filter_sql = " AND (" + " AND ".join(conditions)
+            if include_expired:
+                filter_sql += " OR " + _EXPIRED
+                filter_params.append(date.today().isoformat())
+            filter_sql += ")"
+        chunk_size = _MAX_IN_PARAMS - len(filter_params)
+        assert chunk_size > 0
+        with self._get_connection() as conn:
+            for start in range(0, len(memory_ids), chunk_size):
+                chunk = memory_ids[start:start + chunk_size]
+                query = f"SELECT * FROM memories WHERE id IN ({','.join('?' * len(chunk))})"
+                if not include_tombstoned:
+                    query += " AND tombstone = 0"
+                for row in conn.execute(query + filter_sql, (*chunk, *filter_params)):
+                    found[row["id"]] = self._row_to_dict(row)
+        return found
+
     def get_all_memories(
         self,
         *,
@@ -170,34 +557,49 @@ class SQLiteManager:
         layer: Optional[str] = None,
         min_strength: float = 0.0,
         include_tombstoned: bool = False,
+        categories: Optional[List[str]] = None,
+        exclude_expired: bool = False,
+        limit: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        query = "SELECT * FROM memories WHERE strength >= ?"
-        params: List[Any] = [min_strength]
+        """Memories in scope, strongest first.
 
-        if not include_tombstoned:
-            query += " AND tombstone = 0"
-        if user_id:
-            query += " AND user_id = ?"
-            params.append(user_id)
-        if agent_id:
-            query += " AND agent_id = ?"
-            params.append(agent_id)
-        if run_id:
-            query += " AND run_id = ?"
-            params.append(run_id)
-        if app_id:
-            query += " AND app_id = ?"
-            params.append(app_id)
-        if layer:
-            query += " AND layer = ?"
-            params.append(layer)
-
-        query += " ORDER BY strength DESC"
+        `categories` keeps memories in any of them; `exclude_expired` drops
+        memories whose expiration_date is before today.
+        """
+        filters = (("user_id", user_id), ("agent_id", agent_id), ("run_id", run_id), ("app_id", app_id), ("layer", layer))
+        present = tuple(bool(value) for _, value in filters)
+        query = _all_memories_query(
+            present, include_tombstoned, bool(categories), exclude_expired, limit is not None
+        )
+        params: List[Any] = [min_strength] + [value for _, value in filters if value]
+        if categories:
+            params.append(fastjson.dumps(list(categories)))
+        if exclude_expired:
+            params.append(date.today().isoformat())
+        if limit is not None:
+            params.append(limit)
 
         with self._get_connection() as conn:
             rows = conn.execute(query, params).fetchall()
             return [self._row_to_dict(row) for row in rows]
 
+    def get_memory_count(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        run_id: Optional[str] = None,
+        app_id: Optional[str] = None,
+    ) -> int:
+        """Number of live memories in scope."""
+        scope_filters = (user_id, agent_id, run_id, app_id)
+        scope = _scope_clause(tuple(bool(value) for value in scope_filters))
+        with self._get_connection() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM memories WHERE tombstone = 0{scope}",
+                [value for value in scope_filters if value],
+            ).fetchone()[0]
+
     def update_memory(self, memory_id: str, updates: Dict[str, Any]) -> bool:
         old_memory = self.get_memory(memory_id, include_tombstoned=True)
         if not old_memory:
@@ -206,11 +608,26 @@ class SQLiteManager:
         set_clauses = []
         params: List[Any] = []
         for key, value in updates.items():
-            if key in {"metadata", "categories", "embedding", "related_memories", "source_memories"}:
-                value = json.dumps(value)
+            # Callers often resubmit whole records; don't re-serialize and
+            # rewrite encoded columns whose value hasn't changed.
+            if key == "embedding":
+                value, scale = _pack_embedding(value, self.embedding_dtype)
+                old = old_memory.get("embedding")
+                if value and isinstance(old, np.ndarray) and (value, scale) == _pack_embedding(old, self.embedding_dtype):
+                    continue
+                set_clauses.append("embedding_scale = ?")
+                params.append(scale)
+            elif key in _JSON_COLUMNS:
+                if value == old_memory.get(key):
+                    continue
+                value = fastjson.dumps(value)
             set_clauses.append(f"{key} = ?")
             params.append(value)
 
+        if "last_accessed" in updates and "last_accessed_ts" not in updates:
+            set_clauses.append("last_accessed_ts = ?")
+            params.append(int(to_unix_seconds(updates["last_accessed"])) if updates["last_accessed"] else None)
+
         set_clauses.append("updated_at = ?")
         params.append(datetime.utcnow().isoformat())
         params.append(memory_id)
@@ -220,44 +637,226 @@ class SQLiteManager:
                 f"UPDATE memories SET {', '.join(set_clauses)} WHERE id = ?",
                 params,
             )
-
-        self._log_event(
-            memory_id,
-            "UPDATE",
-            old_value=old_memory.get("memory"),
-            new_value=updates.get("memory"),
-            old_strength=old_memory.get("strength"),
-            new_strength=updates.get("strength"),
-            old_layer=old_memory.get("layer"),
-            new_layer=updates.get("layer"),
-        )
+            if "categories" in updates and updates["categories"] != old_memory.get("categories"):
+                self._set_memory_categories(conn, memory_id, updates["categories"])
+            self._log_event(
+                memory_id,
+                "UPDATE",
+                old_value=old_memory.get("memory"),
+                new_value=updates.get("memory"),
+                old_strength=old_memory.get("strength"),
+                new_strength=updates.get("strength"),
+                old_layer=old_memory.get("layer"),
+                new_layer=updates.get("layer"),
+            )
         return True
 
+    def decay_memories(
+        self,
+        decay_fn: Callable[[float, float, int, str], float],
+        *,
+        forgetting_threshold: float,
+        promotion_access_threshold: int,
+        promotion_strength_threshold: float,
+        user_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        run_id: Optional[str] = None,
+        app_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Decay live, mutable memories in SQL within one transaction.
+
+        `decay_fn(strength, last_accessed_ts, access_count, layer)` is
+        registered as a SQL function and evaluated once per row. Strength
+        changes and promotions are written (with DECAY/PROMOTE history) here;
+        memories that fall below the forgetting threshold are left untouched
+        and returned as `forget_ids` so the caller can delete them everywhere.
+        """
+        scope_filters = (user_id, agent_id, run_id, app_id)
+        scope = _scope_clause(tuple(bool(value) for value in scope_filters))
+        params: List[Any] = [value for value in scope_filters if value]
+        now = datetime.utcnow().isoformat()
+
+        with self._bulk_connection() as conn:
+            conn.create_function("decay_fn", 4, decay_fn, deterministic=True)
+            conn.execute(
+                """
+                CREATE TEMP TABLE IF NOT EXISTS decay_pass (
+                    id TEXT PRIMARY KEY, old REAL, new REAL, layer TEXT, access_count INTEGER
+                )
+                """
+            )
+            conn.execute("DELETE FROM decay_pass")
+            conn.execute(
+                f"""
+                INSERT INTO decay_pass (id, old, new, layer, access_count)
+                SELECT id, strength, decay_fn(strength, last_accessed_ts, access_count, layer),
+                       layer, access_count
+                FROM memories
+                WHERE tombstone = 0 AND immutable = 0{scope}
+                """,
+                params,
+            )
+
+            forget_ids = [
+                row[0]
+                for row in conn.execute("SELECT id FROM decay_pass WHERE new < ?", (forgetting_threshold,))
+            ]
+
+            conn.execute(
+                """
+                INSERT INTO memory_history (memory_id, event, old_strength, new_strength)
+                SELECT id, 'DECAY', old, new FROM decay_pass
+                WHERE new >= ? AND new IS NOT old
+                """,
+                (forgetting_threshold,),
+            )
+            decayed = conn.execute(
+                """
+                UPDATE memories
+                SET strength = (SELECT new FROM decay_pass d WHERE d.id = memories.id), updated_at = ?
+                WHERE id IN (SELECT id FROM decay_pass WHERE new >= ? AND new IS NOT old)
+                """,
+                (now, forgetting_threshold),
+            ).rowcount
+
+            promote_filter = (
+                "SELECT id FROM decay_pass WHERE layer = 'sml' AND access_count >= ? AND new >= ? AND new >= ?"
+            )
+            promote_params = (promotion_access_threshold, promotion_strength_threshold, forgetting_threshold)
+            conn.execute(
+                f"""
+                INSERT INTO memory_history (memory_id, event, old_layer, new_layer)
+                SELECT id, 'PROMOTE', 'sml', 'lml' FROM ({promote_filter})
+                """,
+                promote_params,
+            )
+            promoted = conn.execute(
+                f"UPDATE memories SET layer = 'lml', updated_at = ? WHERE id IN ({promote_filter})",
+                (now, *promote_params),
+            ).rowcount
+            conn.execute("DELETE FROM decay_pass")
+
+        return {"decayed": decayed, "promoted": promoted, "forget_ids": forget_ids}
+
     def delete_memory(self, memory_id: str, use_tombstone: bool = True) -> bool:
         if use_tombstone:
             return self.update_memory(memory_id, {"tombstone": 1})
         with self._get_connection() as conn:
             conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
-        self._log_event(memory_id, "DELETE")
+            conn.execute("DELETE FROM memory_categories WHERE memory_id = ?", (memory_id,))
+            self._log_event(memory_id, "DELETE")
         return True
 
-    def increment_access(self, memory_id: str) -> None:
+    def delete_memories_bulk(self, memory_ids: Iterable[str], use_tombstone: bool = True) -> int:
+        """delete_memory for many ids in one transaction, with the same history events."""
+        ids = list(dict.fromkeys(memory_ids))
+        if not ids:
+            return 0
         now = datetime.utcnow().isoformat()
+        with self._bulk_connection() as conn:
+            for start in range(0, len(ids), _MAX_IN_PARAMS):
+                chunk = ids[start:start + _MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                if use_tombstone:
+                    conn.execute(
+                        f"""
+                        INSERT INTO memory_history (memory_id, event, old_value, old_strength, old_layer)
+                        SELECT id, 'UPDATE', memory, strength, layer FROM memories WHERE id IN ({placeholders})
+                        """,
+                        chunk,
+                    )
+                    conn.execute(
+                        f"UPDATE memories SET tombstone = 1, updated_at = ? WHERE id IN ({placeholders})",
+                        (now, *chunk),
+                    )
+                else:
+                    conn.execute(f"DELETE FROM memories WHERE id IN ({placeholders})", chunk)
+                    conn.execute(f"DELETE FROM memory_categories WHERE memory_id IN ({placeholders})", chunk)
+            if not use_tombstone:
+                self.log_events((memory_id, "DELETE", None, None, None, None, None, None) for memory_id in ids)
+        return len(ids)
+
+    def increment_access(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """Record an access; returns the memory's updated access_count, last_accessed, strength and layer."""
+        params = (*_utc_now(), memory_id)
         with self._get_connection() as conn:
-            conn.execute(
+            if _HAS_RETURNING:
+                row = conn.execute(self._INCREMENT_ACCESS_SQL + " RETURNING " + self._ACCESS_FIELDS, params).fetchone()
+            else:
+                conn.execute(self._INCREMENT_ACCESS_SQL, params)
+                row = conn.execute(
+                    f"SELECT {self._ACCESS_FIELDS} FROM memories WHERE id = ?", (memory_id,)
+                ).fetchone()
+        return dict(zip(row.keys(), row)) if row else None
+
+    _INCREMENT_ACCESS_SQL = """
+        UPDATE memories
+        SET access_count = access_count + 1, last_accessed = ?, last_accessed_ts = ?
+        WHERE id = ?
+    """
+    _ACCESS_FIELDS = "access_count, last_accessed, strength, layer"
+
+    def bulk_increment_access(self, memory_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """increment_access for many ids in one write transaction; returns id -> updated fields."""
+        ids = list(dict.fromkeys(memory_ids))
+        if not ids:
+            return {}
+        now = _utc_now()
+        fields = "id, " + self._ACCESS_FIELDS
+        rows: List[sqlite3.Row] = []
+        with self._bulk_connection() as conn:
+            for start in range(0, len(ids), _MAX_IN_PARAMS):
+                chunk = ids[start:start + _MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                update = f"""
+                    UPDATE memories
+                    SET access_count = access_count + 1, last_accessed = ?, last_accessed_ts = ?
+                    WHERE id IN ({placeholders})
                 """
-                UPDATE memories
-                SET access_count = access_count + 1, last_accessed = ?
-                WHERE id = ?
-                """,
-                (now, memory_id),
+                if _HAS_RETURNING:
+                    rows.extend(conn.execute(update + " RETURNING " + fields, (*now, *chunk)).fetchall())
+                else:
+                    conn.execute(update, (*now, *chunk))
+                    rows.extend(
+                        conn.execute(f"SELECT {fields} FROM memories WHERE id IN ({placeholders})", chunk).fetchall()
+                    )
+        return {row["id"]: dict(zip(row.keys()[1:], tuple(row)[1:])) for row in rows}
+
+    def promote_memories(self, memory_ids: Iterable[str]) -> int:
+        """Move SML memories to LML in one transaction, logging a PROMOTE event for each."""
+        ids = list(dict.fromkeys(memory_ids))
+        if not ids:
+            return 0
+        now = datetime.utcnow().isoformat()
+        promoted: List[str] = []
+        with self._bulk_connection() as conn:
+            for start in range(0, len(ids), _MAX_IN_PARAMS):
+                chunk = ids[start:start + _MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                update = f"UPDATE memories SET layer = 'lml', updated_at = ? WHERE id IN ({placeholders}) AND layer = 'sml'"
+                if _HAS_RETURNING:
+                    promoted.extend(row[0] for row in conn.execute(update + " RETURNING id", (now, *chunk)))
+                else:
+                    promoted.extend(
+                        row[0]
+                        for row in conn.execute(
+                            f"SELECT id FROM memories WHERE id IN ({placeholders}) AND layer = 'sml'", chunk
+                        )
+                    )
+                    conn.execute(update, (now, *chunk))
+            self.log_events(
+                (memory_id, "PROMOTE", None, None, None, None, "sml", "lml") for memory_id in promoted
             )
+        return len(promoted)
 
     def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
-        data = dict(row)
-        for key in ["metadata", "categories", "embedding", "related_memories", "source_memories"]:
+        data = dict(zip(row.keys(), row))
+        for key in _JSON_COLUMNS:
             if key in data and data[key]:
-                data[key] = json.loads(data[key])
+                data[key] = fastjson.loads(data[key])
+        scale = data.pop("embedding_scale", None)
+        if "embedding" in data:
+            data["embedding"] = _unpack_embedding(data["embedding"], scale)
         data["immutable"] = bool(data.get("immutable", 0))
         data["tombstone"] = bool(data.get("tombstone", 0))
         return data
@@ -265,12 +864,7 @@ class SQLiteManager:
     def _log_event(self, memory_id: str, event: str, **kwargs: Any) -> None:
         with self._get_connection() as conn:
             conn.execute(
-                """
-                INSERT INTO memory_history (
-                    memory_id, event, old_value, new_value,
-                    old_strength, new_strength, old_layer, new_layer
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+                self._INSERT_HISTORY_SQL,
                 (
                     memory_id,
                     event,
@@ -287,13 +881,22 @@ class SQLiteManager:
         """Public wrapper for logging custom events like DECAY or FUSE."""
         self._log_event(memory_id, event, **kwargs)
 
+    def log_events(self, entries: Iterable[tuple]) -> None:
+        """Log many history events in one transaction.
+
+        Each entry is (memory_id, event, old_value, new_value, old_strength,
+        new_strength, old_layer, new_layer).
+        """
+        with self._get_connection() as conn:
+            conn.executemany(self._INSERT_HISTORY_SQL, entries)
+
     def get_history(self, memory_id: str) -> List[Dict[str, Any]]:
         with self._get_connection() as conn:
             rows = conn.execute(
                 "SELECT * FROM memory_history WHERE memory_id = ? ORDER BY timestamp DESC",
                 (memory_id,),
             ).fetchall()
-        return [dict(row) for row in rows]
+        return [dict(zip(row.keys(), row)) for row in rows]
 
     def log_decay(self, decayed: int, forgotten: int, promoted: int, storage_before_mb: Optional[float] = None, storage_after_mb: Optional[float] = None) -> None:
         with self._get_connection() as conn:
@@ -307,10 +910,56 @@ class SQLiteManager:
 
     def purge_tombstoned(self) -> int:
         with self._get_connection() as conn:
+            conn.execute(
+                """
+                DELETE FROM memory_categories
+                WHERE memory_id IN (SELECT id FROM memories WHERE tombstone = 1)
+                """
+            )
             cursor = conn.execute("DELETE FROM memories WHERE tombstone = 1")
             return cursor.rowcount
 
+    def incremental_vacuum(self, pages: int = 1000) -> None:
+        """Return up to `pages` free pages to the filesystem (databases created with auto_vacuum).
+
+        Runs in autocommit mode, so it must not be called inside a transaction.
+        """
+        conn = self._thread_connection()
+        # executescript steps the pragma to completion; execute() would free a single page
+        conn.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+
     # CategoryMem methods
+    _UPSERT_CATEGORY_SQL = """
+        INSERT OR REPLACE INTO categories (
+            id, name, description, category_type, parent_id,
+            children_ids, memory_count, total_strength, access_count,
+            last_accessed, created_at, embedding, keywords,
+            summary, summary_updated_at, related_ids, strength
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    @staticmethod
+    def _category_row(category_data: Dict[str, Any]) -> tuple:
+        return (
+            category_data.get("id"),
+            category_data.get("name", ""),
+            category_data.get("description", ""),
+            category_data.get("category_type", "dynamic"),
+            category_data.get("parent_id"),
+            fastjson.dumps(category_data.get("children_ids", [])),
+            category_data.get("memory_count", 0),
+            category_data.get("total_strength", 0.0),
+            category_data.get("access_count", 0),
+            category_data.get("last_accessed"),
+            category_data.get("created_at"),
+            fastjson.dumps(category_data.get("embedding")) if category_data.get("embedding") else None,
+            fastjson.dumps(category_data.get("keywords", [])),
+            category_data.get("summary"),
+            category_data.get("summary_updated_at"),
+            fastjson.dumps(category_data.get("related_ids", [])),
+            category_data.get("strength", 1.0),
+        )
+
     def save_category(self, category_data: Dict[str, Any]) -> str:
         """Save or update a category."""
         category_id = category_data.get("id")
@@ -318,35 +967,7 @@ class SQLiteManager:
             return ""
 
         with self._get_connection() as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO categories (
-                    id, name, description, category_type, parent_id,
-                    children_ids, memory_count, total_strength, access_count,
-                    last_accessed, created_at, embedding, keywords,
-                    summary, summary_updated_at, related_ids, strength
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    category_id,
-                    category_data.get("name", ""),
-                    category_data.get("description", ""),
-                    category_data.get("category_type", "dynamic"),
-                    category_data.get("parent_id"),
-                    json.dumps(category_data.get("children_ids", [])),
-                    category_data.get("memory_count", 0),
-                    category_data.get("total_strength", 0.0),
-                    category_data.get("access_count", 0),
-                    category_data.get("last_accessed"),
-                    category_data.get("created_at"),
-                    json.dumps(category_data.get("embedding")) if category_data.get("embedding") else None,
-                    json.dumps(category_data.get("keywords", [])),
-                    category_data.get("summary"),
-                    category_data.get("summary_updated_at"),
-                    json.dumps(category_data.get("related_ids", [])),
-                    category_data.get("strength", 1.0),
-                ),
-            )
+            conn.execute(self._UPSERT_CATEGORY_SQL, self._category_row(category_data))
         return category_id
 
     def get_category(self, category_id: str) -> Optional[Dict[str, Any]]:
@@ -368,30 +989,56 @@ class SQLiteManager:
             ).fetchall()
             return [self._category_row_to_dict(row) for row in rows]
 
+    def get_all_categories_lite(self) -> List[Dict[str, Any]]:
+        """Scalar fields of all categories, without decoding the JSON columns.
+
+        For listings that sort or filter on name/strength/counts; use
+        get_category/get_all_categories when keywords, links or embeddings are needed.
+        """
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, name, description, category_type, parent_id, memory_count,
+                       total_strength, access_count, last_accessed, created_at, strength
+                FROM categories ORDER BY strength DESC
+                """
+            ).fetchall()
+            return [dict(zip(row.keys(), row)) for row in rows]
+
     def delete_category(self, category_id: str) -> bool:
         """Delete a category."""
         with self._get_connection() as conn:
             conn.execute("DELETE FROM categories WHERE id = ?", (category_id,))
         return True
 
+    def delete_categories(self, category_ids: Iterable[str]) -> int:
+        """Delete several categories in one transaction."""
+        ids = list(dict.fromkeys(category_ids))
+        if ids:
+            with self._bulk_connection() as conn:
+                for start in range(0, len(ids), _MAX_IN_PARAMS):
+                    chunk = ids[start:start + _MAX_IN_PARAMS]
+                    conn.execute(f"DELETE FROM categories WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        return len(ids)
+
     def save_all_categories(self, categories: List[Dict[str, Any]]) -> int:
-        """Save multiple categories (batch operation)."""
-        count = 0
-        for cat in categories:
-            self.save_category(cat)
-            count += 1
-        return count
+        """Save multiple categories in a single transaction."""
+        rows = [self._category_row(cat) for cat in categories if cat.get("id")]
+        if rows:
+            with self._bulk_connection() as conn:
+                conn.executemany(self._UPSERT_CATEGORY_SQL, rows)
+        return len(rows)
 
     def _category_row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
         """Convert a category row to dict."""
-        data = dict(row)
+        data = dict(zip(row.keys(), row))
         for key in ["children_ids", "keywords", "related_ids"]:
             if key in data and data[key]:
-                data[key] = json.loads(data[key])
+                data[key] = fastjson.loads(data[key])
             else:
                 data[key] = []
         if data.get("embedding"):
-            data["embedding"] = json.loads(data["embedding"])
+            data["embedding"] = fastjson.loads(data["embedding"])
         return data
 
     def get_memories_by_category(
@@ -404,11 +1051,45 @@ class SQLiteManager:
         with self._get_connection() as conn:
             rows = conn.execute(
                 """
-                SELECT * FROM memories
-                WHERE categories LIKE ? AND strength >= ? AND tombstone = 0
-                ORDER BY strength DESC
+                SELECT m.* FROM memory_categories mc
+                JOIN memories m ON m.id = mc.memory_id
+                WHERE mc.category_id = ? AND mc.strength >= ? AND m.tombstone = 0
+                ORDER BY mc.strength DESC
                 LIMIT ?
                 """,
-                (f'%"{category_id}"%', min_strength, limit),
+                (category_id, min_strength, limit),
             ).fetchall()
             return [self._row_to_dict(row) for row in rows]
+
+    def get_memories_by_categories(
+        self,
+        category_ids: Iterable[str],
+        limit: int = 100,
+        min_strength: float = 0.0,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """get_memories_by_category for many categories, one query per chunk of ids."""
+        ids = list(dict.fromkeys(category_ids))
+        result: Dict[str, List[Dict[str, Any]]] = {category_id: [] for category_id in ids}
+        with self._get_connection() as conn:
+            for start in range(0, len(ids), _MAX_IN_PARAMS):
+                chunk = ids[start:start + _MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"""
+                    SELECT * FROM (
+                        SELECT mc.category_id AS _category_id, m.*,
+                               ROW_NUMBER() OVER (PARTITION BY mc.category_id ORDER BY mc.strength DESC) AS _rank
+                        FROM memory_categories mc
+                        JOIN memories m ON m.id = mc.memory_id
+                        WHERE mc.category_id IN ({placeholders}) AND mc.strength >= ? AND m.tombstone = 0
+                    )
+                    WHERE _rank <= ?
+                    ORDER BY _category_id, _rank
+                    """,
+                    (*chunk, min_strength, limit),
+                ).fetchall()
+                for row in rows:
+                    memory = self._row_to_dict(row)
+                    del memory["_rank"]
+                    result[memory.pop("_category_id")].append(memory)
+        return result
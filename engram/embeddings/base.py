@@ -1,11 +1,75 @@
+import re
+import threading
+import zlib
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from engram.core.semcache import SemCache
+
+_SIGNATURE_DIMS = 512
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _signature(text: str) -> np.ndarray:
+    """Hashed bag-of-words vector of `text`: a cheap stand-in for its embedding
+    when looking for a cached near-duplicate."""
+    vector = np.zeros(_SIGNATURE_DIMS, dtype=np.float32)
+    for token in _TOKEN_RE.findall(text.lower()):
+        vector[zlib.crc32(token.encode("utf-8")) % _SIGNATURE_DIMS] += 1.0
+    return vector
 
 
 class BaseEmbedder(ABC):
     def __init__(self, config: Optional[dict] = None):
         self.config = config or {}
+        # LRU of (memory_action, text) -> embedding for embed_cached (0 disables)
+        self.cache_size = int(self.config.get("cache_size", 1024))
+        self._cache: "OrderedDict[Tuple[Optional[str], str], Any]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Second tier: texts whose token signature has cosine >= this with a
+        # cached one reuse its embedding (None disables), per memory_action
+        self.semantic_cache_threshold: Optional[float] = self.config.get("semantic_cache_threshold")
+        self._semantic: Dict[Optional[str], SemCache] = {}
 
     @abstractmethod
     def embed(self, text: str, memory_action: Optional[str] = None):
         pass
+
+    def embed_batch(self, texts: List[str], memory_action: Optional[str] = None) -> list:
+        """Embed several texts; providers with a batch endpoint override this."""
+        return [self.embed(text, memory_action=memory_action) for text in texts]
+
+    def embed_cached(self, text: str, memory_action: Optional[str] = None):
+        """embed(), reusing the vector for recently seen text (whitespace-insensitive)
+        and, with a semantic_cache_threshold, for near-duplicate wording."""
+        if self.cache_size <= 0:
+            return self.embed(text, memory_action=memory_action)
+
+        key = (memory_action, " ".join(text.split()))
+        with self._cache_lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+                return embedding
+
+        semantic = signature = None
+        if self.semantic_cache_threshold is not None:
+            with self._cache_lock:
+                semantic = self._semantic.get(memory_action)
+                if semantic is None:
+                    semantic = self._semantic[memory_action] = SemCache(self.cache_size, self.semantic_cache_threshold)
+            signature = _signature(key[1])
+            embedding = semantic.get(signature)
+
+        if embedding is None:
+            embedding = self.embed(text, memory_action=memory_action)
+            if semantic is not None:
+                semantic.put(signature, embedding)
+        with self._cache_lock:
+            self._cache[key] = embedding
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return embedding
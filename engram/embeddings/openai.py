@@ -2,6 +2,9 @@ from typing import List, Optional
 
 from engram.embeddings.base import BaseEmbedder
 
+# Maximum number of inputs the embeddings endpoint accepts per request
+_MAX_BATCH_SIZE = 2048
+
 
 class OpenAIEmbedder(BaseEmbedder):
     def __init__(self, config: Optional[dict] = None):
@@ -14,5 +17,13 @@ class OpenAIEmbedder(BaseEmbedder):
         self.model = self.config.get("model", "text-embedding-3-small")
 
     def embed(self, text: str, memory_action: Optional[str] = None) -> List[float]:
-        response = self.client.embeddings.create(model=self.model, input=text)
-        return response.data[0].embedding
+        return self.embed_batch([text], memory_action=memory_action)[0]
+
+    def embed_batch(self, texts: List[str], memory_action: Optional[str] = None) -> List[List[float]]:
+        embeddings: List[List[float]] = []
+        for start in range(0, len(texts), _MAX_BATCH_SIZE):
+            response = self.client.embeddings.create(model=self.model, input=texts[start:start + _MAX_BATCH_SIZE])
+            # The API returns items tagged with their input index
+            data = sorted(response.data, key=lambda item: item.index)
+            embeddings.extend(item.embedding for item in data)
+        return embeddings
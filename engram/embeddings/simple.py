@@ -21,7 +21,7 @@ class SimpleEmbedder(BaseEmbedder):
             idx = int(digest, 16) % self.dims
             vector[idx] += 1.0
 
-        norm = math.sqrt(sum(x * x for x in vector))
+        norm = math.hypot(*vector)
         if norm > 0:
             vector = [x / norm for x in vector]
         return vector
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterator, Optional
 
 
 class BaseLLM(ABC):
@@ -9,3 +9,10 @@ class BaseLLM(ABC):
     @abstractmethod
     def generate(self, prompt: str) -> str:
         pass
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield the response text in chunks as it is generated.
+
+        Providers without streaming support return the whole response as one chunk.
+        """
+        yield self.generate(prompt)
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Iterator, Optional
 
 from engram.llms.base import BaseLLM
 
@@ -61,6 +61,24 @@ class GeminiLLM(BaseLLM):
 
         return ""
 
+    def stream(self, prompt: str) -> Iterator[str]:
+        generation_config = {
+            "temperature": self.temperature,
+            "max_output_tokens": self.max_tokens,
+        }
+        if self._client_type == "generativeai":
+            chunks = self._model.generate_content(prompt, generation_config=generation_config, stream=True)
+        elif self._client_type == "genai":
+            chunks = self._client.models.generate_content_stream(
+                model=self.model, contents=prompt, config=generation_config
+            )
+        else:
+            return
+        for chunk in chunks:
+            text = _extract_text_from_response(chunk)
+            if text:
+                yield text
+
 
 def _extract_text_from_response(response) -> str:
     if response is None:
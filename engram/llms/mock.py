@@ -4,32 +4,44 @@ from typing import Optional
 from engram.llms.base import BaseLLM
 
 
+def _compact(response: dict) -> str:
+    return json.dumps(response, separators=(",", ":"))
+
+
 class MockLLM(BaseLLM):
+    # Responses are fixed, so serialize them once rather than on every call
+    _RESP_CONSOLIDATED = _compact(
+        {
+            "consolidated_memory": "",
+            "preserved_facts": [],
+            "discarded_as_redundant": [],
+            "confidence": 0.0,
+        }
+    )
+    _RESP_CLASSIFICATION = _compact(
+        {
+            "classification": "COMPATIBLE",
+            "confidence": 0.5,
+            "merged_content": None,
+            "explanation": "mock response",
+        }
+    )
+    _RESP_IMPORTANCE = _compact(
+        {
+            "memories": [],
+            "reasoning": "mock response",
+        }
+    )
+
     def __init__(self, config: Optional[dict] = None):
         super().__init__(config)
 
     def generate(self, prompt: str) -> str:
         lowered = prompt.lower()
-        if "memories" in lowered and "consolidated_memory" in lowered:
-            response = {
-                "consolidated_memory": "",
-                "preserved_facts": [],
-                "discarded_as_redundant": [],
-                "confidence": 0.0,
-            }
-            return json.dumps(response)
-        if "classification" in lowered and "subsumes" in lowered:
-            response = {
-                "classification": "COMPATIBLE",
-                "confidence": 0.5,
-                "merged_content": None,
-                "explanation": "mock response",
-            }
-            return json.dumps(response)
-        if "memories" in lowered and "importance" in lowered:
-            response = {
-                "memories": [],
-                "reasoning": "mock response",
-            }
-            return json.dumps(response)
+        if "consolidated_memory" in lowered and "memories" in lowered:
+            return self._RESP_CONSOLIDATED
+        if "subsumes" in lowered and "classification" in lowered:
+            return self._RESP_CLASSIFICATION
+        if "importance" in lowered and "memories" in lowered:
+            return self._RESP_IMPORTANCE
         return ""
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Iterator, Optional
 
 from engram.llms.base import BaseLLM
 
@@ -23,3 +23,15 @@ class OpenAILLM(BaseLLM):
             max_tokens=self.max_tokens,
         )
         return response.choices[0].message.content
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True,
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
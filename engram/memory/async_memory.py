@@ -47,6 +47,9 @@ class AsyncMemory:
     async def fuse_memories(self, memory_ids: List[str], user_id: str = None):
         return await asyncio.to_thread(self._sync.fuse_memories, memory_ids, user_id)
 
+    async def fuse_memory_groups(self, groups: List[List[str]], user_id: str = None):
+        return await asyncio.to_thread(self._sync.fuse_memory_groups, groups, user_id)
+
     async def get_stats(self, user_id: str = None):
         return await asyncio.to_thread(self._sync.get_stats, user_id)
 
@@ -12,7 +12,8 @@ class MemoryClient:
         project_id: str = None,
     ):
         try:
-            import requests  # noqa: F401
+            import requests
+            from requests.adapters import HTTPAdapter
         except Exception as exc:
             raise ImportError("requests package is required for MemoryClient") from exc
 
@@ -21,6 +22,13 @@ class MemoryClient:
         self.org_id = org_id
         self.project_id = project_id
 
+        # One pooled keep-alive session so repeated calls reuse the TCP/TLS connection
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=32)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update(self._headers())
+
     def _headers(self) -> Dict[str, str]:
         headers = {"Content-Type": "application/json"}
         if self.api_key:
@@ -32,13 +40,14 @@ class MemoryClient:
         return headers
 
     def _request(self, method: str, path: str, *, params: Dict[str, Any] = None, json_body: Dict[str, Any] = None):
-        import requests
-
         url = f"{self.host}{path}"
-        response = requests.request(method, url, headers=self._headers(), params=params, json=json_body, timeout=60)
+        response = self._session.request(method, url, params=params, json=json_body, timeout=60)
         response.raise_for_status()
         return response.json()
 
+    def close(self) -> None:
+        self._session.close()
+
     def add(self, messages, **kwargs) -> Dict[str, Any]:
         payload = {"messages": messages}
         payload.update(kwargs)
@@ -1,35 +1,54 @@
 from __future__ import annotations
 
-import json
 import logging
+import threading
+import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, date
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple, Union
+
+import numpy as np
 
 from engram.configs.base import MemoryConfig
-from engram.core.decay import calculate_decayed_strength, should_forget, should_promote
-from engram.core.conflict import resolve_conflict
+from engram.core.decay import should_promote, sql_decay_function
+from engram.core.conflict import ConflictCache, resolve_conflict
 from engram.core.echo import EchoProcessor, EchoDepth
 from engram.core.fusion import fuse_memories
-from engram.core.retrieval import composite_score
+from engram.core.retrieval import composite_score_batch
+from engram.core.similarity import cosine_batch
 from engram.core.category import CategoryProcessor, CategoryMatch
 from engram.db.sqlite import SQLiteManager
 from engram.exceptions import FadeMemValidationError
 from engram.memory.base import MemoryBase
 from engram.memory.utils import (
     build_filters_and_metadata,
+    compile_filter,
+    iter_json_array_objects,
     matches_filters,
     normalize_categories,
     normalize_messages,
     parse_messages,
     strip_code_fences,
 )
+from engram.utils import fastjson
 from engram.utils.factory import EmbedderFactory, LLMFactory, VectorStoreFactory
-from engram.utils.prompts import AGENT_MEMORY_EXTRACTION_PROMPT, MEMORY_EXTRACTION_PROMPT
+from engram.utils.prompts import AGENT_MEMORY_EXTRACTION_PROMPT, MEMORY_EXTRACTION_PROMPT, render_prompt
 
 logger = logging.getLogger(__name__)
 
 
+def _extracted_memory(m: Any) -> Optional[Dict[str, Any]]:
+    """Convert one item of the extraction LLM's "memories" list to an add() item."""
+    if not isinstance(m, dict):
+        return None
+    return {
+        "content": m.get("content", ""),
+        "categories": [m.get("category")] if m.get("category") else [],
+        "metadata": {"importance": m.get("importance"), "confidence": m.get("confidence")},
+    }
+
+
 class Memory(MemoryBase):
     """engram Memory class - biologically-inspired memory for AI agents."""
 
@@ -39,14 +58,38 @@ class Memory(MemoryBase):
         # Ensure vector store config has dims/collection if missing
         self.config.vector_store.config.setdefault("collection_name", self.config.collection_name)
         self.config.vector_store.config.setdefault("embedding_model_dims", self.config.embedding_model_dims)
-
-        self.db = SQLiteManager(self.config.history_db_path)
+        # ANN index defaults; providers map these onto their native index settings
+        self.config.vector_store.config.setdefault("index_type", "hnsw")
+        self.config.vector_store.config.setdefault("hnsw_m", 32)
+        self.config.vector_store.config.setdefault("hnsw_ef_construction", 200)
+        self.config.vector_store.config.setdefault("hnsw_ef_search", 64)
+        # Size of the embedder's LRU, which serves repeated search queries
+        self.config.embedder.config.setdefault("cache_size", self.config.query_embedding_cache_size)
+        self.config.embedder.config.setdefault("semantic_cache_threshold", self.config.query_embedding_semantic_threshold)
+
+        self.db = SQLiteManager(self.config.history_db_path, embedding_dtype=self.config.embedding_storage_dtype)
         self.llm = LLMFactory.create(self.config.llm.provider, self.config.llm.config)
         self.embedder = EmbedderFactory.create(self.config.embedder.provider, self.config.embedder.config)
         self.vector_store = VectorStoreFactory.create(self.config.vector_store.provider, self.config.vector_store.config)
         self.fadem_config = self.config.engram
         self.echo_config = self.config.echo
 
+        # Cache of conflict classifications for repeated (existing, new) pairs
+        self._conflict_cache = (
+            ConflictCache(self.fadem_config.conflict_cache_size) if self.fadem_config.conflict_cache_size > 0 else None
+        )
+
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        # Debounced category save from search(), see _schedule_persist_categories:
+        # monotonic deadline of the pending save, run by one daemon worker
+        self._persist_cond = threading.Condition()
+        self._persist_due: Optional[float] = None
+        self._persist_worker: Optional[threading.Thread] = None
+        self._persist_stop = False
+
+        # Scope -> (joined existing memories, memory count) for extraction prompts
+        self._existing_text_cache: Dict[tuple, Tuple[str, int]] = {}
+
         # Initialize EchoMem processor
         if self.echo_config.enable_echo:
             self.echo_processor = EchoProcessor(
@@ -54,6 +97,10 @@ class Memory(MemoryBase):
                 config={
                     "auto_depth": self.echo_config.auto_depth,
                     "default_depth": self.echo_config.default_depth,
+                    "llm_cache_size": self.echo_config.llm_cache_size,
+                    "llm_cache_path": (
+                        self.config.history_db_path if self.echo_config.persist_llm_cache else None
+                    ),
                 }
             )
         else:
@@ -69,6 +116,16 @@ class Memory(MemoryBase):
                     "use_llm": self.category_config.use_llm_categorization,
                     "auto_subcategories": self.category_config.auto_create_subcategories,
                     "max_depth": self.category_config.max_category_depth,
+                    "hnsw_threshold": self.category_config.hnsw_threshold,
+                    "embedding_cache_path": (
+                        self.config.history_db_path if self.category_config.persist_embedding_cache else None
+                    ),
+                    "embedding_dtype": self.category_config.embedding_dtype,
+                    "prompt_top_k": self.category_config.prompt_top_k,
+                    "max_prompt_categories": self.category_config.max_prompt_categories,
+                    "llm_concurrency": self.category_config.llm_concurrency,
+                    "llm_cache_size": self.category_config.llm_cache_size,
+                    "llm_cache_threshold": self.category_config.llm_cache_threshold,
                 },
             )
             # Load existing categories from DB
@@ -112,6 +169,18 @@ class Memory(MemoryBase):
         )
 
         messages_list = normalize_messages(messages)
+        depth_override = EchoDepth(echo_depth) if echo_depth else None
+        use_echo = self.echo_processor is not None and self.echo_config.enable_echo
+
+        # EchoMem: echo requests for extracted memories start while extraction is still streaming
+        echo_futures: Dict[str, Future] = {}
+
+        def start_echo(memory: Dict[str, Any]) -> None:
+            content = memory.get("content", "").strip()
+            if use_echo and content and content not in echo_futures:
+                echo_futures[content] = self._get_io_pool().submit(
+                    self.echo_processor.process, content, depth=depth_override
+                )
 
         if infer:
             memories_to_add = self._extract_memories(
@@ -120,6 +189,7 @@ class Memory(MemoryBase):
                 prompt=prompt,
                 includes=includes,
                 excludes=excludes,
+                on_memory=start_echo,
             )
         else:
             memories_to_add = []
@@ -136,8 +206,24 @@ class Memory(MemoryBase):
                     mem_meta["actor_id"] = msg.get("name")
                 memories_to_add.append({"content": content, "metadata": mem_meta})
 
-        results: List[Dict[str, Any]] = []
-        for mem in memories_to_add:
+        # CategoryMem: Auto-categorize everything that needs it in one batch
+        category_matches: Dict[int, Any] = {}
+        if self.category_processor and self.category_config.auto_categorize:
+            pending = [
+                i for i, mem in enumerate(memories_to_add)
+                if mem.get("content", "").strip()
+                and not normalize_categories(categories or mem.get("categories"))
+            ]
+            if pending:
+                matches = self.category_processor.detect_categories_batch(
+                    [memories_to_add[i]["content"].strip() for i in pending],
+                    use_llm=self.category_config.use_llm_categorization,
+                )
+                category_matches = dict(zip(pending, matches))
+
+        # First pass: per-memory preparation up to the text that gets embedded
+        prepared: List[Dict[str, Any]] = []
+        for idx, mem in enumerate(memories_to_add):
             content = mem.get("content", "").strip()
             if not content:
                 continue
@@ -149,17 +235,8 @@ class Memory(MemoryBase):
                 mem_metadata["app_id"] = app_id
 
             # CategoryMem: Auto-categorize if not provided
-            category_match = None
-            if (
-                self.category_processor
-                and self.category_config.auto_categorize
-                and not mem_categories
-            ):
-                category_match = self.category_processor.detect_category(
-                    content,
-                    metadata=mem_metadata,
-                    use_llm=self.category_config.use_llm_categorization,
-                )
+            category_match = category_matches.get(idx)
+            if category_match and not mem_categories:
                 mem_categories = [category_match.category_id]
                 mem_metadata["category_confidence"] = category_match.confidence
                 mem_metadata["category_auto"] = True
@@ -167,9 +244,11 @@ class Memory(MemoryBase):
             # EchoMem: Process through multi-modal echo encoding
             echo_result = None
             effective_strength = initial_strength
-            if self.echo_processor and self.echo_config.enable_echo:
-                depth_override = EchoDepth(echo_depth) if echo_depth else None
-                echo_result = self.echo_processor.process(content, depth=depth_override)
+            if use_echo:
+                future = echo_futures.get(content)
+                echo_result = (
+                    future.result() if future else self.echo_processor.process(content, depth=depth_override)
+                )
                 # Apply strength multiplier from echo depth
                 effective_strength = initial_strength * echo_result.strength_multiplier
                 # Add echo metadata
@@ -184,28 +263,81 @@ class Memory(MemoryBase):
                 and echo_result.question_form
                 and self.echo_config.use_question_embedding
             ):
-                embedding = self.embedder.embed(echo_result.question_form, memory_action="add")
+                embed_text = echo_result.question_form
             else:
-                embedding = self.embedder.embed(content, memory_action="add")
+                embed_text = content
 
-            # Conflict resolution against nearest memory in scope
-            event = "ADD"
-            existing = self._find_similar(embedding, effective_filters)
-            if existing and self.fadem_config.enable_forgetting:
-                resolution = resolve_conflict(existing, content, self.llm, self.config.custom_conflict_prompt)
+            prepared.append(
+                {
+                    "content": content,
+                    "categories": mem_categories,
+                    "metadata": mem_metadata,
+                    "echo_result": echo_result,
+                    "strength": effective_strength,
+                    "embed_text": embed_text,
+                }
+            )
 
-                if resolution.classification == "CONTRADICTORY":
-                    self.delete(existing["id"])
-                    event = "UPDATE"
-                elif resolution.classification == "SUBSUMES":
-                    content = resolution.merged_content or content
-                    self.delete(existing["id"])
+        # One embedding request for the whole batch
+        embeddings = self._embed_many([item["embed_text"] for item in prepared], memory_action="add")
+
+        # Neighbour lookups for the whole batch in one vector-store call, then
+        # conflict classifications run concurrently ahead of the (serial) writes below
+        neighbours = self._find_similar_batch(embeddings, effective_filters)
+        lookups = self._map_io(
+            lambda item: self._classify_conflict(item[0], item[1]["content"]),
+            list(zip(neighbours, prepared)),
+        )
+
+        results: List[Dict[str, Any]] = []
+        store_changed = False
+        # The batch is planned first, with any LLM calls, and written afterwards,
+        # so the SQLite write lock is never held across a model request.
+        # pending: memory_id -> (embedding, payload, row) for memories planned
+        # in this batch; deleted: ids the batch removes; boosted: SUBSUMED
+        # targets -> their new strength
+        writes: List[tuple] = []
+        pending: Dict[str, Any] = {}
+        deleted: Dict[str, None] = {}
+        boosted: Dict[str, float] = {}
+        category_updates: List[tuple] = []
+        enable_forgetting = self.fadem_config.enable_forgetting
+        for item, embedding, (existing, resolution) in zip(prepared, embeddings, lookups):
+            content = item["content"]
+            mem_categories = item["categories"]
+            mem_metadata = item["metadata"]
+            echo_result = item["echo_result"]
+            effective_strength = item["strength"]
+
+            # Conflict resolution against nearest memory in scope. Earlier
+            # memories of this batch may have changed the store since the
+            # lookup; re-check the neighbour and only re-ask the LLM if it moved.
+            event = "ADD"
+            if store_changed:
+                current = self._find_similar(embedding, effective_filters, pending, deleted)
+                if (current or {}).get("id") != (existing or {}).get("id"):
+                    existing, resolution = current, None
+                else:
+                    existing = current
+            if existing and existing["id"] in boosted:
+                existing = {**existing, "strength": boosted[existing["id"]]}
+            if existing and enable_forgetting:
+                if resolution is None:
+                    resolution = self._resolve_conflict(existing, content)
+
+                if resolution.classification in ("CONTRADICTORY", "SUBSUMES"):
+                    if resolution.classification == "SUBSUMES":
+                        content = resolution.merged_content or content
+                    writes.append(("delete", existing["id"]))
+                    deleted[existing["id"]] = None
+                    pending.pop(existing["id"], None)
                     event = "UPDATE"
                 elif resolution.classification == "SUBSUMED":
                     # Boost existing memory and skip new
                     boosted_strength = min(1.0, float(existing.get("strength", 1.0)) + 0.05)
-                    self.db.update_memory(existing["id"], {"strength": boosted_strength})
-                    self.db.increment_access(existing["id"])
+                    writes.append(("boost", existing["id"], boosted_strength))
+                    boosted[existing["id"]] = boosted_strength
+                    store_changed = True
                     results.append(
                         {
                             "id": existing["id"],
@@ -237,25 +369,19 @@ class Memory(MemoryBase):
                 "strength": effective_strength,
                 "embedding": embedding,
             }
-
-            self.db.add_memory(memory_data)
-            payload = dict(mem_metadata)
-            payload.update({
+            writes.append(("add", memory_data))
+            payload = {
+                **mem_metadata,
                 "memory": content,
                 "user_id": user_id,
                 "agent_id": agent_id,
                 "run_id": run_id,
                 "app_id": app_id,
                 "categories": mem_categories,
-            })
-            self.vector_store.insert([embedding], payloads=[payload], ids=[memory_id])
-
-            # CategoryMem: Update category stats
-            if self.category_processor and mem_categories:
-                for cat_id in mem_categories:
-                    self.category_processor.update_category_stats(
-                        cat_id, effective_strength, is_addition=True
-                    )
+            }
+            pending[memory_id] = (embedding, payload, memory_data)
+            store_changed = True
+            category_updates.extend((cat_id, effective_strength) for cat_id in mem_categories or ())
 
             results.append(
                 {
@@ -269,6 +395,42 @@ class Memory(MemoryBase):
                 }
             )
 
+        # All of the batch's row writes commit together; the vector store
+        # only changes once they have
+        use_tombstone = self.fadem_config.use_tombstone_deletion
+        added: Dict[str, None] = {}
+        with self.db.transaction():
+            for write in writes:
+                if write[0] == "add":
+                    self.db.add_memory(write[1])
+                    added[write[1]["id"]] = None
+                elif write[0] == "delete":
+                    self.db.delete_memory(write[1], use_tombstone=use_tombstone)
+                else:
+                    self.db.update_memory(write[1], {"strength": write[2]})
+                    self.db.increment_access(write[1])
+
+        stale = [memory_id for memory_id in deleted if memory_id not in added]
+        if stale:
+            self.vector_store.delete_many(stale)
+            self._existing_text_cache.clear()
+        if pending:
+            self.vector_store.insert(
+                [vector for vector, _, _ in pending.values()],
+                payloads=[payload for _, payload, _ in pending.values()],
+                ids=list(pending),
+            )
+
+        # CategoryMem: Update category stats
+        if self.category_processor:
+            for cat_id, strength in category_updates:
+                self.category_processor.update_category_stats(cat_id, strength, is_addition=True)
+
+        if results:
+            self._existing_text_cache.pop(
+                tuple(processed_metadata.get(key) for key in ("user_id", "agent_id", "run_id", "app_id")), None
+            )
+
         # Persist categories after batch
         if self.category_processor:
             self._persist_categories()
@@ -302,7 +464,7 @@ class Memory(MemoryBase):
         if app_id:
             effective_filters["app_id"] = app_id
 
-        query_embedding = self.embedder.embed(query, memory_action="search")
+        query_embedding = self._embed_query(query)
         vector_results = self.vector_store.search(query=query, vectors=query_embedding, limit=limit * 2, filters=effective_filters)
 
         # Prepare query terms for echo-based re-ranking
@@ -324,59 +486,91 @@ class Memory(MemoryBase):
                 # Record access to category
                 self.category_processor.access_category(query_category_id)
 
-        results: List[Dict[str, Any]] = []
+        memories_by_id = self.db.get_memories_batch(
+            [vr.id for vr in vector_results], min_strength=min_strength, categories=categories, include_expired=True
+        )
+        n = len(vector_results)
+        similarities = np.empty(n, dtype=np.float64)
+        strengths = np.empty(n, dtype=np.float64)
+        echo_boosts = np.zeros(n, dtype=np.float64)
+        category_boosts = np.zeros(n, dtype=np.float64)
+        candidates: List[Dict[str, Any]] = []
+        to_boost: List[str] = []
+        to_reecho: List[str] = []
+        # Per-call switches, resolved once rather than re-checked for every row
+        echo_rerank = bool(use_echo_rerank and self.echo_config.enable_echo and query_terms)
+        category_boost = bool(use_category_boost and self.category_processor and query_category_id)
+        reecho = bool(boost_on_access and self.echo_processor and self.echo_config.reecho_on_access)
+        reecho_threshold = self.echo_config.reecho_threshold
+        direct_boost = self.category_config.category_boost_weight
+        related_boost = self.category_config.cross_category_boost
+        matches = compile_filter(filters) if filters else None
+        is_expired = self._is_expired
+        echo_boost = self._calculate_echo_boost
+        today = date.today()
+        expired: List[str] = []
         for vr in vector_results:
-            memory = self.db.get_memory(vr.id)
+            memory = memories_by_id.get(vr.id)
             if not memory:
                 continue
 
             # Skip expired memories
-            if self._is_expired(memory):
-                self.delete(memory["id"])
+            if is_expired(memory, today):
+                expired.append(memory["id"])
                 continue
 
-            if memory.get("strength", 1.0) < min_strength:
-                continue
-            if categories and not any(c in memory.get("categories", []) for c in categories):
-                continue
-            if filters and not matches_filters({**memory, **memory.get("metadata", {})}, filters):
+            if matches is not None and not matches(memory, memory.get("metadata") or {}):
                 continue
 
-            similarity = float(vr.score)
-            strength = float(memory.get("strength", 1.0))
-            combined = composite_score(similarity, strength)
+            i = len(candidates)
+            candidates.append(memory)
+            similarities[i] = vr.score
+            strengths[i] = memory.get("strength", 1.0)
 
-            # EchoMem: Apply echo-based re-ranking boost
-            echo_boost = 0.0
+            # EchoMem: Echo-based re-ranking boost
             metadata = memory.get("metadata", {})
-            if use_echo_rerank and self.echo_config.enable_echo:
-                echo_boost = self._calculate_echo_boost(query_lower, query_terms, metadata)
-                combined = combined * (1 + echo_boost)
-
-            # CategoryMem: Apply category-based re-ranking boost
-            category_boost = 0.0
-            memory_categories = set(memory.get("categories", []))
-            if use_category_boost and self.category_processor and query_category_id:
+            if echo_rerank:
+                echo_boosts[i] = echo_boost(query_lower, query_terms, metadata)
+
+            # CategoryMem: Category-based re-ranking boost
+            if category_boost:
+                memory_categories = set(memory.get("categories", []))
                 if query_category_id in memory_categories:
                     # Direct category match
-                    category_boost = self.category_config.category_boost_weight
+                    category_boosts[i] = direct_boost
                 elif memory_categories & related_category_ids:
                     # Related category match
-                    category_boost = self.category_config.cross_category_boost
-                combined = combined * (1 + category_boost)
+                    category_boosts[i] = related_boost
 
             if boost_on_access:
-                self.db.increment_access(memory["id"])
-                self._check_promotion(memory["id"])
+                to_boost.append(memory["id"])
                 # EchoMem: Re-echo on frequent access
                 if (
-                    self.echo_processor
-                    and self.echo_config.reecho_on_access
-                    and memory.get("access_count", 0) >= self.echo_config.reecho_threshold
+                    reecho
+                    and memory.get("access_count", 0) >= reecho_threshold
                     and metadata.get("echo_depth") != "deep"
                 ):
-                    self._reecho_memory(memory["id"])
+                    to_reecho.append(memory["id"])
+
+        self._delete_many(expired)
 
+        # Score every candidate at once, then build results for the top `limit` only
+        k = len(candidates)
+        similarities, strengths = similarities[:k], strengths[:k]
+        combined = (
+            composite_score_batch(similarities, strengths)
+            * (1.0 + echo_boosts[:k])
+            * (1.0 + category_boosts[:k])
+        )
+        if 0 < limit < k:
+            # Partial selection of the top `limit`, then order just those
+            top = np.argpartition(-combined, limit - 1)[:limit]
+            order = top[np.lexsort((top, -combined[top]))]
+        else:
+            order = np.argsort(-combined, kind="stable")[:limit]
+        results: List[Dict[str, Any]] = []
+        for i in order.tolist():
+            memory = candidates[i]
             results.append(
                 {
                     "id": memory["id"],
@@ -390,51 +584,68 @@ class Memory(MemoryBase):
                     "immutable": memory.get("immutable", False),
                     "created_at": memory.get("created_at"),
                     "updated_at": memory.get("updated_at"),
-                    "score": similarity,
-                    "strength": strength,
+                    "score": float(similarities[i]),
+                    "strength": float(strengths[i]),
                     "layer": memory.get("layer", "sml"),
                     "access_count": memory.get("access_count", 0),
                     "last_accessed": memory.get("last_accessed"),
-                    "composite_score": combined,
-                    "echo_boost": echo_boost,
-                    "category_boost": category_boost,
+                    "composite_score": float(combined[i]),
+                    "echo_boost": float(echo_boosts[i]),
+                    "category_boost": float(category_boosts[i]),
                 }
             )
 
-        # Persist category access updates
+        if to_boost:
+            # One write transaction for all accesses, then one for any promotions
+            accessed = self.db.bulk_increment_access(to_boost)
+            self.db.promote_memories(
+                memory_id
+                for memory_id, access in accessed.items()
+                if should_promote(access["layer"], access["access_count"], access["strength"], self.fadem_config)
+            )
+        for memory_id in to_reecho:
+            # Re-echo calls the LLM; keep it off the search path
+            self._get_io_pool().submit(self._reecho_memory, memory_id)
+
+        # Persist category access updates, coalescing bursts of searches
         if self.category_processor:
-            self._persist_categories()
+            self._schedule_persist_categories()
 
-        results.sort(key=lambda x: x["composite_score"], reverse=True)
-        return {"results": results[:limit]}
+        return {"results": results}
 
     def _calculate_echo_boost(
         self, query_lower: str, query_terms: set, metadata: Dict[str, Any]
     ) -> float:
-        """Calculate re-ranking boost based on echo metadata matches."""
+        """Calculate re-ranking boost based on echo metadata matches.
+
+        Uses the term lists stored by EchoResult.to_metadata(); memories
+        written before those existed are tokenized here instead.
+        """
         boost = 0.0
 
         # Keyword match boost (each matching keyword adds 0.05)
-        keywords = metadata.get("echo_keywords", [])
+        keywords = metadata.get("echo_keyword_terms")
+        if keywords is None:
+            keywords = [kw.lower() for kw in metadata.get("echo_keywords") or []]
         if keywords:
-            keyword_matches = sum(1 for kw in keywords if kw.lower() in query_lower)
-            boost += keyword_matches * 0.05
+            boost += sum(1 for kw in keywords if kw in query_lower) * 0.05
 
         # Question form similarity boost (if query is similar to question_form)
-        question_form = metadata.get("echo_question_form", "")
-        if question_form:
-            q_terms = set(question_form.lower().split())
-            overlap = len(query_terms & q_terms)
+        q_terms = metadata.get("echo_question_form_terms")
+        if q_terms is None:
+            q_terms = (metadata.get("echo_question_form") or "").lower().split()
+        if q_terms:
+            overlap = len(query_terms.intersection(q_terms))
             if overlap > 0:
                 boost += min(0.15, overlap * 0.05)
 
         # Implication match boost
-        implications = metadata.get("echo_implications", [])
-        if implications:
-            for impl in implications:
-                impl_terms = set(impl.lower().split())
-                if query_terms & impl_terms:
-                    boost += 0.03
+        implication_terms = metadata.get("echo_implication_terms")
+        if implication_terms is None:
+            implication_terms = [impl.lower().split() for impl in metadata.get("echo_implications") or []]
+        for impl_terms in implication_terms:
+            if not query_terms.isdisjoint(impl_terms):
+                boost += 0.03
 
         # Cap boost at 0.3 (30% max increase)
         return min(0.3, boost)
@@ -495,19 +706,21 @@ class Memory(MemoryBase):
             app_id=app_id,
             layer=layer,
             min_strength=min_strength,
+            categories=categories,
+            exclude_expired=True,
+            # Metadata filters are still applied here, so only cap in SQL without them
+            limit=None if filters else limit,
         )
 
-        if categories:
-            memories = [m for m in memories if any(c in m.get("categories", []) for c in categories)]
-
         if filters:
-            memories = [m for m in memories if matches_filters({**m, **m.get("metadata", {})}, filters)]
+            matches = compile_filter(filters)
+            memories = [m for m in memories if matches(m, m.get("metadata") or {})]
 
-        memories = [m for m in memories if not self._is_expired(m)]
         return {"results": memories[:limit]}
 
     def update(self, memory_id: str, data: str) -> Dict[str, Any]:
         new_embedding = self.embedder.embed(data, memory_action="update")
+        self._existing_text_cache.clear()
         success = self.db.update_memory(memory_id, {"memory": data, "embedding": new_embedding})
         existing = self.vector_store.get(memory_id)
         if existing:
@@ -519,8 +732,18 @@ class Memory(MemoryBase):
     def delete(self, memory_id: str) -> Dict[str, Any]:
         self.db.delete_memory(memory_id, use_tombstone=self.fadem_config.use_tombstone_deletion)
         self.vector_store.delete(memory_id)
+        self._existing_text_cache.clear()
         return {"id": memory_id, "deleted": True}
 
+    def _delete_many(self, memory_ids: List[str]) -> int:
+        """delete() for many ids: one SQLite transaction and one vector-store call."""
+        if not memory_ids:
+            return 0
+        self.db.delete_memories_bulk(memory_ids, use_tombstone=self.fadem_config.use_tombstone_deletion)
+        self.vector_store.delete_many(memory_ids)
+        self._existing_text_cache.clear()
+        return len(memory_ids)
+
     def delete_all(
         self,
         user_id: str = None,
@@ -537,21 +760,17 @@ class Memory(MemoryBase):
             )
         memories = self.db.get_all_memories(user_id=user_id, agent_id=agent_id, run_id=run_id, app_id=app_id)
         if filters:
-            memories = [m for m in memories if matches_filters({**m, **m.get("metadata", {})}, filters)]
+            matches = compile_filter(filters)
+            memories = [m for m in memories if matches(m, m.get("metadata") or {})]
 
-        count = 0
-        for memory in memories:
-            self.delete(memory["id"])
-            count += 1
-        return {"deleted_count": count}
+        return {"deleted_count": self._delete_many([memory["id"] for memory in memories])}
 
     def history(self, memory_id: str) -> List[Dict[str, Any]]:
         return self.db.get_history(memory_id)
 
     def reset(self) -> None:
         memories = self.db.get_all_memories(include_tombstoned=True)
-        for mem in memories:
-            self.delete(mem["id"])
+        self._delete_many([mem["id"] for mem in memories])
         if hasattr(self.vector_store, "reset"):
             self.vector_store.reset()
 
@@ -560,78 +779,62 @@ class Memory(MemoryBase):
         if not self.fadem_config.enable_forgetting:
             return {"decayed": 0, "forgotten": 0, "promoted": 0}
 
-        memories = self.db.get_all_memories(
-            user_id=scope.get("user_id") if scope else None,
-            agent_id=scope.get("agent_id") if scope else None,
-            run_id=scope.get("run_id") if scope else None,
-            app_id=scope.get("app_id") if scope else None,
-        )
-
-        decayed = 0
-        forgotten = 0
-        promoted = 0
-
-        for memory in memories:
-            if memory.get("immutable"):
-                continue
-
-            new_strength = calculate_decayed_strength(
-                current_strength=memory.get("strength", 1.0),
-                last_accessed=memory.get("last_accessed", datetime.utcnow().isoformat()),
-                access_count=memory.get("access_count", 0),
-                layer=memory.get("layer", "sml"),
-                config=self.fadem_config,
+        # Decay, promotions and forgetting commit together
+        with self.db.transaction():
+            result = self.db.decay_memories(
+                sql_decay_function(self.fadem_config),
+                forgetting_threshold=self.fadem_config.forgetting_threshold,
+                promotion_access_threshold=self.fadem_config.promotion_access_threshold,
+                promotion_strength_threshold=self.fadem_config.promotion_strength_threshold,
+                user_id=scope.get("user_id") if scope else None,
+                agent_id=scope.get("agent_id") if scope else None,
+                run_id=scope.get("run_id") if scope else None,
+                app_id=scope.get("app_id") if scope else None,
             )
+            self.db.delete_memories_bulk(
+                result["forget_ids"], use_tombstone=self.fadem_config.use_tombstone_deletion
+            )
+        self.vector_store.delete_many(result["forget_ids"])
+        decayed = result["decayed"]
+        forgotten = len(result["forget_ids"])
+        promoted = result["promoted"]
 
-            if should_forget(new_strength, self.fadem_config):
-                self.delete(memory["id"])
-                forgotten += 1
-                continue
-
-            if new_strength != memory.get("strength"):
-                self.db.update_memory(memory["id"], {"strength": new_strength})
-                self.db.log_event(memory["id"], "DECAY", old_strength=memory.get("strength"), new_strength=new_strength)
-                decayed += 1
-
-            if should_promote(
-                memory.get("layer", "sml"),
-                memory.get("access_count", 0),
-                new_strength,
-                self.fadem_config,
-            ):
-                self.db.update_memory(memory["id"], {"layer": "lml"})
-                self.db.log_event(memory["id"], "PROMOTE", old_layer="sml", new_layer="lml")
-                promoted += 1
-
-        if self.fadem_config.use_tombstone_deletion:
-            self.db.purge_tombstoned()
+        if self.fadem_config.use_tombstone_deletion and self.db.purge_tombstoned():
+            self.db.incremental_vacuum()
 
         self.db.log_decay(decayed, forgotten, promoted)
         return {"decayed": decayed, "forgotten": forgotten, "promoted": promoted}
 
     def fuse_memories(self, memory_ids: List[str], user_id: str = None) -> Dict[str, Any]:
-        memories = [self.db.get_memory(mid) for mid in memory_ids]
-        memories = [m for m in memories if m]
-        if len(memories) < 2:
-            return {"error": "Need at least 2 memories to fuse"}
-
-        fused = fuse_memories(memories, self.llm, self.config.custom_fusion_prompt)
-        result = self.add(
-            fused.content,
-            user_id=user_id or memories[0].get("user_id"),
-            agent_id=memories[0].get("agent_id"),
-            run_id=memories[0].get("run_id"),
-            app_id=memories[0].get("app_id"),
-            initial_layer=fused.layer,
-            initial_strength=fused.strength,
-            infer=False,
+        return self.fuse_memory_groups([memory_ids], user_id=user_id)[0]
+
+    def fuse_memory_groups(self, groups: List[List[str]], user_id: str = None) -> List[Dict[str, Any]]:
+        """fuse_memories for several groups of ids, with their LLM calls run concurrently."""
+        memories_by_id = self.db.get_memories_batch([mid for memory_ids in groups for mid in memory_ids])
+        clusters = [[memories_by_id[mid] for mid in memory_ids if mid in memories_by_id] for memory_ids in groups]
+        fusable = [i for i, memories in enumerate(clusters) if len(memories) >= 2]
+        fused_all = self._map_io(
+            lambda i: fuse_memories(clusters[i], self.llm, self.config.custom_fusion_prompt), fusable
         )
 
-        for mid in memory_ids:
-            self.delete(mid)
+        results: List[Dict[str, Any]] = [{"error": "Need at least 2 memories to fuse"} for _ in groups]
+        for i, fused in zip(fusable, fused_all):
+            memories = clusters[i]
+            result = self.add(
+                fused.content,
+                user_id=user_id or memories[0].get("user_id"),
+                agent_id=memories[0].get("agent_id"),
+                run_id=memories[0].get("run_id"),
+                app_id=memories[0].get("app_id"),
+                initial_layer=fused.layer,
+                initial_strength=fused.strength,
+                infer=False,
+            )
+            self._delete_many(groups[i])
 
-        fused_id = result.get("results", [{}])[0].get("id") if result.get("results") else None
-        return {"fused_id": fused_id, "source_ids": memory_ids, "fused_memory": fused.content}
+            fused_id = result.get("results", [{}])[0].get("id") if result.get("results") else None
+            results[i] = {"fused_id": fused_id, "source_ids": groups[i], "fused_memory": fused.content}
+        return results
 
     def get_stats(self, user_id: str = None) -> Dict[str, Any]:
         memories = self.db.get_all_memories(user_id=user_id)
@@ -673,15 +876,10 @@ class Memory(MemoryBase):
         prompt: Optional[str] = None,
         includes: Optional[str] = None,
         excludes: Optional[str] = None,
+        on_memory: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> List[Dict[str, Any]]:
         conversation = parse_messages(messages)
-        existing = self.db.get_all_memories(
-            user_id=metadata.get("user_id"),
-            agent_id=metadata.get("agent_id"),
-            run_id=metadata.get("run_id"),
-            app_id=metadata.get("app_id"),
-        )
-        existing_text = "\n".join([m.get("memory", "") for m in existing])
+        existing_text = self._existing_memories_text(metadata)
 
         if prompt or self.config.custom_fact_extraction_prompt:
             extraction_prompt = prompt or self.config.custom_fact_extraction_prompt
@@ -690,30 +888,45 @@ class Memory(MemoryBase):
                 extraction_prompt = AGENT_MEMORY_EXTRACTION_PROMPT
             else:
                 extraction_prompt = MEMORY_EXTRACTION_PROMPT
-        prompt_text = extraction_prompt.format(conversation=conversation, existing_memories=existing_text)
+        prompt_text = render_prompt(extraction_prompt, conversation=conversation, existing_memories=existing_text)
 
+        def keep(memory: Dict[str, Any]) -> bool:
+            content = memory.get("content", "").lower()
+            if includes and includes.lower() not in content:
+                return False
+            return not (excludes and excludes.lower() in content)
+
+        # Memories are handed to on_memory as soon as they stream in, so the
+        # caller can start on them while the rest of the response generates
+        chunks: List[str] = []
+
+        def stream():
+            for chunk in self.llm.stream(prompt_text):
+                chunks.append(chunk)
+                yield chunk
+
+        extracted: List[Dict[str, Any]] = []
         try:
-            response = self.llm.generate(prompt_text)
-            data = strip_code_fences(response)
+            for m in iter_json_array_objects(stream()):
+                memory = _extracted_memory(m)
+                if memory and keep(memory):
+                    extracted.append(memory)
+                    if on_memory:
+                        on_memory(memory)
+            if extracted:
+                return extracted
+
+            # Nothing streamed out whole: parse the full response as before
+            data = strip_code_fences("".join(chunks))
             if not data:
                 return []
-            parsed = json.loads(data)
-            memories = parsed.get("memories", [])
-            extracted = [
-                {
-                    "content": m.get("content", ""),
-                    "categories": [m.get("category")] if m.get("category") else [],
-                    "metadata": {"importance": m.get("importance"), "confidence": m.get("confidence")},
-                }
-                for m in memories
-                if isinstance(m, dict)
-            ]
-            if includes:
-                extracted = [m for m in extracted if includes.lower() in m.get("content", "").lower()]
-            if excludes:
-                extracted = [m for m in extracted if excludes.lower() not in m.get("content", "").lower()]
-            return extracted
+            parsed = fastjson.loads(data)
+            memories = (_extracted_memory(m) for m in parsed.get("memories", []))
+            return [m for m in memories if m and keep(m)]
         except Exception as exc:
+            if extracted:
+                logger.warning(f"Extraction stream ended early, keeping {len(extracted)} memories: {exc}")
+                return extracted
             logger.warning(f"Failed to parse extraction response: {exc}")
             # Fallback: add last user message
             last_user = next((m for m in reversed(messages) if m.get("role") == "user"), None)
@@ -721,29 +934,126 @@ class Memory(MemoryBase):
                 return [{"content": last_user.get("content", "") }]
             return []
 
+    _EXISTING_TEXT_CACHE_SIZE = 256
+
+    def _existing_memories_text(self, metadata: Dict[str, Any]) -> str:
+        """Newline-joined memories in the metadata's scope, for extraction prompts.
+
+        Cached per scope and reused while the scope's memory count is
+        unchanged; add/update/delete through this instance also invalidate it.
+        """
+        scope = {key: metadata.get(key) for key in ("user_id", "agent_id", "run_id", "app_id")}
+        key = tuple(scope.values())
+        count = self.db.get_memory_count(**scope)
+        cached = self._existing_text_cache.get(key)
+        if cached is not None and cached[1] == count:
+            return cached[0]
+
+        existing = self.db.get_all_memories(**scope, limit=self.config.extraction_context_limit or None)
+        text = "\n".join(m.get("memory", "") for m in existing)
+        if len(self._existing_text_cache) >= self._EXISTING_TEXT_CACHE_SIZE:
+            self._existing_text_cache.pop(next(iter(self._existing_text_cache)), None)
+        self._existing_text_cache[key] = (text, count)
+        return text
+
     def _should_use_agent_memory_extraction(self, messages: List[Dict[str, Any]], metadata: Dict[str, Any]) -> bool:
         has_agent_id = metadata.get("agent_id") is not None
         has_assistant_messages = any(msg.get("role") == "assistant" for msg in messages)
         return has_agent_id and has_assistant_messages
 
-    def _find_similar(self, embedding: List[float], filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        results = self.vector_store.search(query=None, vectors=embedding, limit=1, filters=filters)
-        if results and results[0].score >= self.fadem_config.conflict_similarity_threshold:
-            return self.db.get_memory(results[0].id)
+    def _embed_query(self, query: str) -> List[float]:
+        """Embed a search query, reusing the vector for recently repeated queries."""
+        embed_cached = getattr(self.embedder, "embed_cached", None)
+        if embed_cached is not None:
+            return embed_cached(query, memory_action="search")
+        return self.embedder.embed(query, memory_action="search")
+
+    def _embed_many(self, texts: List[str], memory_action: Optional[str] = None) -> List[Any]:
+        """Embed texts with one batch call, or per item for embedders without embed_batch."""
+        if not texts:
+            return []
+        embed_batch = getattr(self.embedder, "embed_batch", None)
+        if embed_batch is not None:
+            return embed_batch(texts, memory_action=memory_action)
+        return [self.embedder.embed(text, memory_action=memory_action) for text in texts]
+
+    def _map_io(self, fn, items: List[Any]) -> List[Any]:
+        """Run blocking vector-store/LLM work over items concurrently, preserving order."""
+        if len(items) <= 1 or self.fadem_config.conflict_concurrency <= 1:
+            return [fn(item) for item in items]
+        return list(self._get_io_pool().map(fn, items))
+
+    def _get_io_pool(self) -> ThreadPoolExecutor:
+        if self._io_pool is None:
+            # Long-lived so its threads (and their SQLite connections) are reused
+            self._io_pool = ThreadPoolExecutor(
+                max_workers=max(1, self.fadem_config.conflict_concurrency), thread_name_prefix="engram-io"
+            )
+        return self._io_pool
+
+    def _resolve_conflict(self, existing: Dict[str, Any], content: str):
+        return resolve_conflict(
+            existing,
+            content,
+            self.llm,
+            self.config.custom_conflict_prompt,
+            cache=self._conflict_cache,
+        )
+
+    def _classify_conflict(self, existing: Optional[Dict[str, Any]], content: str):
+        """The nearest existing memory and, if it conflicts, its classification."""
+        if existing and self.fadem_config.enable_forgetting:
+            return existing, self._resolve_conflict(existing, content)
+        return existing, None
+
+    def _find_similar_batch(self, embeddings: List[Any], filters: Dict[str, Any]) -> List[Optional[Dict[str, Any]]]:
+        """_find_similar for many embeddings (without pending memories), with one
+        vector-store search and one row fetch."""
+        if not len(embeddings):
+            return []
+        threshold = self.fadem_config.conflict_similarity_threshold
+        nearest = [
+            hits[0].id if hits and hits[0].score >= threshold else None
+            for hits in self.vector_store.search_batch(embeddings, limit=1, filters=filters)
+        ]
+        rows = self.db.get_memories_batch([memory_id for memory_id in nearest if memory_id])
+        return [rows.get(memory_id) if memory_id else None for memory_id in nearest]
+
+    def _find_similar(
+        self,
+        embedding: List[float],
+        filters: Dict[str, Any],
+        pending: Optional[Dict[str, Any]] = None,
+        deleted: Collection[str] = (),
+    ) -> Optional[Dict[str, Any]]:
+        """Nearest memory in scope above the conflict threshold.
+
+        `pending` maps ids to (embedding, payload, row) for memories planned in
+        the current add() batch that are not stored yet; `deleted` ids are
+        about to be removed and are skipped.
+        """
+        results = self.vector_store.search(query=None, vectors=embedding, limit=1 + len(deleted), filters=filters)
+        best = next((r for r in results if r.id not in deleted), None)
+        best_id, best_score = (best.id, best.score) if best else (None, float("-inf"))
+
+        pending = pending or {}
+        candidates = [
+            (memory_id, vector)
+            for memory_id, (vector, payload, _) in pending.items()
+            if not filters or matches_filters(payload, filters)
+        ]
+        if candidates:
+            scores = cosine_batch(embedding, [vector for _, vector in candidates])
+            top = int(np.argmax(scores))
+            if scores[top] > best_score:
+                best_id, best_score = candidates[top][0], float(scores[top])
+
+        if best_id is not None and best_score >= self.fadem_config.conflict_similarity_threshold:
+            return pending[best_id][2] if best_id in pending else self.db.get_memory(best_id)
         return None
 
-    def _check_promotion(self, memory_id: str) -> None:
-        memory = self.db.get_memory(memory_id)
-        if memory and should_promote(
-            memory.get("layer", "sml"),
-            memory.get("access_count", 0),
-            memory.get("strength", 1.0),
-            self.fadem_config,
-        ):
-            self.db.update_memory(memory_id, {"layer": "lml"})
-            self.db.log_event(memory_id, "PROMOTE", old_layer="sml", new_layer="lml")
-
-    def _is_expired(self, memory: Dict[str, Any]) -> bool:
+    def _is_expired(self, memory: Dict[str, Any], today: Optional[date] = None) -> bool:
+        """`today` lets loops over many memories read the clock once."""
         expiration = memory.get("expiration_date")
         if not expiration:
             return False
@@ -751,15 +1061,83 @@ class Memory(MemoryBase):
             exp_date = date.fromisoformat(expiration)
         except Exception:
             return False
-        return date.today() > exp_date
+        return (today or date.today()) > exp_date
 
     # CategoryMem methods
     def _persist_categories(self) -> None:
-        """Persist category state to database."""
+        """Persist categories changed since the last save; no-op when nothing changed."""
         if not self.category_processor:
             return
-        categories = self.category_processor.get_all_categories()
-        self.db.save_all_categories(categories)
+        changed, removed = self.category_processor.pop_changes()
+        if not changed and not removed:
+            return
+        try:
+            with self.db.transaction():
+                self.db.save_all_categories(changed)
+                self.db.delete_categories(removed)
+        except Exception:
+            # Nothing was committed: keep the changes for the next save
+            self.category_processor.restore_changes([cat["id"] for cat in changed], removed)
+            raise
+
+    _CATEGORY_PERSIST_DELAY = 0.5
+
+    def _schedule_persist_categories(self) -> None:
+        """Save changed category state shortly, restarting the wait on every call."""
+        if not self.category_processor or not self.category_processor.has_changes():
+            return
+        with self._persist_cond:
+            if self._persist_stop:
+                return
+            self._persist_due = time.monotonic() + self._CATEGORY_PERSIST_DELAY
+            if self._persist_worker is None:
+                self._persist_worker = threading.Thread(
+                    target=self._persist_loop, name="engram-category-persist", daemon=True
+                )
+                self._persist_worker.start()
+            self._persist_cond.notify()
+
+    def _persist_loop(self) -> None:
+        while True:
+            with self._persist_cond:
+                while not self._persist_stop:
+                    if self._persist_due is None:
+                        self._persist_cond.wait()
+                        continue
+                    remaining = self._persist_due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._persist_cond.wait(remaining)
+                if self._persist_stop:
+                    return
+            self._flush_categories()
+
+    def _flush_categories(self) -> None:
+        with self._persist_cond:
+            self._persist_due = None
+        try:
+            self._persist_categories()
+        except Exception as e:
+            # Runs on the persist worker, where nobody would see the exception
+            logger.error(f"Saving categories failed, will retry on the next save: {e}")
+
+    def close(self) -> None:
+        """Save pending category state, wait for background work and close the database."""
+        with self._persist_cond:
+            self._persist_stop = True
+            self._persist_cond.notify()
+            worker, self._persist_worker = self._persist_worker, None
+        if worker is not None:
+            worker.join()
+        self._flush_categories()
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
+        # Stores that log changes (FAISS) fold them into a snapshot here
+        flush = getattr(self.vector_store, "flush", None)
+        if flush is not None:
+            flush()
+        self.db.close()
 
     def get_categories(self) -> List[Dict[str, Any]]:
         """Get all categories."""
@@ -814,13 +1192,16 @@ class Memory(MemoryBase):
         if not self.category_processor:
             return {}
 
+        cats = self.category_processor.get_active_categories()
+        # Only categories without a cached summary go to the LLM
+        missing_ids = [cat.id for cat in cats if not cat.summary]
+        if missing_ids:
+            missing = self.db.get_memories_by_categories(missing_ids, limit=20)
+            self.category_processor.generate_summaries(missing)
+
         summaries = {}
-        for cat in self.category_processor.categories.values():
-            if cat.memory_count > 0:
-                if not cat.summary:
-                    memories = self.db.get_memories_by_category(cat.id, limit=20)
-                    self.category_processor.generate_summary(cat.id, memories)
-                summaries[cat.name] = cat.summary or f"{cat.memory_count} memories"
+        for cat in cats:
+            summaries[cat.name] = cat.summary or f"{cat.memory_count} memories"
 
         self._persist_categories()
         return summaries
@@ -835,19 +1216,22 @@ class Memory(MemoryBase):
         if not self.category_processor:
             return []
 
-        def node_to_dict(node) -> Dict[str, Any]:
-            return {
+        tree: List[Dict[str, Any]] = []
+        stack = [(node, tree) for node in reversed(self.category_processor.get_category_tree())]
+        while stack:
+            node, siblings = stack.pop()
+            entry = {
                 "id": node.category.id,
                 "name": node.category.name,
                 "description": node.category.description,
                 "memory_count": node.category.memory_count,
                 "strength": node.category.strength,
                 "depth": node.depth,
-                "children": [node_to_dict(child) for child in node.children],
+                "children": [],
             }
-
-        tree_nodes = self.category_processor.get_category_tree()
-        return [node_to_dict(node) for node in tree_nodes]
+            siblings.append(entry)
+            stack.extend((child, entry["children"]) for child in reversed(node.children))
+        return tree
 
     def apply_category_decay(self) -> Dict[str, Any]:
         """
@@ -865,6 +1249,7 @@ class Memory(MemoryBase):
             decay_rate=self.category_config.category_decay_rate
         )
 
+        # Save what decay changed, merged or deleted
         self._persist_categories()
         return result
 
@@ -918,7 +1303,8 @@ class Memory(MemoryBase):
             category_id, limit=limit, min_strength=min_strength
         )
 
-        self._persist_categories()
+        # The access only bumps counters; save it with the next debounced flush
+        self._schedule_persist_categories()
 
         return {
             "results": memories,
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import hashlib
 from copy import deepcopy
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from engram.exceptions import FadeMemValidationError
+from engram.utils import fastjson
 
 
 def normalize_messages(messages: Any) -> List[Dict[str, Any]]:
@@ -48,6 +49,46 @@ def strip_code_fences(text: str) -> str:
     return text.strip()
 
 
+def iter_json_array_objects(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield each object of a {"key": [{...}, ...]} JSON document as soon as it
+    has streamed in completely.
+
+    `chunks` is the document split arbitrarily (e.g. streamed LLM output);
+    text outside the outer object, such as code fences, is ignored. Objects
+    that fail to decode are skipped.
+    """
+    stack: List[str] = []  # open containers, "{" or "["
+    pending: List[str] = []  # text of the current element object
+    in_string = escaped = False
+    for chunk in chunks:
+        start = 0 if pending else None
+        for i, char in enumerate(chunk):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = bool(stack)
+            elif char in "{[":
+                stack.append(char)
+                if len(stack) == 3 and stack[:2] == ["{", "["] and char == "{":
+                    start = i
+            elif char in "}]" and stack:
+                stack.pop()
+                if stack == ["{", "["] and start is not None:
+                    pending.append(chunk[start:i + 1])
+                    text, pending, start = "".join(pending), [], None
+                    try:
+                        yield fastjson.loads(text)
+                    except ValueError:
+                        pass
+        if start is not None:
+            pending.append(chunk[start:])
+
+
 def build_filters_and_metadata(
     *,
     user_id: Optional[str] = None,
@@ -167,6 +208,47 @@ def matches_filters(data: Dict[str, Any], filters: Optional[Dict[str, Any]]) ->
     return True
 
 
+def _compile_condition(condition: Any) -> Callable[[Any], bool]:
+    if condition == "*":
+        return lambda value: value is not None
+    if not isinstance(condition, dict):
+        return lambda value: value == condition
+    operators = list(condition.items())
+    return lambda value: all(_value_matches_operator(value, op, expected) for op, expected in operators)
+
+
+def compile_filter(filters: Optional[Dict[str, Any]]) -> Callable[[Dict[str, Any], Dict[str, Any]], bool]:
+    """Compile a filter spec into a predicate over (memory, metadata).
+
+    pred(m, m.get("metadata") or {}) is equivalent to
+    matches_filters({**m, **m.get("metadata", {})}, filters), without the
+    per-row dict merge or re-walking the spec; metadata keys take precedence.
+    """
+    if not filters:
+        return lambda memory, metadata: True
+
+    predicates: List[Callable[[Dict[str, Any], Dict[str, Any]], bool]] = []
+    for key, condition in filters.items():
+        if key in ("AND", "OR", "NOT"):
+            if not isinstance(condition, list):
+                return lambda memory, metadata: False
+            subs = [compile_filter(sub) for sub in condition]
+            if key == "AND":
+                predicates.append(lambda m, md, subs=subs: all(p(m, md) for p in subs))
+            elif key == "OR":
+                predicates.append(lambda m, md, subs=subs: any(p(m, md) for p in subs))
+            else:
+                predicates.append(lambda m, md, subs=subs: not any(p(m, md) for p in subs))
+            continue
+
+        test = _compile_condition(condition)
+        predicates.append(lambda m, md, key=key, test=test: test(md[key] if key in md else m.get(key)))
+
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda memory, metadata: all(p(memory, metadata) for p in predicates)
+
+
 def normalize_categories(categories: Optional[Iterable[str]]) -> List[str]:
     if not categories:
         return []
@@ -0,0 +1,5 @@
+import sys
+
+# `@dataclass(**DATACLASS_SLOTS)` gives slotted dataclasses on Python 3.10+
+# and falls back to regular (dict-backed) ones on 3.9.
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -1,50 +1,49 @@
-from typing import Any, Dict
+import importlib
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+# provider -> (module, class); modules are imported on first use only
+_EMBEDDERS: Dict[str, Tuple[str, str]] = {
+    "gemini": ("engram.embeddings.gemini", "GeminiEmbedder"),
+    "simple": ("engram.embeddings.simple", "SimpleEmbedder"),
+    "openai": ("engram.embeddings.openai", "OpenAIEmbedder"),
+}
+_LLMS: Dict[str, Tuple[str, str]] = {
+    "gemini": ("engram.llms.gemini", "GeminiLLM"),
+    "mock": ("engram.llms.mock", "MockLLM"),
+    "openai": ("engram.llms.openai", "OpenAILLM"),
+}
+_VECTOR_STORES: Dict[str, Tuple[str, str]] = {
+    "qdrant": ("engram.vector_stores.qdrant", "QdrantVectorStore"),
+    "memory": ("engram.vector_stores.memory", "InMemoryVectorStore"),
+    "faiss": ("engram.vector_stores.faiss_store", "FaissVectorStore"),
+}
+
+
+@lru_cache(maxsize=None)
+def _load(module: str, name: str):
+    return getattr(importlib.import_module(module), name)
+
 
 class EmbedderFactory:
     @classmethod
     def create(cls, provider: str, config: Dict[str, Any]):
-        if provider == "gemini":
-            from engram.embeddings.gemini import GeminiEmbedder
-
-            return GeminiEmbedder(config)
-        if provider == "simple":
-            from engram.embeddings.simple import SimpleEmbedder
-
-            return SimpleEmbedder(config)
-        if provider == "openai":
-            from engram.embeddings.openai import OpenAIEmbedder
-
-            return OpenAIEmbedder(config)
-        raise ValueError(f"Unsupported embedder provider: {provider}")
+        if provider not in _EMBEDDERS:
+            raise ValueError(f"Unsupported embedder provider: {provider}")
+        return _load(*_EMBEDDERS[provider])(config)
 
 
 class LLMFactory:
     @classmethod
     def create(cls, provider: str, config: Dict[str, Any]):
-        if provider == "gemini":
-            from engram.llms.gemini import GeminiLLM
-
-            return GeminiLLM(config)
-        if provider == "mock":
-            from engram.llms.mock import MockLLM
-
-            return MockLLM(config)
-        if provider == "openai":
-            from engram.llms.openai import OpenAILLM
-
-            return OpenAILLM(config)
-        raise ValueError(f"Unsupported LLM provider: {provider}")
+        if provider not in _LLMS:
+            raise ValueError(f"Unsupported LLM provider: {provider}")
+        return _load(*_LLMS[provider])(config)
 
 
 class VectorStoreFactory:
     @classmethod
     def create(cls, provider: str, config: Dict[str, Any]):
-        if provider == "qdrant":
-            from engram.vector_stores.qdrant import QdrantVectorStore
-
-            return QdrantVectorStore(config)
-        if provider == "memory":
-            from engram.vector_stores.memory import InMemoryVectorStore
-
-            return InMemoryVectorStore(config)
-        raise ValueError(f"Unsupported vector store provider: {provider}")
+        if provider not in _VECTOR_STORES:
+            raise ValueError(f"Unsupported vector store provider: {provider}")
+        return _load(*_VECTOR_STORES[provider])(config)
@@ -0,0 +1,36 @@
+"""
+JSON helpers that use orjson when it is installed.
+
+orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+catching ValueError either way.
+"""
+
+import json
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install "engram[speedups]"
+    orjson = None
+
+
+def loads(data: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text; with orjson, non-str dict keys are stringified like json does."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def extract_json(text: str, opener: str = "{", closer: str = "}") -> Optional[str]:
+    """Return the outermost JSON object (or array) span in an LLM response, if any."""
+    start = text.find(opener)
+    end = text.rfind(closer) + 1
+    if start >= 0 and end > start:
+        return text[start:end]
+    return None
@@ -1,3 +1,7 @@
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Optional, Tuple
+
 MEMORY_EXTRACTION_PROMPT = """You are extracting memorable facts from a conversation to store in a long-term memory system.
 
 CONVERSATION:
@@ -198,3 +202,30 @@ Rules:
 - discarded_as_redundant lists information dropped because it was repetitive
 - confidence reflects how well the memories merged (lower if they seem unrelated)
 """
+
+
+@lru_cache(maxsize=64)
+def _compile(template: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    """Split a template into (literal, field) pairs once; None if it needs full str.format."""
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            return None
+        parts.append((literal, field))
+    return tuple(parts)
+
+
+def render_prompt(template: str, **values: Any) -> str:
+    """template.format(**values) without re-parsing the template on every call.
+
+    Templates with positional, indexed or formatted fields fall back to str.format.
+    """
+    parts = _compile(template)
+    if parts is None:
+        return template.format(**values)
+    out = []
+    for literal, field in parts:
+        out.append(literal)
+        if field is not None:
+            out.append(format(values[field]))
+    return "".join(out)
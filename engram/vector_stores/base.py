@@ -1,5 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Query/insert vectors may be plain float lists or NumPy arrays; stores convert
+# with np.asarray, so arrays pass through without a per-element copy.
+Vector = Union[np.ndarray, Sequence[float]]
+Vectors = Union[np.ndarray, Sequence[Vector]]
 
 
 class VectorStoreBase(ABC):
@@ -8,19 +15,31 @@ class VectorStoreBase(ABC):
         pass
 
     @abstractmethod
-    def insert(self, vectors: List[List[float]], payloads: Optional[List[Dict[str, Any]]] = None, ids: Optional[List[str]] = None) -> None:
+    def insert(self, vectors: Vectors, payloads: Optional[List[Dict[str, Any]]] = None, ids: Optional[List[str]] = None) -> None:
         pass
 
+    def insert_bulk(self, vectors: Vectors, payloads: Optional[List[Dict[str, Any]]] = None, ids: Optional[List[str]] = None) -> None:
+        """insert() for large one-off loads; stores whose index can be built after the load override this."""
+        self.insert(vectors, payloads=payloads, ids=ids)
+
     @abstractmethod
-    def search(self, query: Optional[str], vectors: List[float], limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Any]:
+    def search(self, query: Optional[str], vectors: Vector, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Any]:
         pass
 
+    def search_batch(self, vectors: Vectors, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[List[Any]]:
+        """search() for several query vectors at once, one result list per query."""
+        return [self.search(query=None, vectors=vector, limit=limit, filters=filters) for vector in vectors]
+
     @abstractmethod
     def delete(self, vector_id: str) -> None:
         pass
 
+    def delete_many(self, vector_ids: List[str]) -> None:
+        for vector_id in vector_ids:
+            self.delete(vector_id)
+
     @abstractmethod
-    def update(self, vector_id: str, vector: Optional[List[float]] = None, payload: Optional[Dict[str, Any]] = None) -> None:
+    def update(self, vector_id: str, vector: Optional[Vector] = None, payload: Optional[Dict[str, Any]] = None) -> None:
         pass
 
     @abstractmethod
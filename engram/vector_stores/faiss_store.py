@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from engram.memory.utils import matches_filters
+from engram.vector_stores.base import Vector, Vectors, VectorStoreBase
+
+
+# "quantization" config value -> FAISS scalar quantizer type for the index copy
+_SQ_TYPES = {None: None, "float16": "QT_fp16", "int8": "QT_8bit"}
+
+# The change log is folded into a fresh snapshot once it holds this many
+# operations, or more operations than there are live vectors
+_MIN_LOG_OPS = 1024
+
+
+@dataclass
+class MemoryResult:
+    id: str
+    score: float = 0.0
+    payload: Dict[str, Any] = None
+
+
+class FaissVectorStore(VectorStoreBase):
+    """In-process vector store on a FAISS index.
+
+    Vectors are L2-normalized so inner product is cosine similarity. FAISS
+    HNSW indexes can't remove points, so deletes and vector updates only
+    mark the old row dead; searches skip dead rows and the index is rebuilt
+    once they outnumber the live ones. Payload filters are applied to the
+    ANN candidates, over-fetching until `limit` matches are found.
+
+    A "quantization" of "float16" or "int8" keeps the index's copy of the
+    vectors scalar-quantized, halving or quartering what a search reads.
+
+    With a "path" in the config, vectors are kept in <path>/<collection>.npy
+    (memory-mapped on load) with ids and payloads alongside in JSON. Changes
+    after that snapshot are appended to a log (new vectors as raw float32,
+    operations as JSON lines) and replayed on load; the snapshot is only
+    rewritten once the log outgrows it, or on flush().
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        try:
+            import faiss
+        except ImportError as exc:
+            raise ImportError("faiss-cpu is required for FaissVectorStore: pip install faiss-cpu") from exc
+
+        self._faiss = faiss
+        self.config = config or {}
+        self.collection_name = self.config.get("collection_name", "fadem_memories")
+        self.vector_size = self.config.get("embedding_model_dims") or self.config.get("embedding_dims") or 1536
+        self.path = self.config.get("path")
+        self._lock = threading.RLock()
+        self._log_ops = 0  # operations in the on-disk change log
+        self._reset_storage(self.vector_size)
+        if self.path:
+            self._load()
+
+    # Storage
+
+    def _reset_storage(self, vector_size: int) -> None:
+        self.vector_size = vector_size
+        self._vectors = np.empty((0, vector_size), dtype=np.float32)
+        self._ids: List[str] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}  # id -> live row
+        self._index = self._new_index()
+
+    def _new_index(self):
+        faiss = self._faiss
+        quantization = self.config.get("quantization")
+        if quantization not in _SQ_TYPES:
+            raise ValueError(f"Unsupported FAISS quantization: {quantization!r}")
+        qtype = getattr(faiss.ScalarQuantizer, _SQ_TYPES[quantization]) if quantization else None
+        flat = self.config.get("index_type", "hnsw") == "flat"
+        metric = faiss.METRIC_INNER_PRODUCT
+        if flat:
+            index = faiss.IndexScalarQuantizer(self.vector_size, qtype, metric) if qtype is not None else faiss.IndexFlatIP(self.vector_size)
+        else:
+            m = self.config.get("hnsw_m") or 32
+            index = faiss.IndexHNSWSQ(self.vector_size, qtype, m, metric) if qtype is not None else faiss.IndexHNSWFlat(self.vector_size, m, metric)
+            index.hnsw.efConstruction = self.config.get("hnsw_ef_construction") or 200
+            index.hnsw.efSearch = self.config.get("hnsw_ef_search") or 64
+        if not index.is_trained:
+            # Vectors are unit length, so every component lies in [-1, 1]
+            bounds = np.ones((2, self.vector_size), dtype=np.float32)
+            bounds[0] = -1.0
+            index.train(bounds)
+        return index
+
+    def _files(self):
+        base = os.path.join(self.path, self.collection_name)
+        return base + ".npy", base + ".json", base + ".log.f32", base + ".log.jsonl"
+
+    def _load(self) -> None:
+        vectors_file, meta_file, _, _ = self._files()
+        if os.path.exists(vectors_file) and os.path.exists(meta_file):
+            with open(meta_file, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            vectors = np.load(vectors_file, mmap_mode="r")
+            if vectors.ndim != 2 or vectors.shape[1] != self.vector_size:
+                # Dimension mismatch: start a fresh collection, as the Qdrant store
+                # does, dropping the old snapshot and its log
+                self._save()
+                return
+            self._vectors = vectors
+            self._ids = meta["ids"]
+            self._payloads = meta["payloads"]
+            self._rows = {vector_id: row for row, vector_id in enumerate(self._ids)}
+            if len(self._vectors):
+                self._index.add(np.ascontiguousarray(self._vectors))
+        self._replay_log()
+
+    def _replay_log(self) -> None:
+        _, _, vector_log, op_log = self._files()
+        if not os.path.exists(op_log):
+            return
+        # A log always follows a snapshot, which load() has already checked
+        logged = np.fromfile(vector_log, dtype=np.float32) if os.path.exists(vector_log) else np.empty(0, np.float32)
+        rows = logged.size // self.vector_size
+        torn = logged.size != rows * self.vector_size
+        logged = logged[: rows * self.vector_size].reshape(rows, self.vector_size)
+        used = 0
+        with open(op_log, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    torn = True  # cut short by a crash mid-write
+                    break
+                op = json.loads(line)
+                if op["op"] == "add":
+                    count = len(op["ids"])
+                    if used + count > rows:
+                        torn = True
+                        break
+                    for vector_id in op["ids"]:
+                        self._rows.pop(vector_id, None)
+                    self._append(np.ascontiguousarray(logged[used:used + count]), op["ids"], op["payloads"])
+                    used += count
+                elif op["op"] == "delete":
+                    for vector_id in op["ids"]:
+                        self._rows.pop(vector_id, None)
+                elif op["op"] == "payload":
+                    row = self._rows.get(op["id"])
+                    if row is not None:
+                        self._payloads[row] = op["payload"]
+                self._log_ops += 1
+        self._compact()
+        if torn or used != rows:
+            # Fold what was readable into a snapshot and drop the damaged log
+            self._save()
+
+    def _log(self, op: Dict[str, Any], vectors: Optional[np.ndarray] = None) -> None:
+        """Persist one change, already applied in memory, by appending it to the log."""
+        if not self.path:
+            return
+        vectors_file, _, vector_log, op_log = self._files()
+        # The log only extends a snapshot (whose shape load() validates)
+        if self._log_ops >= max(_MIN_LOG_OPS, len(self._rows)) or not os.path.exists(vectors_file):
+            self._save()
+            return
+        # Vectors first: an op line whose vectors never made it is detected on replay
+        if vectors is not None:
+            with open(vector_log, "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(op_log, "a", encoding="utf-8") as f:
+            f.write(json.dumps(op) + "\n")
+        self._log_ops += 1
+
+    def _save(self) -> None:
+        """Write a snapshot of the live rows and clear the change log."""
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        vectors_file, meta_file, vector_log, op_log = self._files()
+        live = sorted(self._rows.values())
+        # Write to temp files and swap, so a crash never leaves a torn pair
+        with open(vectors_file + ".tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(self._vectors[live]))
+        with open(meta_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"ids": [self._ids[row] for row in live], "payloads": [self._payloads[row] for row in live]}, f)
+        os.replace(vectors_file + ".tmp", vectors_file)
+        os.replace(meta_file + ".tmp", meta_file)
+        # Replaying a log already folded into the snapshot is harmless, so a
+        # crash before these removals loses nothing; vectors go first, as an
+        # op log missing its vectors is detected on replay but the reverse is not
+        for log_file in (vector_log, op_log):
+            if os.path.exists(log_file):
+                os.remove(log_file)
+        self._log_ops = 0
+
+    def flush(self) -> None:
+        """Fold the change log into a fresh snapshot now."""
+        with self._lock:
+            self._save()
+
+    def _compact(self) -> None:
+        """Rebuild the index from live rows once dead rows dominate."""
+        if len(self._ids) <= 2 * len(self._rows) + 64:
+            return
+        live = sorted(self._rows.values())
+        vectors = np.ascontiguousarray(self._vectors[live])
+        ids = [self._ids[row] for row in live]
+        payloads = [self._payloads[row] for row in live]
+        self._reset_storage(self.vector_size)
+        self._append(vectors, ids, payloads)
+
+    def _append(self, vectors: np.ndarray, ids: List[str], payloads: List[Dict[str, Any]]) -> None:
+        start = len(self._ids)
+        end = start + len(ids)
+        # Rows live in a buffer that grows geometrically, so inserts are
+        # amortized O(1) rather than a copy of the whole matrix each time
+        if end > len(self._vectors) or not self._vectors.flags.writeable:
+            grown = np.empty((max(end, 2 * len(self._vectors), 64), self.vector_size), dtype=np.float32)
+            grown[:start] = self._vectors[:start]
+            self._vectors = grown
+        self._vectors[start:end] = vectors
+        self._ids.extend(ids)
+        self._payloads.extend(payloads)
+        for offset, vector_id in enumerate(ids):
+            self._rows[vector_id] = start + offset
+        self._index.add(vectors)
+
+    @staticmethod
+    def _normalize(vectors: Any) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[np.newaxis, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    # VectorStoreBase
+
+    def create_col(self, name: str, vector_size: int, distance: str = "cosine") -> None:
+        with self._lock:
+            self.collection_name = name
+            self._reset_storage(vector_size)
+
+    def insert(self, vectors: Vectors, payloads: Optional[List[Dict[str, Any]]] = None, ids: Optional[List[str]] = None) -> None:
+        if not len(vectors):
+            return
+        payloads = payloads or [{} for _ in vectors]
+        ids = ids or [str(uuid.uuid4()) for _ in vectors]
+        with self._lock:
+            for vector_id in ids:
+                self._rows.pop(vector_id, None)  # re-inserting an id replaces it
+            normalized = self._normalize(vectors)
+            self._append(normalized, list(ids), list(payloads))
+            self._compact()
+            self._log({"op": "add", "ids": list(ids), "payloads": list(payloads)}, normalized)
+
+    def search(self, query: Optional[str], vectors: Vector, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[MemoryResult]:
+        return self.search_batch([vectors], limit=limit, filters=filters)[0]
+
+    def search_batch(self, vectors: Vectors, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[List[MemoryResult]]:
+        with self._lock:
+            total = len(self._ids)
+            if not total or limit <= 0 or not len(vectors):
+                return [[] for _ in vectors]
+            queries = self._normalize(vectors)
+            results: List[Optional[List[MemoryResult]]] = [None] * len(queries)
+            todo = list(range(len(queries)))
+            k = min(total, limit + (total - len(self._rows)) if not filters else max(4 * limit, 64))
+            while todo:
+                # One index call for every query still short of `limit` matches
+                scores, rows = self._index.search(queries[todo], k)
+                short = []
+                for n, query_scores, query_rows in zip(todo, scores.tolist(), rows.tolist()):
+                    hits = self._collect(query_scores, query_rows, limit, filters)
+                    results[n] = hits
+                    if len(hits) < limit and k < total:
+                        short.append(n)
+                todo = short
+                k = min(total, 4 * k)
+            return results
+
+    def _collect(self, scores: List[float], rows: List[int], limit: int, filters: Optional[Dict[str, Any]]) -> List[MemoryResult]:
+        hits: List[MemoryResult] = []
+        for score, row in zip(scores, rows):
+            if row < 0 or self._rows.get(self._ids[row]) != row:
+                continue  # padding or a dead row
+            payload = self._payloads[row]
+            if filters and not matches_filters(payload, filters):
+                continue
+            hits.append(MemoryResult(id=self._ids[row], score=float(score), payload=payload))
+            if len(hits) == limit:
+                break
+        return hits
+
+    def delete(self, vector_id: str) -> None:
+        with self._lock:
+            if self._rows.pop(vector_id, None) is not None:
+                self._compact()
+                self._log({"op": "delete", "ids": [vector_id]})
+
+    def delete_many(self, vector_ids: List[str]) -> None:
+        with self._lock:
+            removed = [vector_id for vector_id in vector_ids if self._rows.pop(vector_id, None) is not None]
+            if removed:
+                self._compact()
+                self._log({"op": "delete", "ids": removed})
+
+    def update(self, vector_id: str, vector: Optional[Vector] = None, payload: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            row = self._rows.get(vector_id)
+            if row is None:
+                return
+            if vector is not None:
+                self.insert([vector], payloads=[payload if payload is not None else self._payloads[row]], ids=[vector_id])
+                return
+            if payload is not None:
+                self._payloads[row] = payload
+                self._log({"op": "payload", "id": vector_id, "payload": payload})
+
+    def get(self, vector_id: str) -> Optional[MemoryResult]:
+        with self._lock:
+            row = self._rows.get(vector_id)
+            if row is None:
+                return None
+            return MemoryResult(id=vector_id, score=0.0, payload=self._payloads[row])
+
+    def list_cols(self) -> List[str]:
+        return [self.collection_name]
+
+    def delete_col(self) -> None:
+        with self._lock:
+            self._reset_storage(self.vector_size)
+            self._save()
+
+    def col_info(self) -> Dict[str, Any]:
+        return {"name": self.collection_name, "size": len(self._rows), "vector_size": self.vector_size}
+
+    def list(self, filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> List[MemoryResult]:
+        with self._lock:
+            results: List[MemoryResult] = []
+            for vector_id, row in sorted(self._rows.items(), key=lambda item: item[1]):
+                payload = self._payloads[row]
+                if filters and not matches_filters(payload, filters):
+                    continue
+                results.append(MemoryResult(id=vector_id, score=0.0, payload=payload))
+                if limit is not None and len(results) >= limit:
+                    break
+            return results
+
+    def reset(self) -> None:
+        self.delete_col()
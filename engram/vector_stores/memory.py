@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import math
 import uuid
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+from engram.core.similarity import cosine_matrix
 from engram.memory.utils import matches_filters
-from engram.vector_stores.base import VectorStoreBase
+from engram.vector_stores.base import Vector, Vectors, VectorStoreBase
 
 
 @dataclass
@@ -16,54 +18,95 @@ class MemoryResult:
     payload: Dict[str, Any] = None
 
 
+def _quantize(matrix: np.ndarray, quantization: Optional[str]) -> np.ndarray:
+    """Cast float32 rows to the scoring dtype. int8 rows are scaled to fill
+    [-127, 127] each; cosine ignores a row's scale, so none is kept."""
+    if quantization == "float16":
+        return matrix.astype(np.float16)
+    if quantization == "int8":
+        peak = np.abs(matrix).max(axis=1, keepdims=True) if matrix.size else np.zeros((len(matrix), 1), np.float32)
+        scale = np.divide(127.0, peak, out=np.zeros_like(peak), where=peak > 0)
+        return np.round(matrix * scale).astype(np.int8)
+    return matrix
+
+
 class InMemoryVectorStore(VectorStoreBase):
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
         self.collection_name = self.config.get("collection_name", "fadem_memories")
         self.vector_size = self.config.get("embedding_model_dims")
+        # Scoring matrix dtype: None (float32), "float16" or "int8"
+        self.quantization = self.config.get("quantization")
+        if self.quantization not in (None, "float16", "int8"):
+            raise ValueError(f"Unsupported in-memory quantization: {self.quantization!r}")
         self._store: Dict[str, Dict[str, Any]] = {}
+        # (ids, stacked vectors) for batched scoring; rebuilt after any change
+        self._matrix: Optional[Tuple[List[str], np.ndarray]] = None
 
     def create_col(self, name: str, vector_size: int, distance: str = "cosine") -> None:
         self.collection_name = name
         self.vector_size = vector_size
 
-    def insert(self, vectors: List[List[float]], payloads: Optional[List[Dict[str, Any]]] = None, ids: Optional[List[str]] = None) -> None:
+    def insert(self, vectors: Vectors, payloads: Optional[List[Dict[str, Any]]] = None, ids: Optional[List[str]] = None) -> None:
         payloads = payloads or [{} for _ in vectors]
         ids = ids or [str(uuid.uuid4()) for _ in vectors]
         for vector_id, vector, payload in zip(ids, vectors, payloads):
             self._store[vector_id] = {"vector": vector, "payload": payload}
-
-    def _cosine_similarity(self, a: List[float], b: List[float]) -> float:
-        if not a or not b:
-            return 0.0
-        dot = sum(x * y for x, y in zip(a, b))
-        norm_a = math.sqrt(sum(x * x for x in a))
-        norm_b = math.sqrt(sum(y * y for y in b))
-        if norm_a == 0.0 or norm_b == 0.0:
-            return 0.0
-        return dot / (norm_a * norm_b)
-
-    def search(self, query: Optional[str], vectors: List[float], limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[MemoryResult]:
-        results: List[MemoryResult] = []
-        for vector_id, record in self._store.items():
-            payload = record.get("payload", {})
-            if filters and not matches_filters(payload, filters):
-                continue
-            score = self._cosine_similarity(vectors, record.get("vector", []))
-            results.append(MemoryResult(id=vector_id, score=score, payload=payload))
-
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[:limit]
+        self._matrix = None
+
+    def _ensure_matrix(self, dim: int) -> Tuple[List[str], np.ndarray]:
+        if self._matrix is None or self._matrix[1].shape[1] != dim:
+            ids = list(self._store)
+            matrix = np.zeros((len(ids), dim), dtype=np.float32)
+            for row, vector_id in enumerate(ids):
+                vector = self._store[vector_id].get("vector")
+                if vector is not None and len(vector) == dim:  # mismatched dims score 0
+                    matrix[row] = vector
+            self._matrix = (ids, _quantize(matrix, self.quantization))
+        return self._matrix
+
+    def search(self, query: Optional[str], vectors: Vector, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[MemoryResult]:
+        if vectors is None or not len(vectors):
+            return []
+        return self.search_batch([vectors], limit=limit, filters=filters)[0]
+
+    def search_batch(self, vectors: Vectors, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[List[MemoryResult]]:
+        if not len(vectors) or not self._store or limit <= 0:
+            return [[] for _ in vectors]
+        ids, matrix = self._ensure_matrix(len(vectors[0]))
+        # Filters depend only on payloads, so evaluate them once for all queries
+        rows = list(range(len(ids)))
+        if filters:
+            rows = [row for row in rows if matches_filters(self._store[ids[row]].get("payload", {}), filters)]
+        candidates = [ids[row] for row in rows]
+        queries = _quantize(np.asarray(vectors, dtype=np.float32), self.quantization)
+        scores = cosine_matrix(queries, matrix[rows])
+
+        results: List[List[MemoryResult]] = []
+        for query_scores in scores:
+            hits = []
+            for i in np.argsort(-query_scores, kind="stable")[:limit].tolist():
+                vector_id = candidates[i]
+                hits.append(MemoryResult(id=vector_id, score=float(query_scores[i]), payload=self._store[vector_id].get("payload", {})))
+            results.append(hits)
+        return results
 
     def delete(self, vector_id: str) -> None:
         if vector_id in self._store:
             del self._store[vector_id]
+            self._matrix = None
+
+    def delete_many(self, vector_ids: List[str]) -> None:
+        removed = [self._store.pop(vector_id, None) for vector_id in vector_ids]
+        if any(entry is not None for entry in removed):
+            self._matrix = None
 
-    def update(self, vector_id: str, vector: Optional[List[float]] = None, payload: Optional[Dict[str, Any]] = None) -> None:
+    def update(self, vector_id: str, vector: Optional[Vector] = None, payload: Optional[Dict[str, Any]] = None) -> None:
         if vector_id not in self._store:
             return
         if vector is not None:
             self._store[vector_id]["vector"] = vector
+            self._matrix = None
         if payload is not None:
             self._store[vector_id]["payload"] = payload
 
@@ -78,6 +121,7 @@ class InMemoryVectorStore(VectorStoreBase):
 
     def delete_col(self) -> None:
         self._store = {}
+        self._matrix = None
 
     def col_info(self) -> Dict[str, Any]:
         return {"name": self.collection_name, "size": len(self._store), "vector_size": self.vector_size}
@@ -95,3 +139,4 @@ class InMemoryVectorStore(VectorStoreBase):
 
     def reset(self) -> None:
         self._store = {}
+        self._matrix = None
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from itertools import repeat
 from typing import Any, Dict, List, Optional
 
-from engram.vector_stores.base import VectorStoreBase
+from engram.vector_stores.base import Vector, Vectors, VectorStoreBase
+
+_qdrant_models = None
+_NO_PAYLOAD: Dict[str, Any] = {}  # shared default; PointStruct never mutates it
+
+
+def _models():
+    """qdrant_client.models, imported on first use and then kept at module level."""
+    global _qdrant_models
+    if _qdrant_models is None:
+        from qdrant_client import models
+
+        _qdrant_models = models
+    return _qdrant_models
 
 
 @dataclass
@@ -25,8 +39,12 @@ class QdrantVectorStore(VectorStoreBase):
             or 1536
         )
         self.distance = config.get("distance", "cosine")
+        # Inserts larger than one batch are streamed with upload_points
+        self.batch_size = max(1, int(config.get("batch_size") or 64))
+        self.parallel = max(1, int(config.get("parallel") or 1))
 
         self.client = _create_client(config)
+        self._search_params = _search_params(config)
 
         if self.client.collection_exists(self.collection_name):
             # Check if existing collection has correct dimensions
@@ -53,28 +71,81 @@ class QdrantVectorStore(VectorStoreBase):
             return None
 
     def create_col(self, name: str, vector_size: int, distance: str = "cosine") -> None:
-        from qdrant_client.models import Distance, VectorParams
-
+        models = _models()
         distance_map = {
-            "cosine": Distance.COSINE,
-            "dot": Distance.DOT,
-            "euclid": Distance.EUCLID,
+            "cosine": models.Distance.COSINE,
+            "dot": models.Distance.DOT,
+            "euclid": models.Distance.EUCLID,
         }
-        dist = distance_map.get(distance, Distance.COSINE)
+        dist = distance_map.get(distance, models.Distance.COSINE)
+        quantization = self.config.get("quantization")
         self.client.create_collection(
             collection_name=name,
-            vectors_config=VectorParams(size=vector_size, distance=dist),
+            vectors_config=models.VectorParams(
+                size=vector_size,
+                distance=dist,
+                datatype=_vector_datatype(quantization),
+                # Keep the original vectors memory-mapped; with quantization
+                # only the compact copies need to stay in RAM
+                on_disk=self.config.get("on_disk"),
+            ),
+            hnsw_config=models.HnswConfigDiff(
+                m=self.config.get("hnsw_m"),
+                ef_construct=self.config.get("hnsw_ef_construction"),
+            ),
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=self.config.get("indexing_threshold")),
+            quantization_config=_quantization_config(quantization),
         )
 
-    def insert(self, vectors: List[List[float]], payloads: Optional[List[Dict[str, Any]]] = None, ids: Optional[List[str]] = None) -> None:
-        from qdrant_client.models import PointStruct
-
-        payloads = payloads or [{} for _ in vectors]
-        ids = ids or [str(i) for i in range(len(vectors))]
-        points = [PointStruct(id=pid, vector=vec, payload=payload) for pid, vec, payload in zip(ids, vectors, payloads)]
-        self.client.upsert(collection_name=self.collection_name, points=points)
+    def insert(self, vectors: Vectors, payloads: Optional[List[Dict[str, Any]]] = None, ids: Optional[List[str]] = None) -> None:
+        point_struct = _models().PointStruct
+        # Missing payloads share one empty dict rather than allocating one per point
+        payloads = payloads or repeat(_NO_PAYLOAD)
+        ids = ids or map(str, range(len(vectors)))
+        points = (point_struct(id=pid, vector=vec, payload=payload) for pid, vec, payload in zip(ids, vectors, payloads))
+        if len(vectors) <= self.batch_size:
+            self.client.upsert(collection_name=self.collection_name, points=list(points))
+            return
+        # Pipelined batches (over parallel workers if configured), built as
+        # they are sent; wait so the points are searchable once insert()
+        # returns, as with upsert
+        self.client.upload_points(
+            collection_name=self.collection_name,
+            points=points,
+            batch_size=self.batch_size,
+            parallel=self.parallel,
+            wait=True,
+        )
 
-    def search(self, query: Optional[str], vectors: List[float], limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[MemoryResult]:
+    def insert_bulk(self, vectors: Vectors, payloads: Optional[List[Dict[str, Any]]] = None, ids: Optional[List[str]] = None) -> None:
+        """Load many points with HNSW indexing paused, so segments aren't re-indexed
+        while the upload is still running. Restoring the collection's indexing
+        threshold afterwards lets the optimizer build the index once."""
+        models = _models()
+        threshold = self.client.get_collection(self.collection_name).config.optimizer_config.indexing_threshold
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
+        )
+        try:
+            self.client.upload_collection(
+                collection_name=self.collection_name,
+                vectors=vectors,
+                payload=payloads,
+                ids=ids,
+                batch_size=self.batch_size,
+                parallel=self.parallel,
+                wait=True,
+            )
+        finally:
+            self.client.update_collection(
+                collection_name=self.collection_name,
+                optimizers_config=models.OptimizersConfigDiff(
+                    indexing_threshold=threshold if threshold is not None else 20000
+                ),
+            )
+
+    def search(self, query: Optional[str], vectors: Vector, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[MemoryResult]:
         qdrant_filter = _build_qdrant_filter(filters)
         # Use query_points (new API) instead of deprecated search method
         response = self.client.query_points(
@@ -82,22 +153,41 @@ class QdrantVectorStore(VectorStoreBase):
             query=vectors,
             limit=limit,
             query_filter=qdrant_filter,
+            search_params=self._search_params,
             with_payload=True,
         )
         return [MemoryResult(id=str(r.id), score=float(r.score or 0.0), payload=r.payload or {}) for r in response.points]
 
+    def search_batch(self, vectors: Vectors, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[List[MemoryResult]]:
+        if not len(vectors):
+            return []
+        models = _models()
+        qdrant_filter = _build_qdrant_filter(filters)
+        # One query_batch_points round trip; the server runs the queries together
+        requests = [
+            models.QueryRequest(query=vector, limit=limit, filter=qdrant_filter, params=self._search_params, with_payload=True)
+            for vector in vectors
+        ]
+        responses = self.client.query_batch_points(collection_name=self.collection_name, requests=requests)
+        return [
+            [MemoryResult(id=str(r.id), score=float(r.score or 0.0), payload=r.payload or {}) for r in response.points]
+            for response in responses
+        ]
+
     def delete(self, vector_id: str) -> None:
-        from qdrant_client.models import PointIdsList
+        selector = _models().PointIdsList(points=[vector_id])
+        self.client.delete(collection_name=self.collection_name, points_selector=selector)
 
-        selector = PointIdsList(points=[vector_id])
+    def delete_many(self, vector_ids: List[str]) -> None:
+        if not vector_ids:
+            return
+        selector = _models().PointIdsList(points=list(vector_ids))
         self.client.delete(collection_name=self.collection_name, points_selector=selector)
 
-    def update(self, vector_id: str, vector: Optional[List[float]] = None, payload: Optional[Dict[str, Any]] = None) -> None:
+    def update(self, vector_id: str, vector: Optional[Vector] = None, payload: Optional[Dict[str, Any]] = None) -> None:
         if vector is not None:
-            from qdrant_client.models import PointStruct
-
             payload = payload or {}
-            point = PointStruct(id=vector_id, vector=vector, payload=payload)
+            point = _models().PointStruct(id=vector_id, vector=vector, payload=payload)
             self.client.upsert(collection_name=self.collection_name, points=[point])
             return
 
@@ -145,20 +235,68 @@ def _create_client(config: Dict[str, Any]):
     host = config.get("host")
     port = config.get("port", 6333)
     api_key = config.get("api_key")
+    # gRPC avoids per-request HTTP overhead on bulk uploads; the server must expose its gRPC port
+    remote: Dict[str, Any] = {}
+    if config.get("prefer_grpc"):
+        remote.update(prefer_grpc=True, grpc_port=config.get("grpc_port", 6334))
+    # Connections (or gRPC channels) shared by calls made from Memory's io pool threads
+    if config.get("pool_size"):
+        remote["pool_size"] = int(config["pool_size"])
 
     if path:
         return QdrantClient(path=path)
     if url:
-        return QdrantClient(url=url, api_key=api_key)
-    return QdrantClient(host=host or "localhost", port=port, api_key=api_key)
+        return QdrantClient(url=url, api_key=api_key, **remote)
+    return QdrantClient(host=host or "localhost", port=port, api_key=api_key, **remote)
+
+
+def _search_params(config: Dict[str, Any]):
+    """Per-query HNSW settings; index_type "flat" asks for exact search instead."""
+    # Local (path) mode always searches exactly and warns if given search params
+    if config.get("path"):
+        return None
+
+    models = _models()
+    quantization = None
+    if config.get("quantization") == "binary":
+        # 1-bit codes only shortlist candidates; over-fetch and re-score them
+        # with the original vectors to recover full-precision ranking
+        quantization = models.QuantizationSearchParams(rescore=True, oversampling=config.get("oversampling", 2.0))
+    return models.SearchParams(
+        hnsw_ef=config.get("hnsw_ef_search"),
+        exact=config.get("index_type") == "flat",
+        quantization=quantization,
+    )
+
+
+def _vector_datatype(quantization: Optional[str]):
+    """Stored vector datatype: "float16" halves the collection's vector storage."""
+    if quantization != "float16":
+        return None
+
+    return _models().Datatype.FLOAT16
+
+
+def _quantization_config(quantization: Optional[str]):
+    """Collection quantization from the "quantization" config key ("int8", "binary" or "float16")."""
+    if quantization not in (None, "int8", "binary", "float16"):
+        raise ValueError(f"Unsupported Qdrant quantization: {quantization!r}")
+
+    models = _models()
+    # Quantized copies are searched first and re-scored with the original vectors
+    if quantization == "int8":
+        return models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, always_ram=True))
+    if quantization == "binary":
+        # One bit per dimension, compared with XOR/popcount: 32x smaller than float32
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    return None
 
 
 def _build_qdrant_filter(filters: Optional[Dict[str, Any]]):
     if not filters:
         return None
 
-    from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchText, MatchValue, Range
-
+    models = _models()
     must = []
     must_not = []
     should = []
@@ -167,18 +305,18 @@ def _build_qdrant_filter(filters: Optional[Dict[str, Any]]):
         if condition == "*":
             return
         if not isinstance(condition, dict):
-            must.append(FieldCondition(key=key, match=MatchValue(value=condition)))
+            must.append(models.FieldCondition(key=key, match=models.MatchValue(value=condition)))
             return
 
         for operator, value in condition.items():
             if operator == "eq":
-                must.append(FieldCondition(key=key, match=MatchValue(value=value)))
+                must.append(models.FieldCondition(key=key, match=models.MatchValue(value=value)))
             elif operator == "ne":
-                must_not.append(FieldCondition(key=key, match=MatchValue(value=value)))
+                must_not.append(models.FieldCondition(key=key, match=models.MatchValue(value=value)))
             elif operator == "in":
-                must.append(FieldCondition(key=key, match=MatchAny(any=value)))
+                must.append(models.FieldCondition(key=key, match=models.MatchAny(any=value)))
             elif operator == "nin":
-                must_not.append(FieldCondition(key=key, match=MatchAny(any=value)))
+                must_not.append(models.FieldCondition(key=key, match=models.MatchAny(any=value)))
             elif operator in {"gt", "gte", "lt", "lte"}:
                 range_kwargs = {}
                 if operator == "gt":
@@ -189,9 +327,9 @@ def _build_qdrant_filter(filters: Optional[Dict[str, Any]]):
                     range_kwargs["lt"] = value
                 if operator == "lte":
                     range_kwargs["lte"] = value
-                must.append(FieldCondition(key=key, range=Range(**range_kwargs)))
+                must.append(models.FieldCondition(key=key, range=models.Range(**range_kwargs)))
             elif operator in {"contains", "icontains"}:
-                must.append(FieldCondition(key=key, match=MatchText(text=str(value))))
+                must.append(models.FieldCondition(key=key, match=models.MatchText(text=str(value))))
 
     for key, condition in filters.items():
         if key == "AND" and isinstance(condition, list):
@@ -203,20 +341,20 @@ def _build_qdrant_filter(filters: Optional[Dict[str, Any]]):
             for sub in condition:
                 for sub_key, sub_cond in sub.items():
                     if isinstance(sub_cond, dict) and "eq" in sub_cond:
-                        should.append(FieldCondition(key=sub_key, match=MatchValue(value=sub_cond["eq"])))
+                        should.append(models.FieldCondition(key=sub_key, match=models.MatchValue(value=sub_cond["eq"])))
                     elif not isinstance(sub_cond, dict):
-                        should.append(FieldCondition(key=sub_key, match=MatchValue(value=sub_cond)))
+                        should.append(models.FieldCondition(key=sub_key, match=models.MatchValue(value=sub_cond)))
             continue
         if key == "NOT" and isinstance(condition, list):
             for sub in condition:
                 for sub_key, sub_cond in sub.items():
                     if isinstance(sub_cond, dict) and "eq" in sub_cond:
-                        must_not.append(FieldCondition(key=sub_key, match=MatchValue(value=sub_cond["eq"])))
+                        must_not.append(models.FieldCondition(key=sub_key, match=models.MatchValue(value=sub_cond["eq"])))
                     elif not isinstance(sub_cond, dict):
-                        must_not.append(FieldCondition(key=sub_key, match=MatchValue(value=sub_cond)))
+                        must_not.append(models.FieldCondition(key=sub_key, match=models.MatchValue(value=sub_cond)))
             continue
         add_condition(key, condition)
 
     if not (must or must_not or should):
         return None
-    return Filter(must=must or None, must_not=must_not or None, should=should or None)
+    return models.Filter(must=must or None, must_not=must_not or None, should=should or None)
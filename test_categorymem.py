@@ -0,0 +1,433 @@
+"""
+Tests for the CategoryMem category layer.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Ensure we're using the local engram package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from engram.core.category import CategoryProcessor
+
+
+class AxisEmbedder:
+    """Deterministic embedder mapping known words onto fixed axes."""
+
+    AXES = {"python": 0, "cooking": 1, "travel": 2}
+
+    def embed(self, text, memory_action=None):
+        vector = [0.0] * 4
+        for word in text.lower().replace(".", " ").split():
+            if word in self.AXES:
+                vector[self.AXES[word]] += 1.0
+        vector[3] = 0.1
+        return vector
+
+
+def _make_processor():
+    processor = CategoryProcessor(llm=None, embedder=AxisEmbedder())
+    ids = {
+        "python": processor._create_category("Python", "python code", keywords=["snake"]),
+        "cooking": processor._create_category("Cooking", "cooking recipes", keywords=["kitchen"]),
+        "travel": processor._create_category("Travel", "travel plans", keywords=["flights"]),
+    }
+    return processor, ids
+
+
+def test_embedding_match_uses_category_matrix():
+    """Phase 2 embedding match picks the closest category embedding."""
+    processor, ids = _make_processor()
+
+    match = processor.detect_category("python python", use_llm=False)
+    assert match.category_id == ids["python"]
+    assert match.confidence > 0.9
+
+    # New categories invalidate the stacked matrix
+    baking_id = processor._create_category("Baking", "cooking cooking travel", keywords=[])
+    match = processor.detect_category("cooking cooking travel", use_llm=False)
+    assert match.category_id == baking_id
+
+
+def test_cosine_similarity_handles_degenerate_vectors():
+    processor, _ = _make_processor()
+    assert processor._cosine_similarity([0.0, 0.0], [1.0, 0.0]) == 0.0
+    assert processor._cosine_similarity([1.0, 0.0], [1.0]) == 0.0
+    assert abs(processor._cosine_similarity([1.0, 2.0], [2.0, 4.0]) - 1.0) < 1e-6
+
+
+def test_find_related_categories():
+    processor, ids = _make_processor()
+    related_id = processor._create_category("Recipes", "cooking", keywords=[])
+    assert processor.find_related_categories(ids["cooking"]) == [related_id]
+
+
+def test_find_related_categories_counts_symbol_keywords():
+    processor = CategoryProcessor(llm=None, embedder=AxisEmbedder())
+    symbols = ["&", "+", "#", "%", "@"]
+    python = processor._create_category("Python", "python code", keywords=symbols)
+    cooking = processor._create_category("Cooking", "cooking recipes", keywords=symbols)
+    travel = processor._create_category("Travel", "travel plans", keywords=symbols)
+    for n in range(3):
+        processor._create_category(f"Mixed {n}", "python cooking cooking travel travel", keywords=[])
+
+    # The mixed categories are closer on embedding, but only these two share keywords
+    assert sorted(processor.find_related_categories(python, limit=2)) == sorted([cooking, travel])
+
+
+def test_hnsw_index_matches_brute_force():
+    """Above the threshold, category matching goes through the HNSW index (if installed)."""
+    from engram.core import category as category_module
+
+    processor = CategoryProcessor(llm=None, embedder=AxisEmbedder(), config={"hnsw_threshold": 2})
+    python_id = processor._create_category("Python", "python code", keywords=[])
+    cooking_id = processor._create_category("Cooking", "cooking recipes", keywords=[])
+
+    match = processor.detect_category("python", use_llm=False)
+    assert match.category_id == python_id
+    if category_module.hnswlib is not None:
+        assert processor._hnsw_index is not None
+
+    # Merged-away categories are dropped from the index
+    processor._merge_categories(python_id, cooking_id)
+    match = processor.detect_category("python", use_llm=False)
+    assert match.category_id != python_id
+
+
+def test_load_categories_resets_hnsw_labels():
+    from engram.core import category as category_module
+
+    processor = CategoryProcessor(llm=None, embedder=AxisEmbedder(), config={"hnsw_threshold": 2})
+    python_id = processor._create_category("Python", "python code", keywords=[])
+    cooking_id = processor._create_category("Cooking", "cooking recipes", keywords=[])
+    processor.detect_category("python", use_llm=False)
+    if category_module.hnswlib is not None:
+        assert processor._hnsw_labels
+
+    processor.load_categories([processor.categories[python_id].to_dict()])
+    assert processor._hnsw_labels == {}
+
+    # Unindexing a category before the index is rebuilt must not touch the old one
+    processor._merge_categories(python_id, cooking_id)
+    assert processor.detect_category("cooking", use_llm=False).category_id == cooking_id
+
+
+def test_keyword_index_matches_tokens_and_phrases():
+    processor = CategoryProcessor(llm=None, embedder=None)
+    cat_id = processor._create_category(
+        "Languages", "Programming languages", keywords=["Rust", "golang", "type systems"]
+    )
+
+    match = processor.detect_category("Learning rust and golang type systems this week", use_llm=False)
+    assert match.category_id == cat_id
+    assert match.confidence == 1.0
+
+    # Root category keywords are indexed with punctuation stripped
+    assert "preferences" in processor._kw_index
+
+    processor._merge_categories(cat_id, "facts")
+    assert cat_id not in processor._kw_index.get("rust", set())
+    assert "facts" in processor._kw_index["rust"]
+    assert "facts" in processor._phrase_index["type systems"]
+
+
+def test_topk_cosine_kernel_matches_numpy():
+    from engram.core import _category_kernels as kernels
+
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((200, 16)).astype(np.float32)
+    matrix[3] = 0.0
+    norms = np.linalg.norm(matrix, axis=1).astype(np.float32)
+    q = rng.standard_normal(16).astype(np.float32)
+
+    expected = (matrix @ q) / np.where(norms > 0, norms * np.linalg.norm(q), 1.0)
+    expected[3] = 0.0
+    scores = kernels.cosine_scores(q, matrix, norms)
+    assert np.allclose(scores, expected, atol=1e-5)
+
+    idx, top = kernels.topk_cosine(q, matrix, norms, 5)
+    assert list(idx) == list(np.argsort(-expected)[:5])
+    assert np.all(np.diff(top) <= 0)
+
+
+class GardeningLLM:
+    """LLM stub that files everything under a new 'Gardening' category."""
+
+    def __init__(self, batch_response=None):
+        self.prompts = []
+        self.batch_response = batch_response
+
+    def generate(self, prompt):
+        self.prompts.append(prompt)
+        if self.batch_response is not None:
+            return self.batch_response
+        return (
+            '{"action": "create_new", "new_category": {"name": "Gardening", '
+            '"description": "plants", "keywords": ["tomatoes"]}, "confidence": 0.8}'
+        )
+
+
+def test_detect_categories_batch_dedupes_new_categories():
+    processor = CategoryProcessor(llm=GardeningLLM(), embedder=None, config={"llm_concurrency": 3})
+    contents = ["I planted tomatoes", "Watered the basil", "Pruned the roses"]
+
+    matches = processor.detect_categories_batch(contents)
+
+    assert len(processor.llm.prompts) == 3
+    assert len({m.category_id for m in matches}) == 1
+    assert sum(1 for c in processor.categories.values() if c.name == "Gardening") == 1
+
+
+def test_adetect_categories_uses_single_prompt():
+    import asyncio
+
+    llm = GardeningLLM(batch_response=(
+        '[{"id": 0, "action": "use_existing", "category_id": "preferences", "confidence": 0.9},'
+        ' {"id": 1, "action": "create_new", "new_category": {"name": "Gardening"}, "confidence": 0.7}]'
+    ))
+    processor = CategoryProcessor(llm=llm, embedder=None)
+
+    matches = asyncio.run(processor.adetect_categories(["I enjoy quiet mornings", "Watered the basil"]))
+
+    assert len(llm.prompts) == 1
+    assert matches[0].category_id == "preferences"
+    assert matches[1].is_new and matches[1].category_name == "Gardening"
+
+
+def test_existing_categories_fragment_is_cached_and_invalidated():
+    processor, ids = _make_processor()
+
+    first = processor._render_existing_cats()
+    assert processor._render_existing_cats() is first
+
+    new_id = processor._create_category("Gardening", "plants")
+    rendered = processor._render_existing_cats()
+    assert new_id in rendered
+
+    processor._merge_categories(new_id, ids["cooking"])
+    assert new_id not in processor._render_existing_cats()
+
+
+def test_llm_detection_is_served_from_semantic_cache():
+    llm = GardeningLLM()
+    processor = CategoryProcessor(llm=llm, embedder=AxisEmbedder())
+
+    first = processor.detect_category("cooking and travel")
+    second = processor.detect_category("travel and cooking")
+
+    assert first.is_new
+    assert second.category_id == first.category_id and not second.is_new
+    assert len(llm.prompts) == 1
+    assert processor._llm_cache.hits == 1
+
+
+def test_category_dataclasses_are_slotted():
+    from engram.core.category import Category, CategoryMatch
+
+    if sys.version_info < (3, 10):
+        return
+    cat = Category(id="c", name="C", description="")
+    assert not hasattr(cat, "__dict__")
+    assert not hasattr(CategoryMatch("c", "C", 0.5), "__dict__")
+
+
+def test_category_embeddings_are_float32_arrays():
+    from engram.core.category import Category
+
+    processor, ids = _make_processor()
+    cat = processor.categories[ids["python"]]
+    assert isinstance(cat.embedding, np.ndarray) and cat.embedding.dtype == np.float32
+
+    data = cat.to_dict()
+    assert isinstance(data["embedding"], list)
+    restored = Category.from_dict(data)
+    assert restored.embedding.dtype == np.float32
+    assert np.allclose(restored.embedding, cat.embedding)
+
+    half = CategoryProcessor(llm=None, embedder=AxisEmbedder(), config={"embedding_dtype": "float16"})
+    half.load_categories([data])
+    assert half.categories[cat.id].embedding.dtype == np.float16
+    assert half.detect_category("python", use_llm=False).category_id == cat.id
+
+
+def test_category_tree_handles_deep_and_cyclic_hierarchies():
+    processor = CategoryProcessor(llm=None, embedder=None)
+    parent = "preferences"
+    for i in range(2000):
+        parent = processor._create_category(f"Level {i}", "deep", parent_id=parent)
+    processor.categories[parent].children_ids.append("preferences")  # cycle
+
+    tree = {node.category.id: node for node in processor.get_category_tree()}
+    node, depth = tree["preferences"], 0
+    while node.children:
+        node, depth = node.children[0], depth + 1
+    assert depth == node.depth == 2000
+
+
+def test_category_decay_uses_whole_days_since_access():
+    from datetime import datetime, timedelta
+
+    processor, ids = _make_processor()
+    stale = processor.categories[ids["python"]]
+    stale.last_accessed = (datetime.utcnow() - timedelta(days=14, hours=5)).isoformat()
+    processor.access_category(ids["cooking"])
+
+    stats = processor.apply_category_decay(decay_rate=0.05)
+
+    assert stats["decayed"] == 2
+    assert abs(stale.strength - 0.9) < 1e-9
+    assert processor.categories[ids["cooking"]].strength == 1.0
+    assert processor.categories[ids["travel"]].strength == 1.0  # never accessed
+
+
+def test_keyword_scan_prefers_popular_category_above_threshold():
+    processor = CategoryProcessor(llm=None, embedder=None)
+    rare = processor._create_category("Rare", "", keywords=["alpha", "beta", "gamma"])
+    popular = processor._create_category(
+        "Popular", "", keywords=["alpha", "beta", "gamma", "d1", "d2", "d3", "d4", "d5"]
+    )
+    processor.access_category(popular)
+
+    # Rare scores 1.0 and Popular 0.75; both clear 0.7, so the popular one wins
+    match = processor.detect_category("alpha beta gamma", use_llm=False)
+    assert match.category_id == popular
+    assert match.confidence == 0.75
+
+
+def test_keywords_are_normalized_on_ingest():
+    from engram.core.category import Category
+
+    processor = CategoryProcessor(llm=None, embedder=None)
+    cat_id = processor._create_category("Tools", "", keywords=[" Hammer", "Power DRILL"])
+    assert processor.categories[cat_id].keywords == ["hammer", "power drill"]
+    assert Category.from_dict({"id": "x", "name": "X", "description": "", "keywords": ["Saw"]}).keywords == ["saw"]
+    assert processor.detect_category("my power drill and hammer", use_llm=False).category_id == cat_id
+
+
+def test_concurrent_ingestion_and_decay():
+    from concurrent.futures import ThreadPoolExecutor
+
+    processor, ids = _make_processor()
+
+    def work(i):
+        cat_id = processor._create_category(f"Topic {i}", "python cooking", keywords=[f"kw{i}"])
+        processor.update_category_stats(cat_id, 0.5)
+        processor.access_category(ids["python"])
+        processor.detect_category(f"kw{i} python", use_llm=False)
+        if i % 10 == 0:
+            processor.apply_category_decay()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(200)))
+
+    assert len(processor.categories) >= 200
+    assert processor.categories[ids["python"]].access_count == 200
+
+
+def test_detection_prompt_lists_only_top_k_categories():
+    llm = GardeningLLM()
+    processor = CategoryProcessor(llm=llm, embedder=AxisEmbedder(), config={"prompt_top_k": 1})
+    dynamic = [
+        processor._create_category("Python", "python code"),
+        processor._create_category("Cooking", "cooking recipes"),
+        processor._create_category("Travel", "travel plans"),
+    ]
+
+    processor.detect_category("python cooking travel")
+
+    prompt = llm.prompts[0]
+    assert sum(cat_id in prompt for cat_id in dynamic) == 1
+    assert all(f"- {root[0]}:" in prompt for root in CategoryProcessor.ROOT_CATEGORIES)
+
+
+def test_persistent_embedding_cache_survives_restart(tmp_path):
+    class CountingEmbedder(AxisEmbedder):
+        calls = 0
+
+        def embed(self, text, memory_action=None):
+            CountingEmbedder.calls += 1
+            return super().embed(text, memory_action)
+
+    config = {"embedding_cache_path": str(tmp_path / "cache.db")}
+    first = CategoryProcessor(llm=None, embedder=CountingEmbedder(), config=config)
+    first._create_category("Python", "python code")
+    assert CountingEmbedder.calls == 1
+
+    second = CategoryProcessor(llm=None, embedder=CountingEmbedder(), config=config)
+    cat_id = second._create_category("Python", "python code")
+    assert CountingEmbedder.calls == 1
+    assert second.categories[cat_id].embedding.tolist()[0] == 2.0
+
+
+def test_persistent_embedding_cache_only_stores_category_text(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "cache.db"
+    processor = CategoryProcessor(llm=None, embedder=AxisEmbedder(), config={"embedding_cache_path": str(path)})
+    processor._create_category("Python", "python code")
+    for n in range(5):
+        processor.detect_category(f"query number {n}", use_llm=False)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0] == 1
+    conn.close()
+
+    # A cache that can't be read or written falls back to embedding directly
+    processor._embed_cache.close()
+    cat_id = processor._create_category("Cooking", "cooking recipes")
+    assert processor.categories[cat_id].embedding is not None
+
+
+def test_category_decay_reports_only_changed_categories():
+    from datetime import datetime, timedelta
+
+    processor, ids = _make_processor()
+    stale = processor.categories[ids["python"]]
+    stale.last_accessed = (datetime.utcnow() - timedelta(days=14)).isoformat()
+    processor.access_category(ids["cooking"])  # accessed today: no decay
+    processor.pop_changes()
+
+    stats = processor.apply_category_decay(decay_rate=0.05)
+
+    changed, removed = processor.pop_changes()
+    assert [c["id"] for c in changed] == [ids["python"]]
+    assert removed == []
+
+
+def test_active_categories_follow_memory_counts():
+    processor, ids = _make_processor()
+    assert processor.get_active_categories() == []
+
+    processor.update_category_stats(ids["python"], 0.8)
+    processor.update_category_stats(ids["travel"], 0.5)
+    assert [c.id for c in processor.get_active_categories()] == [ids["python"], ids["travel"]]
+
+    processor.update_category_stats(ids["travel"], 0.5, is_addition=False)
+    processor._merge_categories(ids["python"], ids["cooking"])
+    assert [c.id for c in processor.get_active_categories()] == [ids["cooking"]]
+
+    reloaded = CategoryProcessor(llm=None, embedder=AxisEmbedder())
+    reloaded.load_categories(processor.get_all_categories())
+    assert [c.id for c in reloaded.get_active_categories()] == [ids["cooking"]]
+
+
+def test_pop_changes_returns_only_mutated_categories():
+    processor, ids = _make_processor()
+    changed, removed = processor.pop_changes()
+    assert set(ids.values()) <= {c["id"] for c in changed} and removed == []
+    assert processor.pop_changes() == ([], [])  # Nothing changed since
+
+    processor.access_category(ids["python"])
+    processor.update_category_stats(ids["travel"], 0.5)
+    changed, _ = processor.pop_changes()
+    assert [c["id"] for c in changed] == [ids["python"], ids["travel"]]
+
+    processor._merge_categories(ids["cooking"], ids["travel"])
+    changed, removed = processor.pop_changes()
+    assert [c["id"] for c in changed] == [ids["travel"]] and removed == [ids["cooking"]]
+
+    reloaded = CategoryProcessor(llm=None, embedder=AxisEmbedder())
+    reloaded.load_categories(processor.get_all_categories())
+    assert reloaded.pop_changes() == ([], [])
@@ -0,0 +1,71 @@
+"""
+Tests for FadeMem strength decay.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Ensure we're using the local engram package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from engram.configs.base import FadeMemConfig
+from engram.core.decay import (
+    calculate_decayed_strength,
+    sql_decay_function,
+    to_unix_seconds,
+)
+from engram.db.sqlite import SQLiteManager
+
+
+def test_sql_decay_matches_scalar():
+    config = FadeMemConfig()
+    now = datetime.utcnow()
+    accessed = to_unix_seconds((now - timedelta(days=3)).isoformat())
+    decay = sql_decay_function(config, now=to_unix_seconds(now.isoformat()))
+
+    # Rows without a layer decay at the long-term rate, as in the scalar path.
+    for layer in ("sml", "lml", None):
+        expected = calculate_decayed_strength(0.9, (now - timedelta(days=3)).isoformat(), 2, layer, config)
+        assert abs(decay(0.9, accessed, 2, layer) - expected) < 1e-6
+
+
+def test_sql_decay_pass(tmp_path):
+    config = FadeMemConfig()
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    now = datetime.utcnow()
+
+    def memory(memory_id, days_ago, access_count=0, immutable=False):
+        return {
+            "id": memory_id,
+            "memory": memory_id,
+            "user_id": "u1",
+            "last_accessed": (now - timedelta(days=days_ago)).isoformat(),
+            "access_count": access_count,
+            "immutable": immutable,
+        }
+
+    db.add_memories_bulk([
+        memory("stale", 30),
+        memory("fading", 2),
+        memory("popular", 0.01, access_count=5),
+        memory("pinned", 30, immutable=True),
+    ])
+
+    result = db.decay_memories(
+        sql_decay_function(config),
+        forgetting_threshold=config.forgetting_threshold,
+        promotion_access_threshold=config.promotion_access_threshold,
+        promotion_strength_threshold=config.promotion_strength_threshold,
+        user_id="u1",
+    )
+
+    assert result["forget_ids"] == ["stale"]
+    assert result["promoted"] == 1
+    fading = db.get_memory("fading")
+    expected = calculate_decayed_strength(1.0, fading["last_accessed_ts"], 0, "sml", config)
+    assert abs(fading["strength"] - expected) < 1e-6
+    assert db.get_memory("popular")["layer"] == "lml"
+    assert db.get_memory("stale")["strength"] == 1.0
+    assert db.get_memory("pinned")["strength"] == 1.0
+    assert sorted(h["event"] for h in db.get_history("popular")) == ["ADD", "DECAY", "PROMOTE"]
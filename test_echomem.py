@@ -105,6 +105,8 @@ def test_echo_metadata():
     assert metadata["echo_paraphrase"] == "TypeScript is the user's preferred language"
     assert "typescript" in metadata["echo_keywords"]
     assert metadata["echo_depth"] == "deep"
+    assert "user" in metadata["echo_question_form_terms"]
+    assert len(metadata["echo_implication_terms"]) == len(metadata["echo_implications"])
 
     print("✅ Metadata conversion works correctly")
     return True
@@ -178,9 +180,62 @@ def test_echo_boost_calculation():
     return True
 
 
+def test_echo_llm_results_are_cached(tmp_path=None):
+    """Repeated content at the same depth reuses the parsed LLM echo."""
+    print("\n=== Test 5: Echo LLM Cache ===\n")
+    import tempfile
+
+    class CountingLLM:
+        calls = 0
+
+        def generate(self, prompt):
+            CountingLLM.calls += 1
+            return '{"paraphrase": "p", "keywords": ["k"], "implications": ["i"], "question_form": "q?", "category": "fact", "importance": 0.7}'
+
+    db_path = os.path.join(str(tmp_path or tempfile.mkdtemp()), "history.db")
+    processor = EchoProcessor(CountingLLM(), config={"llm_cache_path": db_path})
+    first = processor.process("I prefer dark roast coffee", depth=EchoDepth.DEEP)
+    second = processor.process("I prefer dark roast coffee", depth=EchoDepth.DEEP)
+    processor.process("I prefer dark roast coffee", depth=EchoDepth.MEDIUM)
+    assert CountingLLM.calls == 2, "Same content and depth should hit the cache"
+    assert second.to_metadata() == first.to_metadata()
+
+    # A fresh processor reads the persisted entries
+    EchoProcessor(CountingLLM(), config={"llm_cache_path": db_path}).process(
+        "I prefer dark roast coffee", depth=EchoDepth.DEEP
+    )
+    assert CountingLLM.calls == 2, "Persisted echo should survive a restart"
+
+    print("✅ Echo LLM cache works correctly")
+    return True
+
+
+def test_echo_response_parsing():
+    """The first JSON object is found wherever it sits; truncated output is salvaged."""
+    print("\n=== Test 6: Echo Response Parsing ===\n")
+    processor = EchoProcessor(llm=None)
+    parse = processor._parse_echo_response
+
+    assert parse('```json\n{"paraphrase": "p"}\n```') == {"paraphrase": "p"}
+    assert parse('Sure! {"paraphrase": "p", "extra": {"n": 1}} Hope that helps.') == {"paraphrase": "p", "extra": {"n": 1}}
+    assert parse('Note {not json}, answer: {"keywords": ["a"]}') == {"keywords": ["a"]}
+    assert parse('{"paraphrase": "p", "keywords": ["a", "b"], "impl') == {"paraphrase": "p", "keywords": ["a", "b"]}
+    assert parse("no json here") == {}
+
+    # Truncated inside a list of objects: salvage the fields, not the inner object
+    truncated = '{"paraphrase": "p", "implications": [{"text": "drinks tea"}], "keywords": ["tea", "morning"'
+    assert parse(truncated) == {"paraphrase": "p"}
+    truncated = '{"paraphrase": "p", "implications": [{"text": "drinks tea"}], "keywords": ["tea", "morning"], "q'
+    assert parse(truncated) == {"paraphrase": "p", "keywords": ["tea", "morning"]}
+    assert parse('{"other": 1} then {"paraphrase": "p"}') == {"paraphrase": "p"}
+
+    print("✅ Echo response parsing works correctly")
+    return True
+
+
 def test_full_integration():
     """Test full integration with actual Memory class (requires API keys)."""
-    print("\n=== Test 5: Full Integration ===\n")
+    print("\n=== Test 7: Full Integration ===\n")
 
     gemini_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
 
@@ -278,6 +333,8 @@ def main():
     results.append(("Shallow Echo", test_shallow_echo()))
     results.append(("Metadata Conversion", test_echo_metadata()))
     results.append(("Echo Boost Calculation", test_echo_boost_calculation()))
+    results.append(("Echo LLM Cache", test_echo_llm_results_are_cached()))
+    results.append(("Echo Response Parsing", test_echo_response_parsing()))
     results.append(("Full Integration", test_full_integration()))
 
     print("\n" + "=" * 60)
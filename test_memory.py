@@ -0,0 +1,604 @@
+"""
+Tests for the Memory facade using local (no API key) providers.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# Ensure we're using the local engram package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from engram import Memory
+from engram.core.similarity import cosine_batch, cosine_matrix
+from engram.memory.utils import compile_filter, matches_filters
+from engram.configs.base import (
+    CategoryMemConfig,
+    EchoMemConfig,
+    EmbedderConfig,
+    LLMConfig,
+    MemoryConfig,
+    VectorStoreConfig,
+)
+from engram.vector_stores.faiss_store import FaissVectorStore
+
+
+def _make_memory(tmp_path, vector_provider="memory", **overrides):
+    config = MemoryConfig(
+        vector_store=VectorStoreConfig(
+            provider=vector_provider,
+            config={"collection_name": "test_memories", "embedding_model_dims": 64},
+        ),
+        llm=LLMConfig(provider="mock", config={}),
+        embedder=EmbedderConfig(provider="simple", config={"embedding_dims": 64}),
+        history_db_path=str(tmp_path / "history.db"),
+        **{
+            "echo": EchoMemConfig(enable_echo=False),
+            "category": CategoryMemConfig(enable_categories=False),
+            **overrides,
+        },
+    )
+    return Memory(config)
+
+
+class SubsumingLLM:
+    """Classifies every conflict as SUBSUMED and counts the requests."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        return json.dumps({"classification": "SUBSUMED", "confidence": 0.9, "explanation": "duplicate"})
+
+
+def test_batch_add_sees_memories_added_earlier_in_the_batch(tmp_path):
+    memory = _make_memory(tmp_path)
+    memory.llm = SubsumingLLM()
+
+    result = memory.add(
+        [{"role": "user", "content": "I love hiking"}, {"role": "user", "content": "I love hiking"}],
+        user_id="u1",
+        infer=False,
+    )
+
+    assert [r["event"] for r in result["results"]] == ["ADD", "NOOP"]
+    assert result["results"][1]["id"] == result["results"][0]["id"]
+    assert memory.llm.calls == 1
+
+
+def test_batch_add_classifies_conflicts_with_existing_memories(tmp_path):
+    memory = _make_memory(tmp_path)
+    first = memory.add("I love hiking", user_id="u1", infer=False)["results"][0]
+    memory.llm = SubsumingLLM()
+
+    result = memory.add(
+        [{"role": "user", "content": "I love hiking"}, {"role": "user", "content": "hiking I love"}],
+        user_id="u1",
+        infer=False,
+    )
+
+    assert [r["event"] for r in result["results"]] == ["NOOP", "NOOP"]
+    assert {r["id"] for r in result["results"]} == {first["id"]}
+    assert len(memory.get_all(user_id="u1")["results"]) == 1
+
+
+def test_conflict_cache_only_reuses_exact_repeat_questions():
+    from engram.core.conflict import ConflictCache, resolve_conflict
+
+    llm = SubsumingLLM()
+    cache = ConflictCache(8)
+    existing = {"id": "m1", "memory": "I love hiking"}
+
+    first = resolve_conflict(existing, "I love  hiking", llm, cache=cache)
+    assert resolve_conflict(existing, " I love hiking", llm, cache=cache) == first
+    assert llm.calls == 1
+
+    # A different new content, existing memory, prompt or model asks again
+    resolve_conflict(existing, "I hate hiking", llm, cache=cache)
+    resolve_conflict({"id": "m2", "memory": "I love hiking"}, "I love hiking", llm, cache=cache)
+    resolve_conflict(existing, "I love hiking", llm, custom_prompt="{existing_memory} vs {new_memory}", cache=cache)
+    other = SubsumingLLM()
+    other.model = "another-model"
+    resolve_conflict(existing, "I love hiking", other, cache=cache)
+    assert (llm.calls, other.calls) == (4, 1)
+
+
+def test_batch_add_asks_llm_outside_the_write_transaction(tmp_path):
+    import sqlite3
+
+    memory = _make_memory(tmp_path)
+
+    class ContradictingLLM:
+        def generate(self, prompt):
+            # A second writer must be able to take the lock during the model call
+            conn = sqlite3.connect(str(tmp_path / "history.db"), timeout=0)
+            conn.execute("BEGIN IMMEDIATE")
+            conn.rollback()
+            conn.close()
+            return json.dumps({"classification": "CONTRADICTORY", "confidence": 0.9, "explanation": "changed"})
+
+    memory.llm = ContradictingLLM()
+    first, second = memory.add(
+        [{"role": "user", "content": "I love hiking"}, {"role": "user", "content": "I love hiking"}],
+        user_id="u1",
+        infer=False,
+    )["results"]
+
+    assert [first["event"], second["event"]] == ["ADD", "UPDATE"]
+    assert [r.id for r in memory.vector_store.list()] == [second["id"]]
+    assert [m["id"] for m in memory.get_all(user_id="u1")["results"]] == [second["id"]]
+
+
+def test_repeated_search_reuses_query_embedding(tmp_path):
+    memory = _make_memory(tmp_path)
+    memory.add("I love hiking in the mountains", user_id="u1", infer=False)
+
+    calls = []
+    embed = memory.embedder.embed
+    memory.embedder.embed = lambda text, memory_action=None: calls.append(text) or embed(text, memory_action)
+
+    first = memory.search("hiking", user_id="u1")
+    second = memory.search(" hiking ", user_id="u1")
+
+    assert calls == ["hiking"]
+    assert [r["id"] for r in first["results"]] == [r["id"] for r in second["results"]]
+
+
+def test_embedder_cache_is_keyed_by_action_and_text():
+    from engram.embeddings.simple import SimpleEmbedder
+
+    embedder = SimpleEmbedder({"embedding_dims": 16, "cache_size": 2})
+    calls = []
+    embed = embedder.embed
+    embedder.embed = lambda text, memory_action=None: calls.append((memory_action, text)) or embed(text, memory_action)
+
+    first = embedder.embed_cached("hiking  trips", "search")
+    assert embedder.embed_cached("hiking trips ", "search") is first
+    embedder.embed_cached("hiking trips", "categorize")
+    embedder.embed_cached("sailing", "search")  # evicts the oldest entry
+    embedder.embed_cached("hiking trips", "search")
+    assert calls == [("search", "hiking  trips"), ("categorize", "hiking trips"), ("search", "sailing"),
+                     ("search", "hiking trips")]
+
+
+def test_embedder_semantic_cache_reuses_reworded_queries():
+    from engram.embeddings.simple import SimpleEmbedder
+
+    embedder = SimpleEmbedder({"embedding_dims": 16, "semantic_cache_threshold": 0.97})
+    calls = []
+    embed = embedder.embed
+    embedder.embed = lambda text, memory_action=None: calls.append(text) or embed(text, memory_action)
+
+    first = embedder.embed_cached("history of Hawaii", "search")
+    assert embedder.embed_cached("Hawaii history of", "search") is first
+    embedder.embed_cached("Hawaii history of", "add")  # Separate cache per action
+    embedder.embed_cached("weather in Hawaii", "search")
+    assert calls == ["history of Hawaii", "Hawaii history of", "weather in Hawaii"]
+
+
+def test_batch_add_inserts_vectors_in_one_call(tmp_path):
+    memory = _make_memory(tmp_path)
+    inserts = []
+    insert = memory.vector_store.insert
+    memory.vector_store.insert = lambda vectors, payloads=None, ids=None: inserts.append(ids) or insert(vectors, payloads, ids)
+
+    result = memory.add(
+        [{"role": "user", "content": "I love hiking"}, {"role": "user", "content": "My cat is called Miso"}],
+        user_id="u1",
+        infer=False,
+    )
+
+    assert inserts == [[r["id"] for r in result["results"]]]
+    assert memory.search("hiking", user_id="u1")["results"][0]["memory"] == "I love hiking"
+
+
+def test_delete_all_deletes_vectors_in_one_call(tmp_path):
+    memory = _make_memory(tmp_path)
+    memory.add("I love hiking", user_id="u1", infer=False)
+    memory.add("My cat is called Miso", user_id="u1", infer=False)
+    memory.add("I live in Lisbon", user_id="u2", infer=False)
+    deletes = []
+    delete_many = memory.vector_store.delete_many
+    memory.vector_store.delete_many = lambda ids: deletes.append(ids) or delete_many(ids)
+
+    assert memory.delete_all(user_id="u1") == {"deleted_count": 2}
+
+    assert len(deletes) == 1 and len(deletes[0]) == 2
+    assert memory.get_all(user_id="u1")["results"] == []
+    assert [r.payload["user_id"] for r in memory.vector_store.list()] == ["u2"]
+
+
+class StreamingLLM:
+    """Streams a fixed extraction response in small chunks, logging each one."""
+
+    def __init__(self, response, events):
+        self.response = response
+        self.events = events
+
+    def stream(self, prompt):
+        for start in range(0, len(self.response), 8):
+            self.events.append("chunk")
+            yield self.response[start:start + 8]
+
+
+def test_extraction_hands_out_memories_while_streaming(tmp_path):
+    memory = _make_memory(tmp_path)
+    events = []
+    response = '```json\n{"memories": [{"content": "Likes tea", "category": "food"}, {"content": "Has a cat"}]}\n```'
+    memory.llm = StreamingLLM(response, events)
+
+    extracted = memory._extract_memories(
+        [{"role": "user", "content": "I like tea and have a cat"}],
+        {"user_id": "u1"},
+        on_memory=lambda m: events.append(m["content"]),
+    )
+
+    assert [m["content"] for m in extracted] == ["Likes tea", "Has a cat"]
+    assert extracted[0]["categories"] == ["food"]
+    assert events.index("Likes tea") < len(events) - 1 - events[::-1].index("chunk")
+
+
+def test_existing_memories_text_cached_until_scope_changes(tmp_path):
+    memory = _make_memory(tmp_path)
+    memory.add("I love hiking", user_id="u1", infer=False)
+    scans = []
+    get_all = memory.db.get_all_memories
+    memory.db.get_all_memories = lambda **kwargs: scans.append(kwargs) or get_all(**kwargs)
+
+    assert memory._existing_memories_text({"user_id": "u1"}) == "I love hiking"
+    assert memory._existing_memories_text({"user_id": "u1"}) == "I love hiking"
+    assert len(scans) == 1
+
+    memory.add("My cat is called Miso", user_id="u1", infer=False)
+    assert set(memory._existing_memories_text({"user_id": "u1"}).split("\n")) == {
+        "I love hiking",
+        "My cat is called Miso",
+    }
+    assert len(scans) == 2
+
+
+def test_faiss_vector_store_round_trip(tmp_path):
+    config = {"collection_name": "test", "embedding_model_dims": 4, "path": str(tmp_path / "faiss")}
+    store = FaissVectorStore(config)
+    store.insert(
+        [[1, 0, 0, 0], [0, 1, 0, 0], [0.9, 0.1, 0, 0]],
+        payloads=[{"user_id": "u1"}, {"user_id": "u1"}, {"user_id": "u2"}],
+        ids=["a", "b", "c"],
+    )
+    assert [r.id for r in store.search(None, [1, 0, 0, 0], limit=2)] == ["a", "c"]
+    assert [r.id for r in store.search(None, [1, 0, 0, 0], limit=2, filters={"user_id": "u1"})] == ["a", "b"]
+
+    store.delete("a")
+    store.update("b", vector=[0.8, 0.2, 0, 0])
+    assert [r.id for r in store.search(None, [1, 0, 0, 0], limit=3)] == ["c", "b"]
+
+    reopened = FaissVectorStore(config)
+    assert [r.id for r in reopened.search(None, [1, 0, 0, 0], limit=3)] == ["c", "b"]
+    assert reopened.get("b").payload == {"user_id": "u1"}
+
+
+def test_faiss_store_appends_changes_to_a_log(tmp_path):
+    path = tmp_path / "faiss"
+    config = {"collection_name": "test", "embedding_model_dims": 4, "path": str(path)}
+    store = FaissVectorStore(config)
+    for n in range(10):
+        store.insert([[1, n, 0, 0]], payloads=[{"n": n}], ids=[f"v{n}"])
+    store.delete("v3")
+    store.update("v4", payload={"n": 40})
+
+    # Only the first insert wrote a snapshot; later changes went to the log,
+    # and rows grew in place
+    assert np.load(path / "test.npy").shape == (1, 4)
+    assert len(store._vectors) > len(store._ids)
+
+    # A write cut short by a crash is dropped on replay
+    with open(path / "test.log.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"op": "delete", "ids": ["v5"')
+    reopened = FaissVectorStore(config)
+    assert len(reopened.list()) == 9
+    assert reopened.get("v3") is None and reopened.get("v5") is not None
+    assert reopened.get("v4").payload == {"n": 40}
+    assert not (path / "test.log.jsonl").exists()
+
+    reopened.insert([[0, 1, 0, 0]], payloads=[{"n": 10}], ids=["v10"])
+    reopened.flush()
+    assert not (path / "test.log.jsonl").exists()
+    assert len(FaissVectorStore(config).list()) == 10
+
+
+def test_memory_with_faiss_vector_store(tmp_path):
+    memory = _make_memory(tmp_path, vector_provider="faiss")
+    memory.add("I love hiking in the mountains", user_id="u1", infer=False)
+
+    assert memory.search("hiking", user_id="u1")["results"][0]["memory"] == "I love hiking in the mountains"
+
+
+def test_cosine_batch_handles_zero_and_int8_vectors():
+    matrix = np.array([[1.0, 0.0], [0.0, 0.0], [1.0, 1.0]], dtype=np.float32)
+
+    scores = cosine_batch([2.0, 0.0], matrix)
+    assert np.allclose(scores, [1.0, 0.0, 2 ** -0.5], atol=1e-6)
+    assert not cosine_batch([0.0, 0.0], matrix).any()
+    assert np.allclose(cosine_batch(np.array([2, 0], np.int8), matrix.astype(np.int8)), scores, atol=1e-3)
+
+
+def test_compile_filter_matches_merged_dict_semantics():
+    memory = {"user_id": "u1", "layer": "sml", "strength": 0.7, "metadata": {"tag": "x", "layer": "lml"}}
+    specs = [
+        {"user_id": "u1", "tag": "x"},
+        {"layer": "lml"},  # metadata shadows the row field, as in the merged dict
+        {"strength": {"gte": 0.5, "lt": 0.8}},
+        {"tag": "*", "missing": "*"},
+        {"OR": [{"tag": "y"}, {"user_id": {"in": ["u1", "u2"]}}]},
+        {"NOT": [{"tag": "x"}]},
+        {"AND": [{"tag": {"icontains": "X"}}, {"user_id": {"ne": "u2"}}]},
+        {"AND": {"tag": "x"}},
+    ]
+    for spec in specs:
+        expected = matches_filters({**memory, **memory["metadata"]}, spec)
+        assert compile_filter(spec)(memory, memory["metadata"]) == expected, spec
+
+
+def test_searches_defer_category_persistence_until_close(tmp_path):
+    memory = _make_memory(tmp_path, category=CategoryMemConfig(enable_categories=True))
+    memory.add("I love hiking", user_id="u1", infer=False)
+    saves = []
+    persist = memory._persist_categories
+    memory._persist_categories = lambda: saves.append(1) or persist()
+
+    for _ in range(3):
+        memory.search("hiking", user_id="u1")
+    for category in memory.get_categories()[:2]:
+        memory.search_by_category(category["id"])
+    assert saves == []
+
+    memory.close()
+    assert saves == [1]
+
+
+def test_category_saves_reuse_one_daemon_worker(tmp_path):
+    memory = _make_memory(tmp_path, category=CategoryMemConfig(enable_categories=True))
+    memory.add("I love hiking", user_id="u1", infer=False)
+    memory._persist_categories()
+
+    # Nothing changed, so nothing is scheduled
+    memory._schedule_persist_categories()
+    assert memory._persist_worker is None
+
+    for category in memory.get_categories()[:3]:
+        memory.search_by_category(category["id"])
+    workers = [t for t in threading.enumerate() if t.name == "engram-category-persist"]
+    assert workers == [memory._persist_worker] and workers[0].daemon
+
+    memory._CATEGORY_PERSIST_DELAY = 0.0
+    memory.search_by_category(memory.get_categories()[0]["id"])
+    deadline = time.monotonic() + 5
+    while memory.category_processor.has_changes() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not memory.category_processor.has_changes()
+    memory.close()
+    assert not workers[0].is_alive()
+
+
+def test_persist_categories_skips_clean_state(tmp_path):
+    memory = _make_memory(tmp_path, category=CategoryMemConfig(enable_categories=True))
+    memory.add("I love hiking", user_id="u1", infer=False)
+    writes = []
+    save = memory.db.save_all_categories
+    memory.db.save_all_categories = lambda categories: writes.append([c["id"] for c in categories]) or save(categories)
+
+    memory._persist_categories()
+    assert writes == []
+
+    category_id = memory.get_categories()[0]["id"]
+    memory.category_processor.access_category(category_id)
+    memory._persist_categories()
+    assert writes == [[category_id]]
+
+
+def test_failed_category_save_keeps_changes_for_retry(tmp_path):
+    memory = _make_memory(tmp_path, category=CategoryMemConfig(enable_categories=True))
+    memory.add("I love hiking", user_id="u1", infer=False)
+    category_id = memory.get_categories()[0]["id"]
+    save = memory.db.save_all_categories
+
+    def failing_save(categories):
+        raise RuntimeError("disk full")
+
+    memory.db.save_all_categories = failing_save
+    memory.category_processor.access_category(category_id)
+    memory._flush_categories()  # logged, not raised
+
+    writes = []
+    memory.db.save_all_categories = lambda categories: writes.append([c["id"] for c in categories]) or save(categories)
+    memory._persist_categories()
+    assert writes == [[category_id]]
+
+
+def test_search_drops_and_deletes_expired_memories(tmp_path):
+    memory = _make_memory(tmp_path)
+    memory.add("I love hiking", user_id="u1", infer=False, expiration_date="2000-01-01")
+    memory.add("I love hiking trips", user_id="u1", infer=False)
+
+    results = memory.search("hiking", user_id="u1")["results"]
+
+    assert [r["memory"] for r in results] == ["I love hiking trips"]
+    assert len(memory.vector_store.list()) == 1
+
+    # Expired memories are deleted even when they fall below min_strength
+    weak = memory.add("I love hiking boots", user_id="u1", infer=False, expiration_date="2000-01-01")
+    memory.db.update_memory(weak["results"][0]["id"], {"strength": 0.05})
+    memory.search("hiking", user_id="u1", min_strength=0.5)
+    assert len(memory.vector_store.list()) == 1
+
+
+def test_cosine_matrix_matches_cosine_batch_per_query():
+    queries = np.array([[1.0, 0.0], [0.0, 0.0], [1.0, 2.0]], dtype=np.float32)
+    matrix = np.array([[1.0, 0.0], [0.0, 0.0], [2.0, 2.0]], dtype=np.float32)
+
+    scores = cosine_matrix(queries, matrix)
+
+    assert scores.shape == (3, 3)
+    for query, row in zip(queries, scores):
+        assert np.allclose(row, cosine_batch(query, matrix), atol=1e-6)
+    assert cosine_matrix(queries, matrix[:0]).shape == (3, 0)
+
+
+def test_search_batch_matches_single_searches(tmp_path):
+    from engram.vector_stores.memory import InMemoryVectorStore
+
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(40, 8)).tolist()
+    payloads = [{"user_id": "u1" if i % 2 else "u2"} for i in range(40)]
+    queries = rng.normal(size=(5, 8)).tolist()
+    for store in (InMemoryVectorStore({}), FaissVectorStore({"embedding_model_dims": 8, "index_type": "flat"})):
+        store.insert(vectors, payloads=payloads, ids=[f"v{i}" for i in range(40)])
+        batched = store.search_batch(queries, limit=3, filters={"user_id": "u1"})
+        for query, hits in zip(queries, batched):
+            single = store.search(query=None, vectors=query, limit=3, filters={"user_id": "u1"})
+            assert [h.id for h in hits] == [h.id for h in single]
+            assert all(h.payload["user_id"] == "u1" for h in hits)
+
+
+def test_vector_stores_accept_numpy_arrays():
+    from engram.vector_stores.memory import InMemoryVectorStore
+
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(20, 8)).astype(np.float32)
+    queries = rng.normal(size=(3, 8)).astype(np.float32)
+    for store in (InMemoryVectorStore({}), FaissVectorStore({"embedding_model_dims": 8, "index_type": "flat"})):
+        store.insert(vectors, ids=[f"v{i}" for i in range(20)])
+        as_arrays = store.search_batch(queries, limit=4)
+        as_lists = store.search_batch(queries.tolist(), limit=4)
+        assert [[h.id for h in hits] for hits in as_arrays] == [[h.id for h in hits] for hits in as_lists]
+        single = store.search(query=None, vectors=queries[0], limit=4)
+        assert [h.id for h in single] == [h.id for h in as_arrays[0]]
+        store.update("v0", vector=queries[1])
+        assert store.search(query=None, vectors=queries[1], limit=1)[0].id == "v0"
+
+
+def test_quantized_vector_stores_rank_like_float32():
+    from engram.vector_stores.memory import InMemoryVectorStore
+
+    rng = np.random.default_rng(2)
+    vectors = rng.normal(size=(50, 16)).astype(np.float32)
+    queries = vectors[:6] + 0.01
+    for quantization in ("float16", "int8"):
+        for store in (
+            InMemoryVectorStore({"quantization": quantization}),
+            FaissVectorStore({"embedding_model_dims": 16, "index_type": "flat", "quantization": quantization}),
+        ):
+            store.insert(vectors, ids=[f"v{i}" for i in range(50)])
+            hits = store.search_batch(queries, limit=1)
+            assert [h[0].id for h in hits] == [f"v{i}" for i in range(6)]
+            assert all(abs(h[0].score - 1.0) < 0.02 for h in hits)
+    with pytest.raises(ValueError):
+        InMemoryVectorStore({"quantization": "int4"})
+
+
+def test_qdrant_insert_uploads_large_batches(tmp_path):
+    import uuid
+
+    from engram.vector_stores.qdrant import QdrantVectorStore
+
+    store = QdrantVectorStore({"path": str(tmp_path / "qdrant"), "embedding_model_dims": 8, "batch_size": 16})
+    vectors = np.random.default_rng(3).normal(size=(50, 8)).astype(np.float32)
+    ids = [str(uuid.uuid4()) for _ in range(50)]
+    store.insert(vectors, payloads=[{"n": n} for n in range(50)], ids=ids)
+    assert store.col_info()["points"] == 50
+    assert store.search(query=None, vectors=vectors[7], limit=1)[0].payload == {"n": 7}
+
+
+def test_qdrant_search_batch_matches_search(tmp_path):
+    import uuid
+
+    from engram.vector_stores.qdrant import QdrantVectorStore
+
+    store = QdrantVectorStore({"path": str(tmp_path / "qdrant"), "embedding_model_dims": 8})
+    vectors = np.random.default_rng(4).normal(size=(20, 8)).astype(np.float32)
+    store.insert(vectors, payloads=[{"n": n, "even": n % 2 == 0} for n in range(20)], ids=[str(uuid.uuid4()) for _ in range(20)])
+
+    filters = {"even": True}
+    batched = store.search_batch(vectors[:4], limit=3, filters=filters)
+    single = [store.search(query=None, vectors=vector, limit=3, filters=filters) for vector in vectors[:4]]
+    assert [[hit.id for hit in hits] for hits in batched] == [[hit.id for hit in hits] for hits in single]
+    assert all(hit.payload["even"] for hits in batched for hit in hits)
+    assert store.search_batch([], limit=3) == []
+
+
+def test_fuse_memory_groups_fuses_each_group(tmp_path):
+    memory = _make_memory(tmp_path)
+    ids = [
+        memory.add(text, user_id="u1", infer=False)["results"][0]["id"]
+        for text in ("I like tea", "I drink green tea", "I run daily", "I jog every morning", "I own a cat")
+    ]
+
+    results = memory.fuse_memory_groups([ids[:2], ids[2:4], ids[4:]])
+
+    assert [r["source_ids"] for r in results[:2]] == [ids[:2], ids[2:4]]
+    assert results[2] == {"error": "Need at least 2 memories to fuse"}
+    remaining = {m["id"] for m in memory.get_all(user_id="u1")["results"]}
+    assert ids[4] in remaining and not remaining & set(ids[:4])
+
+
+def test_render_prompt_matches_str_format():
+    from engram.utils import prompts
+    from engram.utils.prompts import render_prompt
+
+    values = {
+        "conversation": "user: {hi}", "existing_memories": "", "existing_memory": "a", "existing_created_at": "t",
+        "existing_last_accessed": "t", "existing_access_count": 3, "existing_strength": 0.25, "new_memory": "b",
+        "content": "c", "depth": "deep", "depth_instructions": "all", "memories_list": "m",
+    }
+    for name in ("MEMORY_EXTRACTION_PROMPT", "AGENT_MEMORY_EXTRACTION_PROMPT", "CONFLICT_RESOLUTION_PROMPT",
+                 "ECHO_PROCESSING_PROMPT", "FUSION_PROMPT"):
+        template = getattr(prompts, name)
+        assert render_prompt(template, **values) == template.format(**values), name
+    assert render_prompt("{x:>3}", x=1) == "  1"
+    assert render_prompt("{x!r}", x="a") == "'a'"
+
+
+def test_qdrant_binary_quantization_settings(tmp_path):
+    import uuid
+
+    from qdrant_client import models
+
+    from engram.vector_stores.qdrant import QdrantVectorStore, _quantization_config, _search_params
+
+    assert isinstance(_quantization_config("binary"), models.BinaryQuantization)
+    params = _search_params({"quantization": "binary", "oversampling": 3.0})
+    assert params.quantization.rescore and params.quantization.oversampling == 3.0
+    assert _search_params({"quantization": "int8"}).quantization is None
+
+    store = QdrantVectorStore(
+        {"path": str(tmp_path / "qdrant"), "embedding_model_dims": 8, "quantization": "binary", "on_disk": True, "indexing_threshold": 1000}
+    )
+    vectors = np.random.default_rng(5).normal(size=(10, 8)).astype(np.float32)
+    store.insert(vectors, payloads=[{"n": n} for n in range(10)], ids=[str(uuid.uuid4()) for _ in range(10)])
+    assert store.search(query=None, vectors=vectors[3], limit=1)[0].payload == {"n": 3}
+
+
+def test_qdrant_insert_bulk_pauses_indexing(tmp_path):
+    import uuid
+
+    from engram.vector_stores.qdrant import QdrantVectorStore
+
+    store = QdrantVectorStore({"path": str(tmp_path / "qdrant"), "embedding_model_dims": 8, "batch_size": 16})
+    thresholds = []
+    update_collection = store.client.update_collection
+    store.client.update_collection = lambda **kwargs: (
+        thresholds.append(kwargs["optimizers_config"].indexing_threshold) or update_collection(**kwargs)
+    )
+
+    vectors = np.random.default_rng(6).normal(size=(50, 8)).astype(np.float32)
+    store.insert_bulk(vectors, payloads=[{"n": n} for n in range(50)], ids=[str(uuid.uuid4()) for _ in range(50)])
+
+    assert thresholds[0] == 0 and thresholds[1] > 0
+    assert store.col_info()["points"] == 50
+    assert store.search(query=None, vectors=vectors[9], limit=1)[0].payload == {"n": 9}
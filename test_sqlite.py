@@ -0,0 +1,375 @@
+"""
+Tests for the SQLite persistence layer.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Ensure we're using the local engram package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from engram.db.sqlite import SQLiteManager
+
+
+def _memory(memory_id, text, categories=None, strength=1.0):
+    return {
+        "id": memory_id,
+        "memory": text,
+        "user_id": "u1",
+        "categories": categories or [],
+        "strength": strength,
+        "embedding": [0.1, 0.2, 0.3],
+    }
+
+
+def test_bulk_memory_insert_logs_history(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+
+    ids = db.add_memories_bulk([_memory("m1", "first"), _memory("m2", "second")])
+
+    assert ids == ["m1", "m2"]
+    assert db.get_memory("m2")["memory"] == "second"
+    assert [h["event"] for h in db.get_history("m1")] == ["ADD"]
+
+
+def test_save_all_categories_in_one_transaction(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    categories = [
+        {"id": f"cat_{i}", "name": f"Cat {i}", "description": "", "keywords": ["k"], "strength": i / 10}
+        for i in range(5)
+    ]
+
+    assert db.save_all_categories(categories + [{"name": "no id"}]) == 5
+    assert [c["id"] for c in db.get_all_categories()] == ["cat_4", "cat_3", "cat_2", "cat_1", "cat_0"]
+    assert db.get_category("cat_2")["keywords"] == ["k"]
+    lite = db.get_all_categories_lite()
+    assert [c["id"] for c in lite] == ["cat_4", "cat_3", "cat_2", "cat_1", "cat_0"]
+    assert "keywords" not in lite[0] and lite[0]["strength"] == 0.4
+
+
+def test_database_uses_wal_journal(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    with db._get_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_connection_is_reused_and_nested_transactions_roll_back_together(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memory(_memory("m1", "first"))
+
+    try:
+        with db._get_connection() as outer:
+            outer.execute("UPDATE memories SET memory = 'changed' WHERE id = 'm1'")
+            with db._get_connection() as inner:
+                assert inner is outer
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+
+    assert db.get_memory("m1")["memory"] == "first"
+    db.close()
+
+
+def test_memories_by_category_follow_updates_and_deletes(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memory(_memory("m1", "first", categories=["cat_a"], strength=0.5))
+    db.add_memories_bulk([
+        _memory("m2", "second", categories=["cat_a", "cat_b"], strength=0.9),
+        _memory("m3", "third", categories=["cat_ab"]),
+    ])
+
+    assert [m["id"] for m in db.get_memories_by_category("cat_a")] == ["m2", "m1"]
+    assert [m["id"] for m in db.get_memories_by_category("cat_a", min_strength=0.6)] == ["m2"]
+
+    db.update_memory("m1", {"categories": ["cat_b"]})
+    db.delete_memory("m2", use_tombstone=False)
+
+    assert db.get_memories_by_category("cat_a") == []
+    assert [m["id"] for m in db.get_memories_by_category("cat_b")] == ["m1"]
+
+
+def test_memory_categories_backfilled_for_existing_database(tmp_path):
+    path = str(tmp_path / "test.db")
+    db = SQLiteManager(path)
+    db.add_memory(_memory("m1", "first", categories=["cat_a"]))
+    with db._get_connection() as conn:
+        conn.execute("DROP TABLE memory_categories")
+    db.close()
+
+    assert [m["id"] for m in SQLiteManager(path).get_memories_by_category("cat_a")] == ["m1"]
+
+
+def test_embeddings_round_trip_as_float32_blobs(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memory(_memory("m1", "first"))
+    with db._get_connection() as conn:
+        conn.execute(
+            "INSERT INTO memories (id, memory, embedding) VALUES ('legacy', 'old row', '[0.5, 0.25]')"
+        )
+
+    embedding = db.get_memory("m1")["embedding"]
+    assert embedding.dtype == np.float32
+    assert np.allclose(embedding, [0.1, 0.2, 0.3])
+
+    db.update_memory("m1", {"embedding": [1.0, 2.0]})
+    assert db.get_memory("m1")["embedding"].tolist() == [1.0, 2.0]
+    assert db.get_memory("legacy")["embedding"] == [0.5, 0.25]
+
+
+def test_int8_embedding_storage(tmp_path):
+    path = str(tmp_path / "test.db")
+    SQLiteManager(path).add_memory(_memory("f32", "float row"))
+    db = SQLiteManager(path, embedding_dtype="int8")
+    db.add_memory(_memory("m1", "first"))
+
+    with db._get_connection() as conn:
+        assert len(conn.execute("SELECT embedding FROM memories WHERE id = 'm1'").fetchone()[0]) == 3
+    assert "embedding_scale" not in db.get_memory("m1")
+    assert np.allclose(db.get_memory("m1")["embedding"], [0.1, 0.2, 0.3], atol=0.3 / 127)
+    assert np.allclose(db.get_memory("f32")["embedding"], [0.1, 0.2, 0.3])
+
+    db.update_memory("m1", {"embedding": [0.0, 0.0]})
+    assert db.get_memory("m1")["embedding"].tolist() == [0.0, 0.0]
+
+
+def test_last_accessed_ts_added_to_existing_database(tmp_path):
+    path = str(tmp_path / "test.db")
+    db = SQLiteManager(path)
+    db.add_memory({**_memory("m1", "first"), "last_accessed": "2024-01-01T00:00:00"})
+    assert db.get_memory("m1")["last_accessed_ts"] == 1704067200
+    with db._get_connection() as conn:
+        conn.execute("ALTER TABLE memories DROP COLUMN last_accessed_ts")
+    db.close()
+
+    db = SQLiteManager(path)
+    assert db.get_memory("m1")["last_accessed_ts"] == 1704067200
+    db.increment_access("m1")
+    assert db.get_memory("m1")["last_accessed_ts"] > 1704067200
+
+
+def test_bulk_delete_logs_one_event_per_memory(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memories_bulk([_memory(f"m{i}", f"memory {i}", categories=["cat_a"]) for i in range(4)])
+
+    assert db.delete_memories_bulk(["m0", "m1"]) == 2
+    assert db.delete_memories_bulk(["m2"], use_tombstone=False) == 1
+
+    assert db.get_memory("m0") is None
+    assert db.get_memory("m0", include_tombstoned=True)["tombstone"] is True
+    assert [h["event"] for h in db.get_history("m1")].count("UPDATE") == 1
+    assert db.get_memory("m2", include_tombstoned=True) is None
+    assert "DELETE" in [h["event"] for h in db.get_history("m2")]
+    assert [m["id"] for m in db.get_memories_by_category("cat_a")] == ["m3"]
+
+
+def test_new_database_uses_large_pages_and_incremental_vacuum(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memories_bulk([_memory(f"m{i}", "x" * 4000) for i in range(50)])
+    db.delete_memories_bulk([f"m{i}" for i in range(50)])
+    assert db.purge_tombstoned() == 50
+
+    with db._get_connection() as conn:
+        assert conn.execute("PRAGMA page_size").fetchone()[0] == 8192
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+    db.incremental_vacuum()
+    with db._get_connection() as conn:
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+def test_listing_by_user_and_layer_uses_composite_index(tmp_path):
+    from engram.db.sqlite import _all_memories_query
+
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    query = _all_memories_query((True, False, False, False, True), False)
+    with db._get_connection() as conn:
+        plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, (0.0, "u1", "sml")))
+    assert "idx_mem_list" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_increment_access_returns_updated_fields(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memory(_memory("m1", "first", strength=0.8))
+
+    db.increment_access("m1")
+    access = db.increment_access("m1")
+
+    assert access["access_count"] == 2
+    assert access["strength"] == 0.8 and access["layer"] == "sml"
+    assert access["last_accessed"] == db.get_memory("m1")["last_accessed"]
+    assert db.increment_access("missing") is None
+
+
+def test_update_memory_skips_unchanged_encoded_columns(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memory(_memory("m1", "first", categories=["cat_a"]))
+    with db._get_connection() as conn:
+        conn.execute("UPDATE memories SET metadata = '{ }' WHERE id = 'm1'")  # marker: not re-serialized
+
+    record = db.get_memory("m1")
+    db.update_memory("m1", {**{k: record[k] for k in ("metadata", "categories", "embedding")}, "strength": 0.5})
+
+    with db._get_connection() as conn:
+        assert conn.execute("SELECT metadata FROM memories WHERE id = 'm1'").fetchone()[0] == "{ }"
+    assert db.get_memory("m1")["strength"] == 0.5
+
+    db.update_memory("m1", {"categories": ["cat_b"], "embedding": [1.0, 0.0, 0.0]})
+    assert [m["id"] for m in db.get_memories_by_category("cat_b")] == ["m1"]
+    assert db.get_memory("m1")["embedding"].tolist() == [1.0, 0.0, 0.0]
+
+
+def test_get_memories_batch_chunks_large_id_lists(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memories_bulk([_memory(f"m{i}", f"memory {i}") for i in range(1000)])
+    db.delete_memory("m5")
+
+    found = db.get_memories_batch([f"m{i}" for i in range(1000)] + ["missing", "m1"])
+
+    assert len(found) == 999
+    assert "m5" not in found and found["m999"]["memory"] == "memory 999"
+    assert "m5" in db.get_memories_batch(["m5"], include_tombstoned=True)
+
+
+def test_get_memories_batch_filters_by_many_categories(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memories_bulk([
+        _memory("m1", "in", categories=["cat_999"]),
+        _memory("m2", "out", categories=["other"]),
+        _memory("m3", "weak", categories=["cat_999"], strength=0.05),
+    ])
+    expired = _memory("m4", "expired", categories=["other"], strength=0.05)
+    expired["expiration_date"] = "2000-01-01"
+    db.add_memory(expired)
+    categories = [f"cat_{i}" for i in range(1000)]
+
+    found = db.get_memories_batch(["m1", "m2", "m3", "m4"], min_strength=0.1, categories=categories)
+    assert list(found) == ["m1"]
+    assert len(db.get_all_memories(user_id="u1", categories=categories)) == 2
+
+    # Expired rows come back whatever the filters, so callers can delete them
+    found = db.get_memories_batch(
+        ["m1", "m2", "m3", "m4"], min_strength=0.1, categories=categories, include_expired=True
+    )
+    assert sorted(found) == ["m1", "m4"]
+
+
+def test_bulk_increment_access_and_promotion(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memories_bulk([_memory(f"m{i}", f"memory {i}") for i in range(3)])
+    db.increment_access("m0")
+
+    accessed = db.bulk_increment_access(["m0", "m1", "m0", "missing"])
+
+    assert set(accessed) == {"m0", "m1"}
+    assert accessed["m0"]["access_count"] == 2 and accessed["m1"]["access_count"] == 1
+    assert db.get_memory("m2")["access_count"] == 0
+
+    assert db.promote_memories(["m0", "m1"]) == 2
+    assert db.promote_memories(["m0"]) == 0  # already in LML
+    assert db.get_memory("m0")["layer"] == "lml"
+    assert sorted(h["event"] for h in db.get_history("m1")) == ["ADD", "PROMOTE"]
+
+
+def test_transaction_groups_manager_calls(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+
+    try:
+        with db.transaction():
+            db.add_memory(_memory("m1", "first"))
+            db.update_memory("m1", {"strength": 0.5})
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+    assert db.get_memory("m1") is None
+
+    with db.transaction():
+        db.add_memory(_memory("m1", "first"))
+        db.add_memory(_memory("m2", "second"))
+    assert set(db.get_memories_batch(["m1", "m2"])) == {"m1", "m2"}
+
+
+def test_get_all_memories_filters_categories_expiry_and_limit_in_sql(tmp_path):
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memories_bulk(
+        [
+            _memory("m1", "first", categories=["cat_a"], strength=0.9),
+            _memory("m2", "second", categories=["cat_b"], strength=0.8),
+            {**_memory("m3", "expired", categories=["cat_a"], strength=0.7), "expiration_date": "2000-01-01"},
+            {**_memory("m4", "future", categories=["cat_a"], strength=0.6), "expiration_date": "2999-01-01"},
+        ]
+    )
+
+    def ids(**kwargs):
+        return [m["id"] for m in db.get_all_memories(user_id="u1", **kwargs)]
+
+    assert ids(categories=["cat_a"]) == ["m1", "m3", "m4"]
+    assert ids(categories=["cat_a"], exclude_expired=True) == ["m1", "m4"]
+    assert ids(exclude_expired=True, limit=2) == ["m1", "m2"]
+    assert set(db.get_memories_batch(["m1", "m2", "m4"], min_strength=0.7, categories=["cat_a"])) == {"m1"}
+
+
+def test_get_memories_by_categories_matches_per_category_queries(tmp_path):
+    db = SQLiteManager(str(tmp_path / "history.db"))
+    db.add_memories_bulk(
+        [
+            _memory("m1", "first", categories=["cat_a"], strength=0.5),
+            _memory("m2", "second", categories=["cat_a", "cat_b"], strength=0.9),
+            _memory("m3", "third", categories=["cat_a"], strength=0.7),
+            _memory("m4", "weak", categories=["cat_b"], strength=0.05),
+        ]
+    )
+
+    grouped = db.get_memories_by_categories(["cat_a", "cat_b", "cat_empty"], limit=2, min_strength=0.1)
+
+    assert list(grouped) == ["cat_a", "cat_b", "cat_empty"]
+    for category_id, memories in grouped.items():
+        expected = db.get_memories_by_category(category_id, limit=2, min_strength=0.1)
+        assert [m["id"] for m in memories] == [m["id"] for m in expected]
+    assert [m["id"] for m in grouped["cat_a"]] == ["m2", "m3"]
+    assert "_rank" not in grouped["cat_a"][0] and "_category_id" not in grouped["cat_a"][0]
+
+
+def test_category_listing_tracks_strength_changes_and_old_schema(tmp_path):
+    path = str(tmp_path / "test.db")
+    db = SQLiteManager(path)
+    db.add_memories_bulk([
+        _memory("m1", "first", categories=["cat_a"], strength=0.5),
+        _memory("m2", "second", categories=["cat_a"], strength=0.9),
+    ])
+    db.update_memory("m1", {"strength": 0.95})
+    assert [m["id"] for m in db.get_memories_by_category("cat_a")] == ["m1", "m2"]
+
+    # Databases from before memory_categories.strength get the column backfilled
+    with db._get_connection() as conn:
+        conn.execute("DROP TRIGGER trg_memory_categories_strength")
+        conn.execute("DROP INDEX idx_memory_categories_strength")
+        conn.execute("ALTER TABLE memory_categories DROP COLUMN strength")
+    db.close()
+
+    db = SQLiteManager(path)
+    assert [m["id"] for m in db.get_memories_by_category("cat_a", min_strength=0.6)] == ["m1", "m2"]
+    db.update_memory("m2", {"strength": 0.1})
+    assert [m["id"] for m in db.get_memories_by_category("cat_a", min_strength=0.6)] == ["m1"]
+
+
+def test_connections_of_finished_threads_are_reused(tmp_path):
+    import threading
+
+    db = SQLiteManager(str(tmp_path / "test.db"))
+    db.add_memory(_memory("m1", "first"))
+    seen = []
+
+    def worker():
+        seen.append(db._thread_connection())
+        assert db.get_memory("m1")["memory"] == "first"
+
+    for _ in range(3):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+    assert seen[0] is seen[1] is seen[2]
+    assert len(db._connections) == 2  # this thread's and the workers' shared one